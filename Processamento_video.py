@@ -1,13 +1,14 @@
 import os
 import sys
+import json
 import subprocess
-import yt_dlp
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from PyQt6.QtWidgets import QMessageBox
 
 from erros_usuario import registrar_erro_usuario
-from ffmpeg_utils import garantir_ffmpeg
-from logs_tab import adicionar_log
+from ffmpeg_utils import garantir_ffmpeg, obter_duracao
+from metricas import medir_etapa, nova_execucao
+from registro_log import adicionar_log, notificar_erro, rotacionar_se_necessario
 
 # --- CENTRALIZAÇÃO DOS ARQUIVOS NA PASTA DO APP ---
 def get_app_dir():
@@ -20,11 +21,29 @@ def get_app_dir():
         os.makedirs(app_dir, exist_ok=True)
     return app_dir
 
+def carregar_config():
+    config_path = os.path.join(get_app_dir(), "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def limite_conversoes_paralelas():
+    padrao = max(1, (os.cpu_count() or 2) // 2)
+    try:
+        return max(1, int(carregar_config().get("conversao_max_paralelo", padrao)))
+    except (TypeError, ValueError):
+        return padrao
+
 def log_erro(msg):
     app_dir = get_app_dir()
     log_path = os.path.join(app_dir, "erros.log")
     if "DEBUG" not in msg:
         try:
+            rotacionar_se_necessario(log_path)
             with open(log_path, "a", encoding="utf-8") as f:
                 f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {msg}\n")
         except Exception as e:
@@ -56,6 +75,7 @@ def nome_base_entrada(origem):
 
 def baixar_do_youtube(url, caminho_saida, parent_widget=None):
     try:
+        import yt_dlp  # só quando há download: o pacote é grande e atrasa a abertura do programa
         adicionar_log(f"Iniciando download do YouTube: {url}")
         if not os.path.exists(caminho_saida):
             os.makedirs(caminho_saida, exist_ok=True)
@@ -102,13 +122,28 @@ def baixar_do_youtube(url, caminho_saida, parent_widget=None):
         msg = f"Erro ao baixar do YouTube: {str(e)}"
         log_erro(msg)
         registrar_erro_usuario("Conversão", "Erro ao baixar vídeo do YouTube. Verifique se o link é válido ou tente novamente mais tarde.")
-        if parent_widget:
-            QMessageBox.critical(parent_widget, "Erro download YouTube", msg)
-        else:
-            print(msg)
+        notificar_erro("Erro download YouTube", msg, parent_widget)
         return None, None
 
-def gerar_mp4(caminho_origem, caminho_saida, nome_base, parent_widget=None):
+def executar_ffmpeg(comando, etapa="ffmpeg", **campos):
+    """Roda o FFmpeg e registra a etapa (duração, memória, código de saída) em metricas.jsonl."""
+    startupinfo = None
+    if os.name == "nt":
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    with medir_etapa(etapa, **campos) as evento:
+        processo = subprocess.run(
+            comando,
+            capture_output=True, text=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            startupinfo=startupinfo
+        )
+        evento["ffmpeg_codigo_saida"] = processo.returncode
+        if processo.returncode != 0:
+            evento["status"] = "erro"
+    return processo
+
+def gerar_mp4(caminho_origem, caminho_saida, nome_base, parent_widget=None, execucao=None):
     try:
         destino = os.path.join(caminho_saida, f"video_{nome_base}.mp4")
         if os.path.exists(destino):
@@ -126,16 +161,7 @@ def gerar_mp4(caminho_origem, caminho_saida, nome_base, parent_widget=None):
             '-y',
             destino
         ]
-        startupinfo = None
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        processo = subprocess.run(
-            comando,
-            capture_output=True, text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            startupinfo=startupinfo
-        )
+        processo = executar_ffmpeg(comando, "conversao_mp4", execucao=execucao, origem=caminho_origem, arquivo=destino)
         if processo.returncode == 0 and os.path.exists(destino):
             adicionar_log(f"MP4 gerado: {destino}")
             return destino
@@ -146,7 +172,7 @@ def gerar_mp4(caminho_origem, caminho_saida, nome_base, parent_widget=None):
         adicionar_log(f"Erro ao gerar MP4: {e}")
         return None
 
-def gerar_mp3(caminho_video, caminho_saida, nome_base, parent_widget=None):
+def gerar_mp3(caminho_video, caminho_saida, nome_base, parent_widget=None, execucao=None):
     try:
         caminho_audio = os.path.join(caminho_saida, f"audio_{nome_base}.mp3")
         if os.path.exists(caminho_audio):
@@ -166,16 +192,7 @@ def gerar_mp3(caminho_video, caminho_saida, nome_base, parent_widget=None):
             '-y',
             caminho_audio
         ]
-        startupinfo = None
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        processo = subprocess.run(
-            comando,
-            capture_output=True, text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            startupinfo=startupinfo
-        )
+        processo = executar_ffmpeg(comando, "conversao_mp3", execucao=execucao, origem=caminho_video, arquivo=caminho_audio)
         if processo.returncode == 0 and os.path.exists(caminho_audio):
             adicionar_log(f"MP3 extraído: {caminho_audio}")
             return caminho_audio
@@ -186,7 +203,7 @@ def gerar_mp3(caminho_video, caminho_saida, nome_base, parent_widget=None):
         adicionar_log(f"Erro ao gerar MP3: {e}")
         return None
 
-def converter_generico(cmd_args, output_path, log_success, log_fail, parent_widget=None):
+def converter_generico(cmd_args, output_path, log_success, log_fail, parent_widget=None, etapa="conversao", execucao=None):
     try:
         if os.path.exists(output_path):
             os.remove(output_path)
@@ -196,15 +213,7 @@ def converter_generico(cmd_args, output_path, log_success, log_fail, parent_widg
             adicionar_log("FFmpeg não encontrado na conversão.")
             return None
         comando = [ffmpeg_cmd] + cmd_args + ['-y', output_path]
-        startupinfo = None
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        processo = subprocess.run(
-            comando, capture_output=True, text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            startupinfo=startupinfo
-        )
+        processo = executar_ffmpeg(comando, etapa, execucao=execucao, arquivo=output_path)
         if processo.returncode == 0 and os.path.exists(output_path):
             adicionar_log(log_success.format(output_path))
             return output_path
@@ -215,136 +224,287 @@ def converter_generico(cmd_args, output_path, log_success, log_fail, parent_widg
         adicionar_log(f"{log_fail}: {e}")
         return None
 
-def converter_para_telefonia(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"telefonia_{nome_base}.wav")
-    cmd_args = [
-        '-i', caminho_audio, '-ar', '8000', '-ac', '1', '-acodec', 'pcm_s16le',
-        '-af', 'volume=3.0,highpass=f=300,lowpass=f=3400'
-    ]
+# Presets de áudio: id do formato -> parâmetros de saída do FFmpeg.
+# "filtro" é aplicado sobre o áudio do MP3 (que já recebeu volume=2.0).
+PRESETS_AUDIO = {
+    "3": {
+        "prefixo": "telefonia", "extensao": "wav",
+        "args": ['-ar', '8000', '-ac', '1', '-acodec', 'pcm_s16le'],
+        "filtro": "volume=3.0,highpass=f=300,lowpass=f=3400",
+        "log_sucesso": "Áudio convertido para telefonia: {}",
+        "log_falha": "Falha na conversão telefônica",
+    },
+    "4": {
+        "prefixo": "hq", "extensao": "flac",
+        "args": ['-c:a', 'flac', '-ar', '96000', '-bits_per_raw_sample', '24'],
+        "filtro": None,
+        "log_sucesso": "Áudio convertido para alta qualidade: {}",
+        "log_falha": "Falha na conversão para alta qualidade",
+    },
+    "5": {
+        "prefixo": "podcast", "extensao": "m4a",
+        "args": ['-c:a', 'aac', '-b:a', '192k', '-ar', '44100'],
+        "filtro": "loudnorm",
+        "log_sucesso": "Áudio convertido para podcast: {}",
+        "log_falha": "Falha na conversão para podcast",
+    },
+    "6": {
+        "prefixo": "stream", "extensao": "ogg",
+        "args": ['-c:a', 'libvorbis', '-q:a', '6', '-ar', '48000'],
+        "filtro": None,
+        "log_sucesso": "Áudio convertido para streaming: {}",
+        "log_falha": "Falha na conversão para streaming",
+    },
+    "7": {
+        "prefixo": "radio", "extensao": "wav",
+        "args": ['-ar', '44100', '-ac', '2', '-acodec', 'pcm_s16le'],
+        "filtro": "acompressor=threshold=-16dB:ratio=4,volume=2",
+        "log_sucesso": "Áudio convertido para rádio: {}",
+        "log_falha": "Falha na conversão para rádio",
+    },
+    "8": {
+        "prefixo": "whatsapp", "extensao": "ogg",
+        "args": ['-c:a', 'libopus', '-b:a', '128k', '-ar', '48000'],
+        "filtro": "volume=1.5",
+        "log_sucesso": "Áudio convertido para WhatsApp: {}",
+        "log_falha": "Falha na conversão para WhatsApp",
+    },
+}
+
+# Saídas geradas diretamente da origem (MP4 e MP3)
+SAIDA_MP4 = {
+    "prefixo": "video", "extensao": "mp4",
+    "args": ['-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k'],
+    "filtro": None,
+}
+SAIDA_MP3 = {
+    "prefixo": "audio", "extensao": "mp3",
+    "args": ['-acodec', 'libmp3lame', '-ab', '192k', '-ar', '44100'],
+    "filtro": "volume=2.0",
+}
+
+ORDEM_FORMATOS = [
+    "1", # MP4
+    "2", # MP3
+    "3", # Telefonia
+    "4", # Alta Qualidade
+    "5", # Podcast
+    "6", # Streaming
+    "7", # Rádio
+    "8"  # WhatsApp
+]
+
+def caminho_saida_formato(fmt, caminho_saida, nome_base):
+    if fmt == "1":
+        preset = SAIDA_MP4
+    elif fmt == "2":
+        preset = SAIDA_MP3
+    else:
+        preset = PRESETS_AUDIO[fmt]
+    return os.path.join(caminho_saida, f"{preset['prefixo']}_{nome_base}.{preset['extensao']}")
+
+def converter_preset(fmt, caminho_audio, caminho_saida, nome_base, parent_widget=None, execucao=None):
+    preset = PRESETS_AUDIO[fmt]
+    output_path = caminho_saida_formato(fmt, caminho_saida, nome_base)
+    cmd_args = ['-i', caminho_audio] + preset["args"]
+    if preset["filtro"]:
+        cmd_args += ['-af', preset["filtro"]]
     return converter_generico(cmd_args, output_path,
-        "Áudio convertido para telefonia: {}",
-        "Falha na conversão telefônica",
-        parent_widget)
+        preset["log_sucesso"],
+        preset["log_falha"],
+        parent_widget,
+        etapa=f"conversao_{preset['prefixo']}",
+        execucao=execucao)
+
+def converter_para_telefonia(caminho_audio, caminho_saida, nome_base, parent_widget=None):
+    return converter_preset("3", caminho_audio, caminho_saida, nome_base, parent_widget)
 
 def converter_para_alta_qualidade(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"hq_{nome_base}.flac")
-    cmd_args = [
-        '-i', caminho_audio, '-c:a', 'flac', '-ar', '96000', '-bits_per_raw_sample', '24'
-    ]
-    return converter_generico(cmd_args, output_path,
-        "Áudio convertido para alta qualidade: {}",
-        "Falha na conversão para alta qualidade",
-        parent_widget)
+    return converter_preset("4", caminho_audio, caminho_saida, nome_base, parent_widget)
 
 def converter_para_podcast(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"podcast_{nome_base}.m4a")
-    cmd_args = [
-        '-i', caminho_audio, '-c:a', 'aac', '-b:a', '192k', '-ar', '44100', '-af', 'loudnorm'
-    ]
-    return converter_generico(cmd_args, output_path,
-        "Áudio convertido para podcast: {}",
-        "Falha na conversão para podcast",
-        parent_widget)
+    return converter_preset("5", caminho_audio, caminho_saida, nome_base, parent_widget)
 
 def converter_para_streaming(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"stream_{nome_base}.ogg")
-    cmd_args = [
-        '-i', caminho_audio, '-c:a', 'libvorbis', '-q:a', '6', '-ar', '48000'
-    ]
-    return converter_generico(cmd_args, output_path,
-        "Áudio convertido para streaming: {}",
-        "Falha na conversão para streaming",
-        parent_widget)
+    return converter_preset("6", caminho_audio, caminho_saida, nome_base, parent_widget)
 
 def converter_para_radio(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"radio_{nome_base}.wav")
-    cmd_args = [
-        '-i', caminho_audio, '-ar', '44100', '-ac', '2', '-acodec', 'pcm_s16le',
-        '-af', 'acompressor=threshold=-16dB:ratio=4,volume=2'
-    ]
-    return converter_generico(cmd_args, output_path,
-        "Áudio convertido para rádio: {}",
-        "Falha na conversão para rádio",
-        parent_widget)
+    return converter_preset("7", caminho_audio, caminho_saida, nome_base, parent_widget)
 
 def converter_para_whatsapp(caminho_audio, caminho_saida, nome_base, parent_widget=None):
-    output_path = os.path.join(caminho_saida, f"whatsapp_{nome_base}.ogg")
-    cmd_args = [
-        '-i', caminho_audio, '-c:a', 'libopus', '-b:a', '128k', '-ar', '48000', '-af', 'volume=1.5'
-    ]
-    return converter_generico(cmd_args, output_path,
-        "Áudio convertido para WhatsApp: {}",
-        "Falha na conversão para WhatsApp",
-        parent_widget)
+    return converter_preset("8", caminho_audio, caminho_saida, nome_base, parent_widget)
+
+def montar_comando_passagem_unica(ffmpeg_cmd, caminho_origem, saidas):
+    """
+    Monta um único comando FFmpeg que decodifica a origem uma vez e, via asplit,
+    escreve todas as saídas. `saidas` é uma lista de (fmt, caminho_destino).
+    """
+    rotulos = [f"[s{i}]" for i in range(len(saidas))]
+    grafo = [f"[0:a:0]asplit={len(saidas)}{''.join(rotulos)}"]
+    mapas = []
+    for i, (fmt, destino) in enumerate(saidas):
+        if fmt == "1":
+            preset, filtros = SAIDA_MP4, []
+        elif fmt == "2":
+            preset, filtros = SAIDA_MP3, [SAIDA_MP3["filtro"]]
+        else:
+            # Os presets partiam do MP3, então herdam o ganho aplicado nele
+            preset = PRESETS_AUDIO[fmt]
+            filtros = [SAIDA_MP3["filtro"]] + ([preset["filtro"]] if preset["filtro"] else [])
+        cadeia = ",".join(filtros) if filtros else "anull"
+        grafo.append(f"[s{i}]{cadeia}[o{i}]")
+        mapa = []
+        if fmt == "1":
+            mapa += ['-map', '0:v?']
+        mapa += ['-map', f"[o{i}]"] + preset["args"] + [destino]
+        mapas += mapa
+    return [ffmpeg_cmd, '-y', '-i', caminho_origem, '-filter_complex', ";".join(grafo)] + mapas
+
+def converter_em_passagem_unica(caminho_origem, caminho_saida, nome_base, formatos, parent_widget=None,
+                                execucao=None, audio_s=None):
+    """
+    Gera todos os formatos em uma única invocação do FFmpeg.
+    Retorna {fmt: caminho} apenas com as saídas geradas com sucesso; se o FFmpeg falhar,
+    as saídas parciais são descartadas e o dicionário volta vazio.
+    """
+    if not formatos:
+        return {}
+    ffmpeg_cmd = garantir_ffmpeg(window_parent=parent_widget)
+    if not ffmpeg_cmd:
+        adicionar_log("FFmpeg não encontrado na conversão em passagem única.")
+        return {}
+    saidas = [(fmt, caminho_saida_formato(fmt, caminho_saida, nome_base)) for fmt in formatos]
+    for _, destino in saidas:
+        if os.path.exists(destino):
+            os.remove(destino)
+    comando = montar_comando_passagem_unica(ffmpeg_cmd, caminho_origem, saidas)
+    try:
+        adicionar_log(f"Conversão em passagem única iniciada: formatos={formatos}")
+        processo = executar_ffmpeg(
+            comando, "conversao_passagem_unica", execucao=execucao,
+            arquivo=caminho_origem, formatos=list(formatos), audio_s=audio_s
+        )
+    except Exception as e:
+        adicionar_log(f"Erro na conversão em passagem única: {e}")
+        return {}
+    gerados = {}
+    if processo.returncode == 0:
+        for fmt, destino in saidas:
+            if os.path.exists(destino) and os.path.getsize(destino) > 0:
+                gerados[fmt] = destino
+                adicionar_log(f"Arquivo gerado (passagem única): {destino}")
+    else:
+        adicionar_log(f"Falha na conversão em passagem única: {processo.stderr}")
+        for _, destino in saidas:
+            if os.path.exists(destino):
+                try:
+                    os.remove(destino)
+                except Exception:
+                    pass
+    return gerados
+
+def converter_formatos_individualmente(caminho_video, diretorio_saida, nome_base, formatos,
+                                      parent_widget=None, max_paralelo=None, callback_arquivo=None,
+                                      execucao=None):
+    """
+    Um processo FFmpeg por formato, executados em paralelo (no máximo `max_paralelo` ao mesmo tempo).
+    MP4 e MP3 partem da origem; os presets partem do MP3 e só são agendados quando ele existe.
+    `callback_arquivo(caminho)` é chamado assim que cada arquivo fica pronto.
+    """
+    if max_paralelo is None:
+        max_paralelo = limite_conversoes_paralelas()
+    presets = [fmt for fmt in formatos if fmt in PRESETS_AUDIO]
+    mp3_path = os.path.join(diretorio_saida, f"audio_{nome_base}.mp3")
+    gerados = {}
 
-def processar_video(origem, diretorio_saida, formatos_selecionados, parent_widget=None):
+    def agendar_presets(pool, futuros, mp3):
+        for fmt in presets:
+            futuro = pool.submit(converter_preset, fmt, mp3, diretorio_saida, nome_base, parent_widget, execucao)
+            futuros[futuro] = fmt
+
+    adicionar_log(f"Conversões em paralelo: formatos={formatos}, limite={max_paralelo}")
+    with ThreadPoolExecutor(max_workers=max_paralelo) as pool:
+        futuros = {}
+        if "1" in formatos:
+            futuros[pool.submit(gerar_mp4, caminho_video, diretorio_saida, nome_base, parent_widget, execucao)] = "1"
+        if "2" in formatos or (presets and not os.path.exists(mp3_path)):
+            futuros[pool.submit(gerar_mp3, caminho_video, diretorio_saida, nome_base, parent_widget, execucao)] = "2"
+        elif presets:
+            agendar_presets(pool, futuros, mp3_path)
+
+        while futuros:
+            concluidos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                fmt = futuros.pop(futuro)
+                try:
+                    caminho = futuro.result()
+                except Exception as e:
+                    adicionar_log(f"Erro na conversão do formato {fmt}: {e}")
+                    caminho = None
+                if fmt == "2" and presets:
+                    if caminho:
+                        agendar_presets(pool, futuros, caminho)
+                    else:
+                        adicionar_log("MP3 intermediário não gerado; presets de áudio ignorados.")
+                if caminho and fmt in formatos:
+                    gerados[fmt] = caminho
+                    if callback_arquivo:
+                        callback_arquivo(caminho)
+    return gerados
+
+def processar_video(origem, diretorio_saida, formatos_selecionados, parent_widget=None,
+                    max_paralelo=None, callback_arquivo=None):
     ffmpeg_cmd = garantir_ffmpeg(window_parent=parent_widget)
     if not ffmpeg_cmd:
         adicionar_log("FFmpeg não encontrado ao iniciar processamento de vídeo.")
         return None, None
+    execucao = nova_execucao()
 
     if verifica_arquivo_local(origem):
         nome_base = nome_base_entrada(origem)
         caminho_video = origem
     elif verifica_url(origem):
-        caminho_video, nome_base = baixar_do_youtube(origem, diretorio_saida, parent_widget=parent_widget)
+        with medir_etapa("download", execucao=execucao, origem=origem) as evento:
+            caminho_video, nome_base = baixar_do_youtube(origem, diretorio_saida, parent_widget=parent_widget)
+            evento["arquivo"] = caminho_video
+            if not caminho_video:
+                evento["status"] = "erro"
         if not caminho_video:
             return None, None
     else:
         adicionar_log("Fonte inválida. Forneça uma URL válida ou caminho de arquivo local.")
         return None, None
 
-    arquivos_gerados = []
-
-    ordem_formatos = [
-        "1", # MP4
-        "2", # MP3
-        "3", # Telefonia
-        "4", # Alta Qualidade
-        "5", # Podcast
-        "6", # Streaming
-        "7", # Rádio
-        "8"  # WhatsApp
-    ]
-    for fmt in ordem_formatos:
-        if fmt not in formatos_selecionados:
-            continue
-        if fmt == "1":
-            if caminho_video.lower().endswith(".mp4") and os.path.exists(caminho_video):
-                arquivos_gerados.append(caminho_video)
-                adicionar_log(f"Arquivo MP4 já existe: {caminho_video}")
-            else:
-                mp4 = gerar_mp4(caminho_video, diretorio_saida, nome_base, parent_widget=parent_widget)
-                if mp4:
-                    arquivos_gerados.append(mp4)
-        elif fmt == "2":
-            mp3 = gerar_mp3(caminho_video, diretorio_saida, nome_base, parent_widget=parent_widget)
-            if mp3:
-                arquivos_gerados.append(mp3)
-        else:
-            mp3_path = os.path.join(diretorio_saida, f"audio_{nome_base}.mp3")
-            if not os.path.exists(mp3_path):
-                mp3 = gerar_mp3(caminho_video, diretorio_saida, nome_base, parent_widget=parent_widget)
-                if not mp3:
-                    continue
-            else:
-                mp3 = mp3_path
-            if fmt == "3":
-                p = converter_para_telefonia(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            elif fmt == "4":
-                p = converter_para_alta_qualidade(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            elif fmt == "5":
-                p = converter_para_podcast(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            elif fmt == "6":
-                p = converter_para_streaming(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            elif fmt == "7":
-                p = converter_para_radio(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            elif fmt == "8":
-                p = converter_para_whatsapp(mp3, diretorio_saida, nome_base, parent_widget=parent_widget)
-            else:
-                p = None
-            if p:
-                arquivos_gerados.append(p)
+    pendentes = [fmt for fmt in ORDEM_FORMATOS if fmt in formatos_selecionados]
+    gerados = {}
+    if "1" in pendentes and caminho_video.lower().endswith(".mp4") and os.path.exists(caminho_video):
+        gerados["1"] = caminho_video
+        pendentes.remove("1")
+        adicionar_log(f"Arquivo MP4 já existe: {caminho_video}")
+        if callback_arquivo:
+            callback_arquivo(caminho_video)
+
+    # Uma única decodificação da origem para todas as saídas
+    if carregar_config().get("conversao_passagem_unica", True):
+        unica = converter_em_passagem_unica(
+            caminho_video, diretorio_saida, nome_base, pendentes, parent_widget=parent_widget,
+            execucao=execucao, audio_s=obter_duracao(caminho_video, ffmpeg_cmd) if pendentes else None
+        )
+        for fmt in ORDEM_FORMATOS:
+            if fmt in unica and callback_arquivo:
+                callback_arquivo(unica[fmt])
+        gerados.update(unica)
+
+    # O que falhou na passagem única é refeito formato a formato, de forma independente
+    restantes = [fmt for fmt in pendentes if fmt not in gerados]
+    if restantes:
+        adicionar_log(f"Convertendo individualmente os formatos: {restantes}")
+        gerados.update(converter_formatos_individualmente(
+            caminho_video, diretorio_saida, nome_base, restantes, parent_widget=parent_widget,
+            max_paralelo=max_paralelo, callback_arquivo=callback_arquivo, execucao=execucao
+        ))
+
+    arquivos_gerados = [gerados[fmt] for fmt in ORDEM_FORMATOS if fmt in gerados]
 
     if arquivos_gerados:
         adicionar_log(f"Processamento finalizado. Arquivos gerados: {arquivos_gerados}")
@@ -27,27 +27,31 @@ CONFIG_PATH = os.path.join(PASTA_SCRIPT, "config.json")
 
 class ConversaoWorker(QObject):
     finished = pyqtSignal(list)  # arquivos_convertidos
+    arquivo_pronto = pyqtSignal(str)  # emitido assim que cada arquivo é gerado
     log = pyqtSignal(str)
 
-    def __init__(self, origem, formatos, diretorio_saida, parent_widget=None):
+    def __init__(self, origem, formatos, diretorio_saida, parent_widget=None, max_paralelo=None):
         super().__init__()
         self.origem = origem
         self.formatos = formatos
         self.diretorio_saida = diretorio_saida
         self.parent_widget = parent_widget
+        self.max_paralelo = max_paralelo
+
+    def _arquivo_gerado(self, arquivo):
+        adicionar_log(f"Arquivo convertido: {arquivo}")
+        self.arquivo_pronto.emit(arquivo)
 
     def run(self):
         self.log.emit("Processando...\n")
         adicionar_log(f"Iniciando processamento de conversão: origem={self.origem}, formatos={self.formatos}")
         caminho_video, arquivos_gerados = processar_video(
-            self.origem, self.diretorio_saida, self.formatos, parent_widget=self.parent_widget
+            self.origem, self.diretorio_saida, self.formatos, parent_widget=self.parent_widget,
+            max_paralelo=self.max_paralelo, callback_arquivo=self._arquivo_gerado
         )
         if arquivos_gerados:
-            self.log.emit("Arquivos gerados:")
+            self.log.emit(f"\nConcluído: {len(arquivos_gerados)} arquivo(s) gerado(s).")
             adicionar_log(f"Arquivos gerados: {', '.join(os.path.basename(a) for a in arquivos_gerados)}")
-            for arquivo in arquivos_gerados:
-                self.log.emit(os.path.basename(arquivo))
-                adicionar_log(f"Arquivo convertido: {arquivo}")
             self.finished.emit(arquivos_gerados)
         else:
             self.log.emit("Erro: Nenhum arquivo foi gerado.")
@@ -157,10 +161,16 @@ class ConversaoTab(QWidget):
         self.edit_origem.setEnabled(False)
         adicionar_log("Processamento de conversão iniciado.")
 
+        self.arquivos_convertidos = []
+        self.config = self.carregar_config()
         self.thread = QThread()
-        self.worker = ConversaoWorker(origem, formatos, diretorio_saida, parent_widget=self)
+        self.worker = ConversaoWorker(
+            origem, formatos, diretorio_saida, parent_widget=self,
+            max_paralelo=self.config.get("conversao_max_paralelo")
+        )
         self.worker.moveToThread(self.thread)
         self.thread.started.connect(self.worker.run)
+        self.worker.arquivo_pronto.connect(self.arquivo_convertido)
         self.worker.finished.connect(self.conversao_finalizada)
         self.worker.log.connect(self.text_saida.append)
         self.worker.log.connect(adicionar_log)
@@ -169,6 +179,11 @@ class ConversaoTab(QWidget):
         self.thread.finished.connect(self.thread.deleteLater)
         self.thread.start()
 
+    def arquivo_convertido(self, arquivo):
+        if arquivo not in self.arquivos_convertidos:
+            self.arquivos_convertidos.append(arquivo)
+        self.text_saida.append(f"Pronto: {os.path.basename(arquivo)}")
+
     def conversao_finalizada(self, arquivos_gerados):
         self.arquivos_convertidos = arquivos_gerados
         self.btn_converter.setEnabled(True)
@@ -1,18 +1,30 @@
 import os
 import sys
+import json
+import time
+import threading
 import traceback
+from bisect import bisect_right
+from collections import OrderedDict
 
-from ffmpeg_utils import garantir_ffmpeg
+import numpy as np
+
+from ffmpeg_utils import garantir_ffmpeg, decodificar_pcm, ler_pcm_em_blocos, obter_duracao, TAXA_PCM
 
-import whisper
 from datetime import timedelta
-from diarizacao_resemblyzer import diarize_audio
-from erros_usuario import registrar_erro_usuario
-from PyQt6.QtCore import QCoreApplication
-import subprocess
+from diarizacao_resemblyzer import diarize_audio, EstadoFalantes
+from agrupamento_falantes import METODO_PADRAO
+from alinhamento import atribuir_por_sobreposicao, construir_turnos
+from decodificacao_whisper import transcrever_e_traduzir, traduzir_em_janelas, decodificar_janelas
+from vad_webrtc import filtrar_fala
+from cache_transcricoes import CACHE_TRANSCRICOES, hash_audio, hash_audio_em_fluxo
+from erros_usuario import registrar_erro_usuario, TranscricaoCancelada
+from metricas import medir_etapa, nova_execucao
+from indice_busca import INDICE_BUSCA, indexar_transcricao
+from checkpoints import CheckpointTrabalho, chave_trabalho, limpar_checkpoints_antigos
 
 # Importe a função global de log do programa
-from logs_tab import adicionar_log
+from registro_log import adicionar_log
 
 # --- CENTRALIZAÇÃO DOS ARQUIVOS NA PASTA DO APP ---
 def get_app_dir():
@@ -25,6 +37,44 @@ def get_app_dir():
         os.makedirs(app_dir, exist_ok=True)
     return app_dir
 
+def carregar_config():
+    config_path = os.path.join(get_app_dir(), "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+EXTENSOES_SUPORTADAS = ('.mp3', '.mp4', '.wav', '.m4a', '.ogg', '.flac')
+
+def expandir_caminhos(caminhos):
+    """Troca pastas pelos arquivos de áudio/vídeo suportados dentro delas (recursivo)."""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, nomes in os.walk(caminho):
+                for nome in sorted(nomes):
+                    if nome.lower().endswith(EXTENSOES_SUPORTADAS):
+                        arquivos.append(os.path.join(raiz, nome))
+        elif caminho.lower().endswith(EXTENSOES_SUPORTADAS):
+            arquivos.append(caminho)
+    return arquivos
+
+def nome_base_unico(caminho, nomes_em_uso):
+    """
+    Nome base da transcrição de `caminho` (nome do arquivo sem extensão) que não está em
+    `nomes_em_uso`: arquivos com o mesmo nome em pastas diferentes recebem _2, _3, ...
+    """
+    nome_base = os.path.splitext(os.path.basename(caminho))[0]
+    if nome_base not in nomes_em_uso:
+        return nome_base
+    sufixo = 2
+    while f"{nome_base}_{sufixo}" in nomes_em_uso:
+        sufixo += 1
+    return f"{nome_base}_{sufixo}"
+
 def format_timestamp(seconds):
     return str(timedelta(seconds=float(seconds))).split('.')[0]
 
@@ -55,8 +105,8 @@ def baixar_e_avisa_modelo(modelo, progresso_callback=None):
         if not os.path.exists(model_path):
             if progresso_callback:
                 progresso_callback(20, f"Baixando o modelo '{modelo}'. Isso pode demorar alguns minutos na primeira vez (internet necessária).")
-            QCoreApplication.processEvents()
             adicionar_log(f"Baixando o modelo '{modelo}'.")
+        import whisper
         model = whisper.load_model(modelo)
         if not os.path.exists(model_path) or os.path.getsize(model_path) < 1000000:
             adicionar_log(f"Falha ao baixar o modelo Whisper '{modelo}'.")
@@ -72,14 +122,567 @@ def baixar_e_avisa_modelo(modelo, progresso_callback=None):
             progresso_callback(100, f"Erro ao baixar/carregar modelo Whisper: {str(e)}")
         raise RuntimeError(f"Erro ao baixar/carregar modelo Whisper: {str(e)}")
 
-def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, progresso_callback=None, checar_cancelamento=None):
+def estimar_tamanho_modelo_mb(modelo):
+    # O checkpoint é salvo em fp16 e carregado em fp32: ~2x o tamanho em disco
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    model_path = os.path.join(cache_dir, "whisper", f"{modelo}.pt")
+    try:
+        return 2 * os.path.getsize(model_path) / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+def tamanho_modelo_mb(model):
+    try:
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        total += sum(b.numel() * b.element_size() for b in model.buffers())
+        return total / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+class CacheModelosWhisper:
+    """
+    Mantém os modelos Whisper carregados em memória, indexados pelo nome.
+    Respeita um orçamento de RAM (LRU) e descarrega modelos ociosos.
+    """
+
+    def __init__(self, orcamento_mb=None, ociosidade_s=None):
+        self._modelos = OrderedDict()  # nome -> {"modelo", "tamanho_mb", "ultimo_uso", "em_uso"}
+        self._lock = threading.RLock()
+        self._travas = {}  # nome -> Lock que serializa a decodificação em cada modelo
+        self._carregando = {}  # nome -> Event, enquanto uma thread carrega o modelo
+        self._timer = None
+        self._orcamento_mb = orcamento_mb
+        self._ociosidade_s = ociosidade_s
+        self.acertos = 0
+        self.faltas = 0
+
+    def orcamento_mb(self):
+        if self._orcamento_mb is not None:
+            return self._orcamento_mb
+        return float(carregar_config().get("cache_modelos_mb", 4096))
+
+    def ociosidade_s(self):
+        if self._ociosidade_s is not None:
+            return self._ociosidade_s
+        return float(carregar_config().get("cache_modelos_ociosidade_min", 10)) * 60
+
+    def obter(self, nome, progresso_callback=None):
+        """
+        Retorna o modelo (carregando se necessário). Chame liberar() ao terminar.
+        O lock global só protege o dicionário: a carga (disco ou download) roda fora dele,
+        e outras chamadas para o mesmo nome esperam por essa mesma carga.
+        """
+        while True:
+            with self._lock:
+                entrada = self._modelos.get(nome)
+                if entrada is not None:
+                    self._modelos.move_to_end(nome)
+                    entrada["ultimo_uso"] = time.monotonic()
+                    entrada["em_uso"] += 1
+                    self.acertos += 1
+                    adicionar_log(
+                        f"Cache de modelos: acerto para '{nome}' "
+                        f"(acertos={self.acertos}, faltas={self.faltas})."
+                    )
+                    return entrada["modelo"]
+                carregando = self._carregando.get(nome)
+                if carregando is None:
+                    carregando = self._carregando[nome] = threading.Event()
+                    self.faltas += 1
+                    adicionar_log(
+                        f"Cache de modelos: falta para '{nome}', carregando do disco "
+                        f"(acertos={self.acertos}, faltas={self.faltas})."
+                    )
+                    break
+            # Outra thread já está carregando este modelo: espera e tenta de novo
+            # (se aquela carga falhar, esta thread faz a própria tentativa)
+            adicionar_log(f"Cache de modelos: aguardando o carregamento de '{nome}'.")
+            carregando.wait()
+
+        try:
+            # Libera espaço antes de carregar, para não somar dois modelos grandes na RAM
+            self._aplicar_orcamento(reservar_mb=estimar_tamanho_modelo_mb(nome))
+            modelo = baixar_e_avisa_modelo(nome, progresso_callback)
+            tamanho = tamanho_modelo_mb(modelo)
+        except Exception:
+            with self._lock:
+                self.faltas -= 1
+                del self._carregando[nome]
+            carregando.set()
+            raise
+        with self._lock:
+            self._modelos[nome] = {
+                "modelo": modelo,
+                "tamanho_mb": tamanho,
+                "ultimo_uso": time.monotonic(),
+                "em_uso": 1,
+            }
+            del self._carregando[nome]
+        carregando.set()
+        self._aplicar_orcamento(manter=nome)
+        return modelo
+
+    def liberar(self, nome):
+        """Sinaliza que o modelo obtido com obter() não está mais em uso."""
+        with self._lock:
+            entrada = self._modelos.get(nome)
+            if entrada is not None and entrada["em_uso"] > 0:
+                entrada["em_uso"] -= 1
+                entrada["ultimo_uso"] = time.monotonic()
+        self._agendar_limpeza()
+
+    def trava(self, nome):
+        """
+        Lock do modelo `nome`. O decoder do Whisper instala hooks de kv-cache no próprio
+        modelo, então duas decodificações simultâneas na mesma instância não são seguras.
+        """
+        with self._lock:
+            return self._travas.setdefault(nome, threading.Lock())
+
+    def descarregar(self, nome=None):
+        with self._lock:
+            nomes = [nome] if nome else list(self._modelos.keys())
+            for n in nomes:
+                entrada = self._modelos.get(n)
+                if entrada is None or entrada["em_uso"] > 0:
+                    continue
+                del self._modelos[n]
+                adicionar_log(f"Cache de modelos: modelo '{n}' descarregado ({entrada['tamanho_mb']:.0f} MB).")
+        self._liberar_memoria()
+
+    def _aplicar_orcamento(self, manter=None, reservar_mb=0.0):
+        orcamento = self.orcamento_mb()
+        removidos = False
+        with self._lock:
+            total = sum(e["tamanho_mb"] for e in self._modelos.values()) + reservar_mb
+            for nome in list(self._modelos.keys()):
+                if total <= orcamento:
+                    break
+                entrada = self._modelos[nome]
+                if nome == manter or entrada["em_uso"] > 0:
+                    continue
+                del self._modelos[nome]
+                total -= entrada["tamanho_mb"]
+                removidos = True
+                adicionar_log(
+                    f"Cache de modelos: '{nome}' removido por LRU "
+                    f"(orçamento {orcamento:.0f} MB, em uso {total:.0f} MB)."
+                )
+        # gc.collect() e empty_cache() fora do lock: não seguram as outras transcrições
+        if removidos:
+            self._liberar_memoria()
+
+    def _agendar_limpeza(self):
+        ociosidade = self.ociosidade_s()
+        if ociosidade <= 0:
+            return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(ociosidade, self._limpar_ociosos)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _limpar_ociosos(self):
+        ociosidade = self.ociosidade_s()
+        agora = time.monotonic()
+        removidos = False
+        with self._lock:
+            for nome in list(self._modelos.keys()):
+                entrada = self._modelos[nome]
+                if entrada["em_uso"] == 0 and agora - entrada["ultimo_uso"] >= ociosidade:
+                    del self._modelos[nome]
+                    removidos = True
+                    adicionar_log(f"Cache de modelos: '{nome}' descarregado por ociosidade.")
+            restantes = bool(self._modelos)
+        if removidos:
+            self._liberar_memoria()
+        if restantes:
+            self._agendar_limpeza()
+
+    def _liberar_memoria(self):
+        import gc
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except Exception:
+            pass
+
+MODELOS_WHISPER = CacheModelosWhisper()
+
+PARAMETROS_DIARIZACAO = {"window": 1.5, "overlap": 0.75, "dbscan_eps": 0.6, "dbscan_min_samples": 3}
+
+def parametros_cache(modelo_escolhido, idioma, config, modo_blocos):
+    """Tudo o que muda o resultado além do próprio áudio entra na chave do cache."""
+    parametros = {
+        "modelo": modelo_escolhido,
+        "idioma": idioma or "auto",
+        "diarizacao": PARAMETROS_DIARIZACAO,
+        "agrupamento": config.get("diarizacao_agrupamento", METODO_PADRAO),
+        "vad": config.get("vad_agressividade", 2) if config.get("vad_ativo", True) else None,
+        "encoder_compartilhado": config.get("whisper_encoder_compartilhado", True),
+    }
+    if modo_blocos:
+        parametros["blocos"] = [config.get("bloco_duracao_min", 10), config.get("bloco_sobreposicao_s", 5)]
+    return parametros
+
+def restaurar_do_cache(entrada, pasta_transcricoes, nome_base):
+    """Regrava os arquivos de Transcricoes a partir de uma entrada do cache e devolve o texto da interface."""
+    caminho_transcr = os.path.join(pasta_transcricoes, f"transcricao_{nome_base}.txt")
+    with open(caminho_transcr, "w", encoding="utf-8") as f:
+        f.write(entrada["transcricao"])
+    adicionar_log(f"Transcrição (do cache) salva em: {caminho_transcr}")
+    indexar_transcricao(caminho_transcr)
+    if entrada.get("traducao") is not None:
+        caminho_trad = os.path.join(pasta_transcricoes, f"transcricao_{nome_base}_ingles.txt")
+        with open(caminho_trad, "w", encoding="utf-8") as f:
+            f.write(entrada["traducao"])
+        adicionar_log(f"Tradução em inglês (do cache) salva em: {caminho_trad}")
+    return entrada["texto_interface"]
+
+def guardar_no_cache(chave, pasta_transcricoes, nome_base, traduzir, texto_interface, caminho_origem):
+    if chave is None:
+        return
+    try:
+        caminho_transcr = os.path.join(pasta_transcricoes, f"transcricao_{nome_base}.txt")
+        with open(caminho_transcr, "r", encoding="utf-8") as f:
+            transcricao = f.read()
+        traducao = None
+        if traduzir:
+            with open(os.path.join(pasta_transcricoes, f"transcricao_{nome_base}_ingles.txt"), "r", encoding="utf-8") as f:
+                traducao = f.read()
+    except Exception as e:
+        adicionar_log(f"Cache de transcrições: não foi possível ler o resultado para salvar: {e}")
+        return
+    CACHE_TRANSCRICOES.salvar(chave, {
+        "arquivo_origem": caminho_origem,
+        "texto_interface": texto_interface,
+        "transcricao": transcricao,
+        "traducao": traducao,
+    })
+
+def linha_transcricao(segment, texto=None):
+    texto = segment['text'] if texto is None else texto
+    return f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {texto}\n\n"
+
+class CombinadorFalantes:
+    """
+    Junta as janelas da diarização em turnos de falante (construir_turnos) e dá a cada turno
+    o texto dos segmentos do Whisper atribuídos a ele; cada segmento entra em um único turno,
+    então nenhum texto sai repetido. Os segmentos chegam na ordem em que são decodificados e
+    só são devolvidos os turnos que já não podem receber texto (o Whisper já passou do fim
+    deles), para a transcrição ir para o disco e para a tela aos poucos.
+    """
+
+    def __init__(self, diarization, label_map):
+        self.turnos = construir_turnos(diarization)
+        self.inicios = [ini for ini, _, _ in self.turnos]
+        self.label_map = label_map
+        self.proximo = 0      # primeiro turno ainda não entregue
+        self.pendentes = []   # segmentos do Whisper ainda sem turno entregue
+
+    def adicionar(self, segmentos_whisper):
+        """Acrescenta segmentos decodificados e devolve os segmentos dos turnos que fecharam."""
+        self.pendentes.extend(segmentos_whisper)
+        if not self.pendentes:
+            return []
+        self.pendentes.sort(key=lambda seg: seg["start"])
+        # A decodificação é sequencial: nenhum segmento futuro começa antes deste. O último
+        # turno fica para finalizar(), que também recebe o texto que vier depois dele
+        limite = self.pendentes[-1]["start"]
+        fim = self.proximo
+        while fim < len(self.turnos) - 1 and self.turnos[fim][1] <= limite:
+            fim += 1
+        return self._entregar(fim)
+
+    def finalizar(self):
+        """Entrega todos os turnos restantes (chamar depois do último segmento)."""
+        return self._entregar(len(self.turnos))
+
+    def _entregar(self, fim):
+        if fim <= self.proximo:
+            return []
+        # Só os turnos que algum segmento pendente alcança (mais o seguinte, para o "mais próximo")
+        fim_pendentes = max((seg["end"] for seg in self.pendentes), default=0)
+        corte = max(fim, min(len(self.turnos), bisect_right(self.inicios, fim_pendentes) + 1))
+        candidatos = self.turnos[self.proximo:corte]
+        grupos = atribuir_por_sobreposicao([(ini, f) for ini, f, _ in candidatos], self.pendentes)
+        quantidade = fim - self.proximo
+        segments = []
+        for (_, _, speaker), indices in zip(candidatos[:quantidade], grupos[:quantidade]):
+            segment_text = " ".join(self.pendentes[j]["text"].strip() for j in indices).strip()
+            if segment_text:
+                speaker_label = self.label_map.get(speaker, "Speaker desconhecido") if speaker != "unknown" else "Speaker desconhecido"
+                # Tempos do texto de fato atribuído ao turno
+                segments.append({
+                    "speaker": speaker_label,
+                    "start": self.pendentes[indices[0]]["start"],
+                    "end": max(self.pendentes[j]["end"] for j in indices),
+                    "text": segment_text
+                })
+        entregues = {j for indices in grupos[:quantidade] for j in indices}
+        self.pendentes = [seg for j, seg in enumerate(self.pendentes) if j not in entregues]
+        self.proximo = fim
+        return segments
+
+def combinar_falantes(diarization, segmentos_whisper, label_map):
+    """Combinação de uma vez só (todos os segmentos do Whisper já decodificados)."""
+    combinador = CombinadorFalantes(diarization, label_map)
+    return combinador.adicionar(segmentos_whisper) + combinador.finalizar()
+
+class SaidaTranscricao:
+    """
+    Grava no arquivo da transcrição os segmentos prontos assim que saem (sem repetir o
+    segmento anterior) e repassa as linhas para a interface via `segmentos_callback`.
+    Com `guardar_linhas=False` (modo de blocos) as linhas ficam só no arquivo.
+    """
+
+    def __init__(self, arquivo, segmentos_callback=None, guardar_linhas=True):
+        self.arquivo = arquivo
+        self.segmentos_callback = segmentos_callback
+        self.ultimo_segmento = None
+        self.guardar_linhas = guardar_linhas
+        self.linhas = []
+
+    def publicar(self, segments):
+        """Grava os segmentos e devolve os que sobraram depois de remove_repeticoes."""
+        if self.ultimo_segmento is not None:
+            segments = remove_repeticoes([self.ultimo_segmento] + segments)[1:]
+        else:
+            segments = remove_repeticoes(segments)
+        if not segments:
+            return segments
+        linhas = [linha_transcricao(segment) for segment in segments]
+        self.arquivo.write("".join(linhas))
+        self.arquivo.flush()
+        if self.guardar_linhas:
+            self.linhas.extend(linhas)
+        self.ultimo_segmento = segments[-1]
+        if self.segmentos_callback:
+            self.segmentos_callback(linhas)
+        return segments
+
+def alinhar_traducao(segments, segmentos_traduzidos):
+    """Retorna pares (segmento, texto_traduzido) para os segmentos que receberam tradução."""
+    segmentos_traduzidos = sorted(segmentos_traduzidos, key=lambda seg: seg["start"])
+    intervalos = [(segment["start"], segment["end"]) for segment in segments]
+    pares = []
+    for segment, indices in zip(segments, atribuir_por_sobreposicao(intervalos, segmentos_traduzidos)):
+        translated_text = " ".join(segmentos_traduzidos[j]["text"].strip() for j in indices).strip()
+        if translated_text:
+            pares.append((segment, translated_text))
+    return pares
+
+def usar_modo_blocos(config, duracao):
+    limite_min = float(config.get("modo_blocos_acima_min", 60))
+    return duracao is not None and limite_min > 0 and duracao > limite_min * 60
+
+def transcrever_em_blocos(caminho_arquivo, ffmpeg_cmd, modelo_escolhido, idioma, config, duracao=None,
+                          progresso_callback=None, checar_cancelamento=None, execucao=None, segmentos_callback=None,
+                          checkpoint=None, nome_base=None):
+    """
+    Modo de memória limitada para arquivos longos: o PCM é lido do FFmpeg em blocos com
+    sobreposição e cada bloco passa por VAD, diarização e Whisper; os segmentos vão para o
+    disco (e para `segmentos_callback`) a cada janela do Whisper. Um trecho pertence ao bloco que contém o seu ponto
+    médio, e os falantes mantêm o rótulo entre blocos via EstadoFalantes.
+    Com `checkpoint` (CheckpointTrabalho) cada bloco concluído é registrado, e uma execução
+    interrompida continua a partir do bloco seguinte ao último registrado.
+    O texto não é acumulado em memória: a transcrição fica só no arquivo e o retorno é
+    uma mensagem curta de status.
+    """
+    pasta_transcricoes = os.path.join(get_app_dir(), "Transcricoes")
+    os.makedirs(pasta_transcricoes, exist_ok=True)
+    nome_base = nome_base or os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    caminho_transcr = os.path.join(pasta_transcricoes, f"transcricao_{nome_base}.txt")
+    caminho_trad = os.path.join(pasta_transcricoes, f"transcricao_{nome_base}_ingles.txt")
+
+    duracao_bloco = float(config.get("bloco_duracao_min", 10)) * 60
+    sobreposicao = float(config.get("bloco_sobreposicao_s", 5))
+    traduzir = idioma != "en"
+    idioma_whisper = idioma if idioma and idioma != "auto" else None
+    estado_falantes = EstadoFalantes()
+    label_map = {}
+    total_segmentos = 0
+    execucao = execucao or nova_execucao()
+
+    retomada = checkpoint.ultimo("bloco") if checkpoint else None
+    if retomada is not None:
+        tamanhos = [(caminho_transcr, retomada["bytes_transcricao"])]
+        if traduzir:
+            tamanhos.append((caminho_trad, retomada["bytes_traducao"]))
+        if all(os.path.exists(caminho) and os.path.getsize(caminho) >= tamanho for caminho, tamanho in tamanhos):
+            # Descarta o que o bloco interrompido chegou a gravar
+            for caminho, tamanho in tamanhos:
+                os.truncate(caminho, tamanho)
+            estado_falantes.restaurar(retomada["estado_falantes"])
+            label_map = dict(retomada["label_map"])
+            total_segmentos = retomada["total_segmentos"]
+            if retomada["idioma_whisper"]:
+                idioma_whisper = retomada["idioma_whisper"]
+            indexar_transcricao(caminho_transcr)
+            adicionar_log(
+                f"Checkpoint: retomando o modo em blocos após o bloco {retomada['numero']} "
+                f"({format_timestamp(retomada['fim_bloco'])})."
+            )
+        else:
+            adicionar_log("Checkpoint: arquivos de transcrição parciais ausentes ou alterados; recomeçando do início.")
+            checkpoint.limpar()
+            retomada = None
+
+    def etapa(nome, **campos):
+        return medir_etapa(nome, execucao=execucao, arquivo=caminho_arquivo, modo="blocos", **campos)
+
+    adicionar_log(
+        f"Modo em blocos: blocos de {duracao_bloco:.0f}s com {sobreposicao:.0f}s de sobreposição "
+        f"(duração do arquivo: {duracao or 0:.0f}s)."
+    )
+
+    def cancelar_se_pedido():
+        if checar_cancelamento and checar_cancelamento():
+            adicionar_log("Transcrição cancelada pelo usuário durante o modo em blocos.")
+            raise TranscricaoCancelada()
+
+    if progresso_callback:
+        progresso_callback(5, "Verificando modelo Whisper...")
+    with etapa("carga_modelo", modelo=modelo_escolhido):
+        modelo = MODELOS_WHISPER.obter(modelo_escolhido, progresso_callback)
+    modo_arquivo = "a" if retomada else "w"
+    try:
+        # Enquanto o arquivo cresce, só este laço indexa (bloco a bloco); a busca não o relê
+        with INDICE_BUSCA.em_gravacao(caminho_transcr), \
+             open(caminho_transcr, modo_arquivo, encoding="utf-8") as f_transcr, \
+             open(caminho_trad if traduzir else os.devnull, modo_arquivo, encoding="utf-8") as f_trad:
+            saida = SaidaTranscricao(f_transcr, segmentos_callback, guardar_linhas=False)
+            primeiro_bloco, inicio_leitura = 1, 0.0
+            if retomada:
+                saida.ultimo_segmento = retomada["ultimo_segmento"]
+                primeiro_bloco, inicio_leitura = retomada["numero"] + 1, retomada["fim_bloco"]
+            blocos = ler_pcm_em_blocos(
+                caminho_arquivo, ffmpeg_cmd, duracao_bloco, sobreposicao,
+                inicio_s=inicio_leitura, cancelar=checar_cancelamento
+            )
+            for numero, (inicio_audio, inicio_bloco, fim_bloco, audio) in enumerate(blocos, start=primeiro_bloco):
+                cancelar_se_pedido()
+                if progresso_callback:
+                    percentual = min(95, 10 + int(85 * fim_bloco / duracao)) if duracao else 50
+                    progresso_callback(
+                        percentual,
+                        f"Bloco {numero}: {format_timestamp(inicio_bloco)} -> {format_timestamp(fim_bloco)}"
+                    )
+
+                def no_bloco(inicio, fim):
+                    return inicio_bloco <= (inicio + fim) / 2 < fim_bloco
+
+                audio_s = len(audio) / TAXA_PCM
+                mapa_tempo = None
+                if config.get("vad_ativo", True):
+                    with etapa("vad", bloco=numero, audio_s=audio_s) as evento:
+                        audio, mapa_tempo = filtrar_fala(audio, agressividade=config.get("vad_agressividade", 2))
+                        evento["fala_s"] = round(len(audio) / TAXA_PCM, 3)
+
+                with etapa("diarizacao", bloco=numero, audio_s=len(audio) / TAXA_PCM):
+                    diarization = diarize_audio(
+                        audio, verbose=False, estado_falantes=estado_falantes,
+                        agrupamento=config.get("diarizacao_agrupamento", METODO_PADRAO),
+                        cancelar=checar_cancelamento, **PARAMETROS_DIARIZACAO
+                    )
+                if mapa_tempo:
+                    diarization = mapa_tempo.mapear_diarizacao(diarization)
+                diarization = [
+                    (ini + inicio_audio, fim + inicio_audio, falante)
+                    for ini, fim, falante in diarization
+                    if no_bloco(ini + inicio_audio, fim + inicio_audio)
+                ]
+
+                # Rótulos na ordem em que os falantes aparecem pela primeira vez
+                for _, _, falante in diarization:
+                    if falante != "unknown" and falante not in label_map:
+                        label_map[falante] = f"Speaker {len(label_map) + 1}"
+                combinador = CombinadorFalantes(diarization, label_map)
+
+                def no_audio_original(lista):
+                    if mapa_tempo:
+                        mapa_tempo.mapear_segmentos(lista)
+                    for seg in lista:
+                        seg["start"] += inicio_audio
+                        seg["end"] += inicio_audio
+                    return [seg for seg in lista if no_bloco(seg["start"], seg["end"])]
+
+                # Cada janela de 30 s decodificada já fecha os turnos que terminaram antes dela
+                segments, traduzidos = [], []
+                with MODELOS_WHISPER.trava(modelo_escolhido), \
+                     etapa("transcricao", bloco=numero, audio_s=len(audio) / TAXA_PCM, traducao_conjunta=traduzir):
+                    for janela in decodificar_janelas(modelo, audio, idioma_whisper, traduzir, cancelar=checar_cancelamento):
+                        if idioma_whisper is None:
+                            # O idioma detectado no primeiro bloco vale para os seguintes
+                            idioma_whisper = janela["idioma"]
+                        segments.extend(saida.publicar(combinador.adicionar(no_audio_original(janela["transcricao"]))))
+                        traduzidos.extend(no_audio_original(janela["traducao"]))
+                        cancelar_se_pedido()
+                segments.extend(saida.publicar(combinador.finalizar()))
+
+                with etapa("salvar", bloco=numero, segmentos=len(segments)):
+                    if traduzir:
+                        for segment, translated_text in alinhar_traducao(segments, traduzidos):
+                            f_trad.write(linha_transcricao(segment, translated_text))
+                        f_trad.flush()
+                    # O índice de busca cresce junto com o arquivo, bloco a bloco
+                    # Idempotente: apaga o que já estiver indexado deste bloco antes de inserir
+                    indexar_transcricao(
+                        caminho_transcr, segments, substituir=numero == 1, a_partir_de=inicio_bloco
+                    )
+                total_segmentos += len(segments)
+                adicionar_log(f"Bloco {numero} concluído: {len(segments)} segmentos gravados.")
+                if checkpoint:
+                    f_transcr.flush()
+                    f_trad.flush()
+                    checkpoint.registrar(
+                        "bloco", numero=numero, fim_bloco=fim_bloco,
+                        bytes_transcricao=os.fstat(f_transcr.fileno()).st_size,
+                        bytes_traducao=os.fstat(f_trad.fileno()).st_size if traduzir else 0,
+                        estado_falantes=estado_falantes.exportar(), label_map=label_map,
+                        ultimo_segmento=saida.ultimo_segmento, idioma_whisper=idioma_whisper,
+                        total_segmentos=total_segmentos,
+                    )
+
+            if total_segmentos == 0:
+                f_transcr.write("AVISO: Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.\n")
+                if traduzir:
+                    f_trad.write("WARNING: No speech segments were detected or all segments were filtered.\n")
+    finally:
+        MODELOS_WHISPER.liberar(modelo_escolhido)
+
+    adicionar_log(f"Transcrição salva em: {caminho_transcr}")
+    if traduzir:
+        adicionar_log(f"Tradução em inglês salva em: {caminho_trad}")
+    if progresso_callback:
+        progresso_callback(100, "Processo concluído!")
+    adicionar_log("Processo de transcrição finalizado.")
+    if total_segmentos == 0:
+        adicionar_log("Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.")
+        return "Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados."
+    return f"Transcrição concluída em modo de blocos: {total_segmentos} segmentos salvos no arquivo da transcrição."
+
+def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, progresso_callback=None, checar_cancelamento=None,
+                               segmentos_callback=None, nome_base=None):
+    """
+    Transcreve `caminho_arquivo` com falantes e grava Transcricoes/transcricao_<nome_base>.txt
+    (e a tradução em inglês). `nome_base` padrão: o nome do arquivo sem extensão; a fila
+    passa um nome próprio quando dois arquivos de pastas diferentes têm o mesmo nome.
+    """
     PASTA_SCRIPT = get_app_dir()
     PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
     if not os.path.exists(PASTA_TRANSCRICOES):
         os.makedirs(PASTA_TRANSCRICOES)
 
-    nome_base = os.path.splitext(os.path.basename(caminho_arquivo))[0]
-    caminho_audio_temp = None
+    nome_base = nome_base or os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    modelo_em_uso = None
+    execucao = nova_execucao()
+
+    def etapa(nome, **campos):
+        return medir_etapa(nome, execucao=execucao, arquivo=caminho_arquivo, **campos)
 
     try:
         adicionar_log(f"Iniciando transcrição para o arquivo '{caminho_arquivo}'.")
@@ -89,67 +692,126 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário antes da extração.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
 
-        ext = os.path.splitext(caminho_arquivo)[1].lower()
-        if ext not in ['.wav', '.flac']:
-            caminho_audio_temp = os.path.join(PASTA_SCRIPT, f"temp_{nome_base}.wav")
-            try:
-                def log_ffmpeg(msg):
-                    if progresso_callback:
-                        progresso_callback(2, msg)
-                    adicionar_log(f"FFmpeg: {msg}")
-                ffmpeg_cmd = garantir_ffmpeg(log_ffmpeg)
-                if not ffmpeg_cmd:
-                    registrar_erro_usuario(
-                        "Transcrição",
-                        "FFmpeg não encontrado ou falha ao baixar."
-                    )
-                    adicionar_log("FFmpeg não encontrado ou falha ao baixar.")
-                    raise RuntimeError("FFmpeg não encontrado.")
-                comando = [
-                    ffmpeg_cmd,
-                    '-i', caminho_arquivo,
-                    '-acodec', 'pcm_s16le',
-                    '-ac', '1',
-                    '-ar', '16000',
-                    '-y',
-                    caminho_audio_temp
-                ]
-                # ALTERAÇÃO: startupinfo + creationflags para garantir ocultação do CMD
-                startupinfo = None
-                if os.name == "nt":
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                processo = subprocess.run(
-                    comando,
-                    capture_output=True, text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-                    startupinfo=startupinfo
-                )
-                if processo.returncode != 0:
-                    registrar_erro_usuario(
-                        "Transcrição",
-                        "Falha ao extrair áudio do arquivo. Verifique se o arquivo é válido e se o FFmpeg está instalado."
-                    )
-                    adicionar_log(f"Erro ao extrair áudio com FFmpeg: {processo.stderr}")
-                    raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + processo.stderr)
-                caminho_arquivo_para_diarizacao = caminho_audio_temp
-                adicionar_log(f"Arquivo convertido para WAV temporário: {caminho_audio_temp}")
-            except Exception as e:
+        # Uma única decodificação: o PCM de 16 kHz fica em memória e é entregue
+        # como array à diarização e ao Whisper, sem WAV temporário
+        try:
+            def log_ffmpeg(msg):
+                if progresso_callback:
+                    progresso_callback(2, msg)
+                adicionar_log(f"FFmpeg: {msg}")
+            ffmpeg_cmd = garantir_ffmpeg(log_callback=log_ffmpeg)
+            if not ffmpeg_cmd:
                 registrar_erro_usuario(
                     "Transcrição",
-                    "Falha ao extrair áudio do arquivo. Verifique se o arquivo é válido e se o FFmpeg está instalado."
+                    "FFmpeg não encontrado ou falha ao baixar."
                 )
-                adicionar_log(f"Erro ao extrair áudio com FFmpeg: {str(e)}")
-                raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + str(e))
-        else:
-            caminho_arquivo_para_diarizacao = caminho_arquivo
-            adicionar_log(f"Arquivo já está em formato suportado (WAV/FLAC): {caminho_arquivo}")
+                adicionar_log("FFmpeg não encontrado ou falha ao baixar.")
+                raise RuntimeError("FFmpeg não encontrado.")
+        except Exception as e:
+            registrar_erro_usuario(
+                "Transcrição",
+                "Falha ao extrair áudio do arquivo. Verifique se o arquivo é válido e se o FFmpeg está instalado."
+            )
+            adicionar_log(f"Erro ao extrair áudio com FFmpeg: {str(e)}")
+            raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + str(e))
+
+        # Arquivos longos vão para o modo em blocos, com uso de memória constante
+        config = carregar_config()
+        with etapa("duracao") as evento:
+            duracao = obter_duracao(caminho_arquivo, ffmpeg_cmd)
+            evento["audio_s"] = duracao
+        modo_blocos = usar_modo_blocos(config, duracao)
+        traduzir = idioma != "en"
+        usar_cache = CACHE_TRANSCRICOES.limite_mb() > 0
+        parametros = parametros_cache(modelo_escolhido, idioma, config, modo_blocos)
+        # Etapas concluídas vão para um diário em disco: se o trabalho cair ou for
+        # cancelado, a próxima execução com o mesmo arquivo e parâmetros continua dali
+        ckpt = None
+        if config.get("checkpoints_ativos", True):
+            limpar_checkpoints_antigos()
+            ckpt = CheckpointTrabalho(chave_trabalho(caminho_arquivo, parametros))
+        if modo_blocos:
+            chave = None
+            if usar_cache:
+                # O hash do PCM é calculado em fluxo para não carregar o arquivo inteiro
+                if progresso_callback:
+                    progresso_callback(3, "Verificando cache de transcrições")
+                with etapa("cache", audio_s=duracao, modo="blocos") as evento:
+                    chave = CACHE_TRANSCRICOES.chave(
+                        hash_audio_em_fluxo(caminho_arquivo, ffmpeg_cmd, cancelar=checar_cancelamento), parametros
+                    )
+                    entrada = CACHE_TRANSCRICOES.obter(chave)
+                    evento["acerto"] = entrada is not None
+                if entrada is not None:
+                    if ckpt:
+                        ckpt.limpar()
+                    if progresso_callback:
+                        progresso_callback(100, "Transcrição recuperada do cache")
+                    return restaurar_do_cache(entrada, PASTA_TRANSCRICOES, nome_base)
+            texto_interface = transcrever_em_blocos(
+                caminho_arquivo, ffmpeg_cmd, modelo_escolhido, idioma, config, duracao,
+                progresso_callback, checar_cancelamento, execucao, segmentos_callback, ckpt, nome_base
+            )
+            guardar_no_cache(chave, PASTA_TRANSCRICOES, nome_base, traduzir, texto_interface, caminho_arquivo)
+            if ckpt:
+                ckpt.limpar()
+            return texto_interface
+
+        try:
+            audio = ckpt.carregar_array("audio") if ckpt else None
+            if audio is not None:
+                # Gravado como int16: a volta para float32 reproduz o PCM decodificado exatamente
+                audio = audio.astype(np.float32) / 32768.0
+                adicionar_log("Checkpoint: áudio extraído reaproveitado.")
+            else:
+                with etapa("extracao") as evento:
+                    audio = decodificar_pcm(caminho_arquivo, ffmpeg_cmd, cancelar=checar_cancelamento)
+                    evento["audio_s"] = len(audio) / TAXA_PCM
+                    evento["ffmpeg_codigo_saida"] = 0
+                if ckpt:
+                    ckpt.salvar_array("audio", np.round(audio * 32768.0).clip(-32768, 32767).astype(np.int16))
+        except TranscricaoCancelada:
+            adicionar_log("Transcrição cancelada pelo usuário durante a extração; FFmpeg encerrado.")
+            raise
+        except Exception as e:
+            registrar_erro_usuario(
+                "Transcrição",
+                "Falha ao extrair áudio do arquivo. Verifique se o arquivo é válido e se o FFmpeg está instalado."
+            )
+            adicionar_log(f"Erro ao extrair áudio com FFmpeg: {str(e)}")
+            raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + str(e))
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário após extração.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
+
+        # O cache é indexado pelo áudio decodificado: o mesmo conteúdo com outro nome,
+        # pasta ou contêiner reaproveita o resultado
+        audio_s = len(audio) / TAXA_PCM
+        chave = None
+        if usar_cache:
+            with etapa("cache", audio_s=audio_s) as evento:
+                chave = CACHE_TRANSCRICOES.chave(hash_audio(audio).hexdigest(), parametros)
+                entrada = CACHE_TRANSCRICOES.obter(chave)
+                evento["acerto"] = entrada is not None
+            if entrada is not None:
+                if ckpt:
+                    ckpt.limpar()
+                if progresso_callback:
+                    progresso_callback(100, "Transcrição recuperada do cache")
+                return restaurar_do_cache(entrada, PASTA_TRANSCRICOES, nome_base)
+
+        # Pré-filtro de voz: diarização e Whisper recebem só os trechos com fala;
+        # os tempos são convertidos de volta para a linha do tempo original pelo mapa
+        mapa_tempo = None
+        if config.get("vad_ativo", True):
+            if progresso_callback:
+                progresso_callback(7, "Detectando trechos com fala")
+            with etapa("vad", audio_s=audio_s) as evento:
+                audio, mapa_tempo = filtrar_fala(audio, agressividade=config.get("vad_agressividade", 2))
+                evento["fala_s"] = round(len(audio) / TAXA_PCM, 3)
 
         if progresso_callback:
             progresso_callback(10, "Diarizando falantes")
@@ -157,9 +819,25 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário antes da diarização.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
 
-        diarization = diarize_audio(caminho_arquivo_para_diarizacao, verbose=True)
+        registro = ckpt.ultimo("diarizacao") if ckpt else None
+        if registro is not None:
+            diarization = [tuple(janela) for janela in registro["janelas"]]
+            adicionar_log("Checkpoint: diarização reaproveitada.")
+        else:
+            with etapa("diarizacao", audio_s=len(audio) / TAXA_PCM) as evento:
+                diarization = diarize_audio(
+                    audio, verbose=True, agrupamento=config.get("diarizacao_agrupamento", METODO_PADRAO),
+                    embeddings=ckpt.carregar_array("embeddings") if ckpt else None,
+                    embeddings_callback=(lambda e: ckpt.salvar_array("embeddings", e)) if ckpt else None,
+                    cancelar=checar_cancelamento, **PARAMETROS_DIARIZACAO
+                )
+                evento["janelas"] = len(diarization)
+            if mapa_tempo:
+                diarization = mapa_tempo.mapear_diarizacao(diarization)
+            if ckpt:
+                ckpt.registrar("diarizacao", janelas=[[float(ini), float(fim), falante] for ini, fim, falante in diarization])
         adicionar_log("Diarização concluída.")
 
         if progresso_callback:
@@ -167,7 +845,7 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário após diarização.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
 
         if progresso_callback:
             progresso_callback(50, "Verificando modelo Whisper...")
@@ -175,10 +853,12 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário antes do carregamento do modelo Whisper.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
 
         try:
-            modelo = baixar_e_avisa_modelo(modelo_escolhido, progresso_callback)
+            with etapa("carga_modelo", modelo=modelo_escolhido):
+                modelo = MODELOS_WHISPER.obter(modelo_escolhido, progresso_callback)
+            modelo_em_uso = modelo_escolhido
         except Exception as e:
             registrar_erro_usuario(
                 "Transcrição",
@@ -191,84 +871,121 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if checar_cancelamento and checar_cancelamento():
             adicionar_log("Transcrição cancelada pelo usuário após carregamento do modelo Whisper.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            raise TranscricaoCancelada()
 
         kwargs = {}
         if idioma and idioma != "auto":
             kwargs["language"] = idioma
             adicionar_log(f"Idioma definido para transcrição: {idioma}")
 
-        try:
-            adicionar_log("Iniciando transcrição com Whisper.")
-            resultado = modelo.transcribe(caminho_arquivo_para_diarizacao, **kwargs)
-        except Exception as e:
-            registrar_erro_usuario(
-                "Transcrição",
-                "Falha ao transcrever áudio. Possível erro no Whisper ou arquivo corrompido."
-            )
-            adicionar_log(f"Falha ao transcrever áudio: {str(e)}")
-            print(traceback.format_exc())
-            raise
+        # Os turnos de falante já são conhecidos: cada janela decodificada pelo Whisper fecha
+        # os turnos anteriores a ela, que vão logo para o arquivo e para a interface
+        speakers_detected = sorted(set([d[2] for d in diarization if d[2] != "unknown"]))
+        label_map = {speaker: f"Speaker {i+1}" for i, speaker in enumerate(speakers_detected)}
+        combinador = CombinadorFalantes(diarization, label_map)
+        segments = []
+        caminho_transcr = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}.txt")
 
-        if progresso_callback:
-            progresso_callback(80, "Transcrição concluída")
-        adicionar_log("Transcrição concluída.")
+        # Com o encoder compartilhado, cada janela de 30 s é codificada uma vez e
+        # a tradução reaproveita as mesmas features (só o decoder roda de novo)
+        encoder_compartilhado = config.get("whisper_encoder_compartilhado", True)
+        resultado_traduzido = None
+        # Janelas do Whisper já decodificadas numa execução interrompida
+        janelas_prontas = ckpt.todos("janela") if ckpt else []
+        seek_retomada = janelas_prontas[-1]["proximo_seek"] if janelas_prontas else 0
+        if janelas_prontas:
+            adicionar_log(f"Checkpoint: retomando o Whisper após {len(janelas_prontas)} janela(s) já decodificada(s).")
+        with INDICE_BUSCA.em_gravacao(caminho_transcr), open(caminho_transcr, "w", encoding="utf-8") as f_transcr:
+            saida = SaidaTranscricao(f_transcr, segmentos_callback)
 
-        if checar_cancelamento and checar_cancelamento():
-            adicionar_log("Transcrição cancelada pelo usuário após transcrição.")
-            raise Exception("Transcrição cancelada pelo usuário.")
+            def janela_decodificada(janela):
+                if ckpt and janela["seek"] >= seek_retomada:
+                    ckpt.registrar("janela", **janela)
+                # Cópias: resultado["segments"] ainda é mapeado inteiro depois, para a tradução
+                novos = [dict(seg) for seg in janela["transcricao"]]
+                if mapa_tempo:
+                    mapa_tempo.mapear_segmentos(novos)
+                segments.extend(saida.publicar(combinador.adicionar(novos)))
 
-        if progresso_callback:
-            progresso_callback(85, "Combinando falantes e transcrição")
-        adicionar_log("Combinando falantes e transcrição.")
+            try:
+                adicionar_log("Iniciando transcrição com Whisper.")
+                with MODELOS_WHISPER.trava(modelo_escolhido), \
+                     etapa("transcricao", audio_s=len(audio) / TAXA_PCM, modelo=modelo_escolhido,
+                           traducao_conjunta=encoder_compartilhado and traduzir):
+                    # Sem o encoder compartilhado a tradução é uma segunda passada, depois;
+                    # nos dois casos a transcrição sai janela a janela e pode ser cancelada
+                    if encoder_compartilhado and traduzir and progresso_callback:
+                        progresso_callback(55, "Transcrevendo e traduzindo")
+                    resultado, resultado_traduzido = transcrever_e_traduzir(
+                        modelo, audio, kwargs.get("language"), traduzir=encoder_compartilhado and traduzir,
+                        janela_callback=janela_decodificada, janelas_anteriores=janelas_prontas,
+                        cancelar=checar_cancelamento
+                    )
+            except TranscricaoCancelada:
+                adicionar_log("Transcrição cancelada pelo usuário durante o Whisper.")
+                raise
+            except Exception as e:
+                registrar_erro_usuario(
+                    "Transcrição",
+                    "Falha ao transcrever áudio. Possível erro no Whisper ou arquivo corrompido."
+                )
+                adicionar_log(f"Falha ao transcrever áudio: {str(e)}")
+                print(traceback.format_exc())
+                raise
 
-        speakers_detected = sorted(set([d[2] for d in diarization if d[2] != "unknown"]))
-        label_map = {speaker: f"Speaker {i+1}" for i, speaker in enumerate(speakers_detected)}
+            if mapa_tempo:
+                mapa_tempo.mapear_segmentos(resultado["segments"])
+                if resultado_traduzido:
+                    mapa_tempo.mapear_segmentos(resultado_traduzido["segments"])
+
+            if progresso_callback:
+                progresso_callback(80, "Transcrição concluída")
+            adicionar_log("Transcrição concluída.")
 
-        segments = []
-        for seg_start, seg_end, speaker in diarization:
             if checar_cancelamento and checar_cancelamento():
-                adicionar_log("Transcrição cancelada pelo usuário durante combinação de falantes.")
-                raise Exception("Transcrição cancelada pelo usuário.")
-            segment_text = ""
-            for segment in resultado["segments"]:
-                whisper_start = segment["start"]
-                whisper_end = segment["end"]
-                if (whisper_start <= seg_end and whisper_end >= seg_start):
-                    segment_text += " " + segment["text"]
-            if segment_text.strip():
-                speaker_label = label_map.get(speaker, "Speaker desconhecido") if speaker != "unknown" else "Speaker desconhecido"
-                segments.append({
-                    "speaker": speaker_label,
-                    "start": seg_start,
-                    "end": seg_end,
-                    "text": segment_text.strip()
-                })
-        segments = remove_repeticoes(segments)
-        adicionar_log(f"Segmentos processados: {len(segments)}")
+                adicionar_log("Transcrição cancelada pelo usuário após transcrição.")
+                raise TranscricaoCancelada()
 
-        if progresso_callback:
-            progresso_callback(90, "Salvando transcrição")
-        caminho_transcr = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}.txt")
-        with open(caminho_transcr, "w", encoding="utf-8") as f:
-            if not segments or len(segments) == 0:
-                mensagem = "AVISO: Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.\n"
-                f.write(mensagem)
-            else:
-                for segment in segments:
-                    f.write(f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {segment['text']}\n\n")
+            if progresso_callback:
+                progresso_callback(85, "Combinando falantes e transcrição")
+            adicionar_log("Combinando falantes e transcrição.")
+
+            with etapa("combinacao") as evento:
+                segments.extend(saida.publicar(combinador.finalizar()))
+                evento["segmentos"] = len(segments)
+            adicionar_log(f"Segmentos processados: {len(segments)}")
+
+            if progresso_callback:
+                progresso_callback(90, "Salvando transcrição")
+            with etapa("salvar"):
+                if not segments:
+                    f_transcr.write("AVISO: Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.\n")
         adicionar_log(f"Transcrição salva em: {caminho_transcr}")
+        indexar_transcricao(caminho_transcr, segments)
 
-        if idioma != "en":
+        if traduzir:
             if progresso_callback:
                 progresso_callback(92, "Traduzindo para o inglês")
             adicionar_log("Traduzindo para o inglês.")
 
             if checar_cancelamento and checar_cancelamento():
                 adicionar_log("Transcrição cancelada pelo usuário durante tradução.")
-                raise Exception("Transcrição cancelada pelo usuário.")
+                raise TranscricaoCancelada()
 
-            resultado_traduzido = modelo.transcribe(caminho_arquivo_para_diarizacao, task="translate", **kwargs)
+            if resultado_traduzido is None:
+                registro = ckpt.ultimo("traducao") if ckpt else None
+                if registro is not None:
+                    resultado_traduzido = registro["resultado"]
+                else:
+                    with MODELOS_WHISPER.trava(modelo_escolhido), \
+                         etapa("traducao", audio_s=len(audio) / TAXA_PCM, modelo=modelo_escolhido):
+                        resultado_traduzido = traduzir_em_janelas(
+                            modelo, audio, resultado["language"], cancelar=checar_cancelamento
+                        )
+                    if ckpt:
+                        ckpt.registrar("traducao", resultado=resultado_traduzido)
+                if mapa_tempo:
+                    mapa_tempo.mapear_segmentos(resultado_traduzido["segments"])
             if progresso_callback:
                 progresso_callback(95, "Salvando tradução em inglês")
             caminho_trad = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}_ingles.txt")
@@ -277,14 +994,8 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
                     mensagem = "WARNING: No speech segments were detected or all segments were filtered.\n"
                     f.write(mensagem)
                 else:
-                    for segment in segments:
-                        translated_text = ""
-                        for trans_segment in resultado_traduzido["segments"]:
-                            if (trans_segment["start"] <= segment["end"] and 
-                                trans_segment["end"] >= segment["start"]):
-                                translated_text += " " + trans_segment["text"]
-                        if translated_text.strip():
-                            f.write(f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {translated_text.strip()}\n\n")
+                    for segment, translated_text in alinhar_traducao(segments, resultado_traduzido["segments"]):
+                        f.write(linha_transcricao(segment, translated_text))
             adicionar_log(f"Tradução em inglês salva em: {caminho_trad}")
 
         if progresso_callback:
@@ -293,23 +1004,23 @@ def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, p
 
         if not segments or len(segments) == 0:
             adicionar_log("Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.")
-            return "Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados."
+            texto_interface = "Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados."
         else:
-            texto_interface = ""
-            for segment in segments:
-                texto_interface += f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {segment['text']}\n\n"
+            texto_interface = "".join(saida.linhas)
             adicionar_log("Transcrição de texto pronta para interface.")
-            return texto_interface
+        guardar_no_cache(chave, PASTA_TRANSCRICOES, nome_base, traduzir, texto_interface, caminho_arquivo)
+        if ckpt:
+            # Resultado final salvo: o checkpoint não serve mais
+            ckpt.limpar()
+        return texto_interface
 
+    except TranscricaoCancelada:
+        raise
     except Exception as e:
         registrar_erro_usuario("Transcrição", f"Erro inesperado: {str(e)}")
         adicionar_log(f"Erro inesperado na transcrição: {str(e)}")
         print(traceback.format_exc())
         raise
     finally:
-        if caminho_audio_temp and os.path.exists(caminho_audio_temp):
-            try:
-                os.remove(caminho_audio_temp)
-                adicionar_log(f"Arquivo temporário removido: {caminho_audio_temp}")
-            except Exception:
-                adicionar_log(f"Falha ao remover arquivo temporário: {caminho_audio_temp}")
\ No newline at end of file
+        if modelo_em_uso:
+            MODELOS_WHISPER.liberar(modelo_em_uso)
@@ -5,14 +5,15 @@ import shutil
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, QComboBox,
-    QLineEdit, QPushButton, QHBoxLayout, QMessageBox, QSpinBox, QFormLayout
+    QLineEdit, QPushButton, QHBoxLayout, QMessageBox, QSpinBox, QFormLayout, QCheckBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 
 from Transcricao_tab_V3 import TranscricaoTab
 from Transcricao_conversao_tab_V3 import ConversaoTab
-from logs_tab import LogsTab, adicionar_log
+from logs_tab import LogsTab, adicionar_log, global_log_signal
+from registro_log import FluxoLog, definir_nivel, configurar_rotacao
 
 APP_FOLDER_NAME = "ProcessadorDeAudioVideo"
 
@@ -37,8 +38,8 @@ def get_app_dir():
 
 PASTA_SCRIPT = get_app_dir()
 CONFIG_PATH = os.path.join(PASTA_SCRIPT, "config.json")
-log_path = os.path.join(PASTA_SCRIPT, 'output.log')
-sys.stdout = open(log_path, 'a', encoding='utf-8', buffering=1)
+# print() e tracebacks das bibliotecas vão para o output.log pelo mesmo escritor em lote do log
+sys.stdout = FluxoLog()
 sys.stderr = sys.stdout
 
 if getattr(sys, 'frozen', False):
@@ -60,10 +61,12 @@ def log_interface(mensagem: str):
     from datetime import datetime
     hora = datetime.now().strftime("[%H:%M:%S]")
     s = f"{hora} {mensagem}"
+    # adicionar_log_console já grava no log; o stdout também vai para o output.log,
+    # então não há print aqui para não duplicar a linha
     if transcricao_tab_global:
         transcricao_tab_global.adicionar_log_console(s)
-    adicionar_log(s)
-    print(s)
+    else:
+        adicionar_log(s)
 
 IDIOMAS = [
     ("auto", "Detectar automático"),
@@ -79,10 +82,25 @@ def garantir_config():
         config_padrao = {
             "modelo": "small",
             "idioma": "auto",
-            "max_historico": 20,
             "aviso_tamanho_mb": 300,
             "tema": "escuro",
-            "tamanho_fonte_transcricao": 14
+            "tamanho_fonte_transcricao": 14,
+            "cache_modelos_mb": 4096,
+            "cache_modelos_ociosidade_min": 10,
+            "conversao_max_paralelo": max(1, (os.cpu_count() or 2) // 2),
+            "whisper_encoder_compartilhado": True,
+            "vad_ativo": True,
+            "vad_agressividade": 2,
+            "modo_blocos_acima_min": 60,
+            "bloco_duracao_min": 10,
+            "bloco_sobreposicao_s": 5,
+            "cache_transcricoes_mb": 200,
+            "transcricao_max_paralelo": 1,
+            "log_nivel": "INFO",
+            "log_limite_mb": 10,
+            "log_arquivos_mantidos": 3,
+            "diarizacao_agrupamento": "dbscan",
+            "checkpoints_ativos": True
         }
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
             json.dump(config_padrao, f, indent=2, ensure_ascii=False)
@@ -100,6 +118,54 @@ def garantir_config():
             if "tamanho_fonte_transcricao" not in config_atual:
                 config_atual["tamanho_fonte_transcricao"] = 14
                 alterado = True
+            if "cache_modelos_mb" not in config_atual:
+                config_atual["cache_modelos_mb"] = 4096
+                alterado = True
+            if "cache_modelos_ociosidade_min" not in config_atual:
+                config_atual["cache_modelos_ociosidade_min"] = 10
+                alterado = True
+            if "conversao_max_paralelo" not in config_atual:
+                config_atual["conversao_max_paralelo"] = max(1, (os.cpu_count() or 2) // 2)
+                alterado = True
+            if "whisper_encoder_compartilhado" not in config_atual:
+                config_atual["whisper_encoder_compartilhado"] = True
+                alterado = True
+            if "vad_ativo" not in config_atual:
+                config_atual["vad_ativo"] = True
+                alterado = True
+            if "vad_agressividade" not in config_atual:
+                config_atual["vad_agressividade"] = 2
+                alterado = True
+            if "modo_blocos_acima_min" not in config_atual:
+                config_atual["modo_blocos_acima_min"] = 60
+                alterado = True
+            if "bloco_duracao_min" not in config_atual:
+                config_atual["bloco_duracao_min"] = 10
+                alterado = True
+            if "bloco_sobreposicao_s" not in config_atual:
+                config_atual["bloco_sobreposicao_s"] = 5
+                alterado = True
+            if "cache_transcricoes_mb" not in config_atual:
+                config_atual["cache_transcricoes_mb"] = 200
+                alterado = True
+            if "transcricao_max_paralelo" not in config_atual:
+                config_atual["transcricao_max_paralelo"] = 1
+                alterado = True
+            if "log_nivel" not in config_atual:
+                config_atual["log_nivel"] = "INFO"
+                alterado = True
+            if "log_limite_mb" not in config_atual:
+                config_atual["log_limite_mb"] = 10
+                alterado = True
+            if "log_arquivos_mantidos" not in config_atual:
+                config_atual["log_arquivos_mantidos"] = 3
+                alterado = True
+            if "diarizacao_agrupamento" not in config_atual:
+                config_atual["diarizacao_agrupamento"] = "dbscan"
+                alterado = True
+            if "checkpoints_ativos" not in config_atual:
+                config_atual["checkpoints_ativos"] = True
+                alterado = True
             if alterado:
                 with open(CONFIG_PATH, "w", encoding="utf-8") as f:
                     json.dump(config_atual, f, indent=2, ensure_ascii=False)
@@ -170,6 +236,10 @@ def get_dark_stylesheet():
             background: #232e33 !important;
             color: #e4ede6;
         }
+        QListView#VisualizadorTranscricao {
+            background: #232e33;
+            color: #e4ede6;
+        }
         QPlainTextEdit#ConsoleLog {
             background: #1a2320 !important;
             color: #a2ff9b;
@@ -283,6 +353,10 @@ def get_light_stylesheet():
             background: #fff !important;
             color: #23272b;
         }
+        QListView#VisualizadorTranscricao {
+            background: #fff;
+            color: #23272b;
+        }
         QPlainTextEdit#ConsoleLog {
             background: #fff !important;
             color: #23272b;
@@ -381,15 +455,69 @@ class ConfigTab(QWidget):
         idx_font = self.fontsize_opcoes.index(fontsize_padrao) if fontsize_padrao in self.fontsize_opcoes else 1
         self.combo_fontsize.setCurrentIndex(idx_font)
         form.addRow("Tamanho padrão da fonte da transcrição:", self.combo_fontsize)
-        self.spin_max_hist = QSpinBox()
-        self.spin_max_hist.setRange(1, 100)
-        self.spin_max_hist.setValue(self.config.get("max_historico", 20))
-        form.addRow("Máximo histórico:", self.spin_max_hist)
         self.spin_aviso_tamanho_mb = QSpinBox()
         self.spin_aviso_tamanho_mb.setRange(10, 4096)
         self.spin_aviso_tamanho_mb.setSuffix(" MB")
         self.spin_aviso_tamanho_mb.setValue(self.config.get("aviso_tamanho_mb", 300))
         form.addRow("Avisar arquivos acima de:", self.spin_aviso_tamanho_mb)
+        self.spin_cache_modelos_mb = QSpinBox()
+        self.spin_cache_modelos_mb.setRange(256, 65536)
+        self.spin_cache_modelos_mb.setSingleStep(256)
+        self.spin_cache_modelos_mb.setSuffix(" MB")
+        self.spin_cache_modelos_mb.setValue(self.config.get("cache_modelos_mb", 4096))
+        form.addRow("Memória para modelos Whisper:", self.spin_cache_modelos_mb)
+        self.spin_cache_ociosidade = QSpinBox()
+        self.spin_cache_ociosidade.setRange(0, 240)
+        self.spin_cache_ociosidade.setSuffix(" min")
+        self.spin_cache_ociosidade.setSpecialValueText("Nunca")
+        self.spin_cache_ociosidade.setValue(self.config.get("cache_modelos_ociosidade_min", 10))
+        form.addRow("Descarregar modelo ocioso após:", self.spin_cache_ociosidade)
+        self.spin_conversao_paralelo = QSpinBox()
+        self.spin_conversao_paralelo.setRange(1, max(1, os.cpu_count() or 1))
+        self.spin_conversao_paralelo.setValue(
+            self.config.get("conversao_max_paralelo", max(1, (os.cpu_count() or 2) // 2))
+        )
+        form.addRow("Conversões simultâneas:", self.spin_conversao_paralelo)
+        self.spin_transcricao_paralelo = QSpinBox()
+        self.spin_transcricao_paralelo.setRange(1, max(1, os.cpu_count() or 1))
+        self.spin_transcricao_paralelo.setValue(self.config.get("transcricao_max_paralelo", 1))
+        form.addRow("Transcrições simultâneas:", self.spin_transcricao_paralelo)
+        self.check_vad = QCheckBox("Ignorar trechos sem fala antes de transcrever")
+        self.check_vad.setChecked(self.config.get("vad_ativo", True))
+        form.addRow("Detecção de voz (VAD):", self.check_vad)
+        self.combo_agrupamento = QComboBox()
+        self.combo_agrupamento.addItem("DBSCAN (recomendado)", "dbscan")
+        self.combo_agrupamento.addItem("Aglomerativo (experimental)", "aglomerativo")
+        self.combo_agrupamento.addItem("Incremental (experimental, gravações muito longas)", "online")
+        idx_agrupamento = self.combo_agrupamento.findData(self.config.get("diarizacao_agrupamento", "dbscan"))
+        self.combo_agrupamento.setCurrentIndex(max(idx_agrupamento, 0))
+        form.addRow("Separação de falantes:", self.combo_agrupamento)
+        self.spin_cache_transcricoes = QSpinBox()
+        self.spin_cache_transcricoes.setRange(0, 10240)
+        self.spin_cache_transcricoes.setSingleStep(50)
+        self.spin_cache_transcricoes.setSuffix(" MB")
+        self.spin_cache_transcricoes.setSpecialValueText("Desativado")
+        self.spin_cache_transcricoes.setValue(self.config.get("cache_transcricoes_mb", 200))
+        form.addRow("Cache de transcrições:", self.spin_cache_transcricoes)
+        self.check_checkpoints = QCheckBox("Retomar transcrições interrompidas de onde pararam")
+        self.check_checkpoints.setChecked(self.config.get("checkpoints_ativos", True))
+        form.addRow("Checkpoints:", self.check_checkpoints)
+        self.combo_log_nivel = QComboBox()
+        for nivel, nome in [("DEBUG", "Depuração"), ("INFO", "Normal"), ("AVISO", "Avisos"), ("ERRO", "Só erros")]:
+            self.combo_log_nivel.addItem(nome, nivel)
+        idx_nivel = self.combo_log_nivel.findData(self.config.get("log_nivel", "INFO"))
+        self.combo_log_nivel.setCurrentIndex(idx_nivel if idx_nivel >= 0 else 1)
+        form.addRow("Detalhe do log:", self.combo_log_nivel)
+        self.spin_log_limite = QSpinBox()
+        self.spin_log_limite.setRange(0, 1024)
+        self.spin_log_limite.setSuffix(" MB")
+        self.spin_log_limite.setSpecialValueText("Sem limite")
+        self.spin_log_limite.setValue(self.config.get("log_limite_mb", 10))
+        form.addRow("Tamanho máximo de cada log:", self.spin_log_limite)
+        self.spin_log_arquivos = QSpinBox()
+        self.spin_log_arquivos.setRange(0, 50)
+        self.spin_log_arquivos.setValue(self.config.get("log_arquivos_mantidos", 3))
+        form.addRow("Logs antigos mantidos:", self.spin_log_arquivos)
         btn_salvar = QPushButton("Salvar configurações")
         btn_salvar.clicked.connect(self.salvar)
         layout.addLayout(form)
@@ -403,9 +531,21 @@ class ConfigTab(QWidget):
         novo_config["modelo"] = self.combo_modelo.currentText()
         novo_config["idioma"] = self.combo_idioma.currentData()
         novo_config["tamanho_fonte_transcricao"] = self.combo_fontsize.currentData()
-        novo_config["max_historico"] = self.spin_max_hist.value()
         novo_config["aviso_tamanho_mb"] = self.spin_aviso_tamanho_mb.value()
+        novo_config["cache_modelos_mb"] = self.spin_cache_modelos_mb.value()
+        novo_config["cache_modelos_ociosidade_min"] = self.spin_cache_ociosidade.value()
+        novo_config["conversao_max_paralelo"] = self.spin_conversao_paralelo.value()
+        novo_config["transcricao_max_paralelo"] = self.spin_transcricao_paralelo.value()
+        novo_config["vad_ativo"] = self.check_vad.isChecked()
+        novo_config["diarizacao_agrupamento"] = self.combo_agrupamento.currentData()
+        novo_config["cache_transcricoes_mb"] = self.spin_cache_transcricoes.value()
+        novo_config["checkpoints_ativos"] = self.check_checkpoints.isChecked()
+        novo_config["log_nivel"] = self.combo_log_nivel.currentData()
+        novo_config["log_limite_mb"] = self.spin_log_limite.value()
+        novo_config["log_arquivos_mantidos"] = self.spin_log_arquivos.value()
         salvar_config(novo_config)
+        definir_nivel(novo_config["log_nivel"])
+        configurar_rotacao(novo_config["log_limite_mb"], novo_config["log_arquivos_mantidos"])
         self.config = novo_config
         parent = self.parent()
         while parent and not isinstance(parent, QMainWindow):
@@ -433,6 +573,26 @@ class SobreTab(QWidget):
         layout.addStretch()
         self.setLayout(layout)
 
+class AbaAdiada(QWidget):
+    """Só constrói a aba real (via `fabrica`) quando ela é exibida pela primeira vez."""
+
+    def __init__(self, fabrica):
+        super().__init__()
+        self._fabrica = fabrica
+        self.widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def construir(self):
+        if self.widget is None:
+            self.widget = self._fabrica()
+            self._layout.addWidget(self.widget)
+        return self.widget
+
+    def showEvent(self, event):
+        self.construir()
+        super().showEvent(event)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -444,19 +604,28 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.transcricao_tab = TranscricaoTab()
         set_transcricao_tab_instance(self.transcricao_tab)
-        self.conversao_tab = ConversaoTab()
-        self.config_tab = ConfigTab()
-        self.logs_tab = LogsTab()
+        # Só a aba inicial é montada agora; as outras na primeira vez que forem abertas
+        self.conversao_tab = AbaAdiada(ConversaoTab)
+        self.config_tab = AbaAdiada(ConfigTab)
+        self.logs_tab = AbaAdiada(LogsTab)
         self.tabs.addTab(self.transcricao_tab, "Transcrição")
         self.tabs.addTab(self.conversao_tab, "Conversão")
         self.tabs.addTab(self.config_tab, "Configurações")
         self.tabs.addTab(self.logs_tab, "Logs")
-        self.tabs.addTab(SobreTab(), "Sobre")
+        self.tabs.addTab(AbaAdiada(SobreTab), "Sobre")
         self.setCentralWidget(self.tabs)
         self.tabs.currentChanged.connect(self.atualizar_aba_transcricao)
+        global_log_signal.erro_usuario.connect(self.exibir_erro_usuario)
+
+        # Verificado depois que a janela aparece (pode baixar o FFmpeg no Windows)
+        QTimer.singleShot(0, self.verificar_ffmpeg)
 
+    def verificar_ffmpeg(self):
         from ffmpeg_utils import garantir_ffmpeg
-        garantir_ffmpeg(log_interface)
+        garantir_ffmpeg(log_callback=log_interface)
+
+    def exibir_erro_usuario(self, titulo, mensagem):
+        QMessageBox.critical(self, titulo, mensagem)
 
     def atualizar_aba_transcricao(self, idx):
         if self.tabs.widget(idx) == self.transcricao_tab:
@@ -483,6 +652,8 @@ if __name__ == "__main__":
 
     app = QApplication(sys.argv)
     config = carregar_config()
+    definir_nivel(config.get("log_nivel", "INFO"))
+    configurar_rotacao(config.get("log_limite_mb", 10), config.get("log_arquivos_mantidos", 3))
     tema = config.get("tema", "escuro")
     if tema == "claro":
         app.setStyleSheet(get_light_stylesheet())
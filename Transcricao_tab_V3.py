@@ -1,16 +1,25 @@
 import os
 import sys
 import json
+import time
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QLabel, QFileDialog, QVBoxLayout, QHBoxLayout,
     QTextEdit, QPlainTextEdit, QComboBox, QMessageBox, QProgressBar, QListWidget,
-    QLineEdit, QPushButton, QToolButton, QMenu
+    QListWidgetItem, QLineEdit, QPushButton
 )
 from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer
-from PyQt6.QtGui import QTextCursor, QIcon, QAction
-from Transcricao_core_V3 import transcrever_com_diarizacao
+from PyQt6.QtGui import QTextCursor
+from Transcricao_core_V3 import transcrever_com_diarizacao, format_timestamp, expandir_caminhos, nome_base_unico
+from ffmpeg_utils import localizar_ffmpeg, obter_duracao
+from erros_usuario import TranscricaoCancelada
 from logs_tab import adicionar_log
+from historico_db import HISTORICO_TRANSCRICOES
+from indice_busca import INDICE_BUSCA
+from visualizador_transcricao import VisualizadorTranscricao, criar_botao_fonte
+
+# Intervalo mínimo entre dois lotes de segmentos enviados do worker para a tela
+INTERVALO_LOTE_SEGMENTOS_S = 0.3
 
 def get_app_dir():
     if getattr(sys, 'frozen', False):
@@ -23,10 +32,13 @@ def get_app_dir():
     return app_dir
 
 PASTA_SCRIPT = get_app_dir()
-HISTORICO_PATH = os.path.join(PASTA_SCRIPT, "historico.json")
 CONFIG_PATH = os.path.join(PASTA_SCRIPT, "config.json")
 TRANSCRICOES_DIR = os.path.join(PASTA_SCRIPT, "Transcricoes")
 
+def caminho_transcricao(nome_base):
+    """Arquivo em Transcricoes onde o core grava a transcrição com este nome base."""
+    return os.path.join(TRANSCRICOES_DIR, f"transcricao_{nome_base}.txt")
+
 IDIOMAS = [
     ("auto", "Detectar automático"),
     ("pt", "Português"),
@@ -35,6 +47,22 @@ IDIOMAS = [
     ("fr", "Francês"),
     ("de", "Alemão"),
 ]
+NOMES_IDIOMAS = dict(IDIOMAS)
+
+# Quantas entradas do histórico a lista mostra por vez (o histórico em si não tem limite)
+LIMITE_LISTA_HISTORICO = 500
+# Espera após a última tecla antes de consultar o histórico
+ATRASO_BUSCA_HISTORICO_MS = 250
+# Busca de frases em todas as transcrições (índice de texto completo)
+ATRASO_BUSCA_TRANSCRICOES_MS = 400
+LIMITE_RESULTADOS_BUSCA = 200
+
+# Estados de um item da fila de transcrição
+AGUARDANDO = "Aguardando"
+TRANSCREVENDO = "Transcrevendo"
+CONCLUIDO = "Concluído"
+ERRO = "Erro"
+CANCELADO = "Cancelado"
 
 def carregar_config():
     if os.path.exists(CONFIG_PATH):
@@ -50,7 +78,7 @@ def salvar_config(config):
         json.dump(config, f, indent=2, ensure_ascii=False)
 
 class TranscricaoTextEdit(QTextEdit):
-    fileDropped = pyqtSignal(str)
+    arquivosSoltos = pyqtSignal(list)
     fonteAlterada = pyqtSignal(int)
 
     def __init__(self, parent=None):
@@ -69,7 +97,7 @@ class TranscricaoTextEdit(QTextEdit):
         self.setHtml("""
             <div style="text-align:center;margin-top:52px;">
                 <span style="font-size:17px;font-weight:600;">
-                    Arraste e solte um arquivo de áudio ou vídeo aqui
+                    Arraste e solte arquivos de áudio ou vídeo (ou uma pasta) aqui
                 </span><br>
                 <span style="font-size:13px;">
                     ou veja aqui o texto transcrito.
@@ -87,39 +115,15 @@ class TranscricaoTextEdit(QTextEdit):
         """)
 
     def setFontSize(self, tamanho):
+        if tamanho == self._tamanho_fonte:
+            return
         self._tamanho_fonte = tamanho
         self.setProperty("tamanhoFonte", tamanho)
         self._apply_custom_style(tamanho)
         self.fonteAlterada.emit(tamanho)
 
     def _create_font_size_button(self):
-        self._font_button = QToolButton(self)
-        self._font_button.setIcon(QIcon.fromTheme("format-font-size"))
-        self._font_button.setText("Aa")
-        self._font_button.setToolTip("Alterar tamanho da fonte da transcrição")
-        self._font_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
-        self._font_button.setStyleSheet("""
-            QToolButton {
-                background: transparent;
-                color: #b3bab7;
-                font-size: 13px;
-                padding: 2px 8px 2px 6px;
-                border: none;
-            }
-            QToolButton:hover {
-                color: #8fffa0;
-            }
-        """)
-        font_menu = QMenu(self)
-        for size in [12, 14, 16, 18, 20, 24]:
-            act = QAction(f"{size}px", self)
-            act.setData(size)
-            act.triggered.connect(lambda checked, s=size: self.setFontSize(s))
-            font_menu.addAction(act)
-        self._font_button.setMenu(font_menu)
-        self._font_button.setFixedSize(30, 22)
-        self._font_button.raise_()
-        self._font_button.show()
+        self._font_button = criar_botao_fonte(self, self.setFontSize)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -143,45 +147,63 @@ class TranscricaoTextEdit(QTextEdit):
         event.accept()
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
-            for url in event.mimeData().urls():
-                file_path = url.toLocalFile()
-                if file_path.lower().endswith(('.mp3', '.mp4', '.wav', '.m4a', '.ogg', '.flac')):
-                    self.fileDropped.emit(file_path)
-                    break
+            caminhos = [url.toLocalFile() for url in event.mimeData().urls() if url.toLocalFile()]
+            arquivos = expandir_caminhos(caminhos)
+            if arquivos:
+                self.arquivosSoltos.emit(arquivos)
         event.acceptProposedAction()
 
 class TranscricaoThread(QThread):
     progresso = pyqtSignal(int, str, str)
     resultado = pyqtSignal(str)
+    segmentos = pyqtSignal(list)  # linhas de transcrição prontas, em lotes
     erro = pyqtSignal(str)
     cancelado = pyqtSignal()
 
-    def __init__(self, caminho, modelo, idioma, log_callback=None):
+    def __init__(self, caminho, modelo, idioma, log_callback=None, nome_base=None):
         super().__init__()
         self.caminho = caminho
         self.modelo = modelo
         self.idioma = idioma
+        self.nome_base = nome_base
         self._cancelado = False
         self.log_callback = log_callback
+        self._lote_segmentos = []
+        self._ultimo_envio = 0.0
 
     def cancelar(self):
         self._cancelado = True
 
+    def _receber_segmentos(self, linhas):
+        # Junta as linhas e emite no máximo um lote a cada INTERVALO_LOTE_SEGMENTOS_S
+        self._lote_segmentos.extend(linhas)
+        if time.monotonic() - self._ultimo_envio >= INTERVALO_LOTE_SEGMENTOS_S:
+            self._enviar_segmentos()
+
+    def _enviar_segmentos(self):
+        if self._lote_segmentos:
+            self.segmentos.emit(self._lote_segmentos)
+            self._lote_segmentos = []
+        self._ultimo_envio = time.monotonic()
+
     def run(self):
         try:
             def progresso_callback(valor, texto="", etapa=""):
                 if self._cancelado:
-                    raise Exception("Transcrição cancelada pelo usuário.")
+                    raise TranscricaoCancelada()
+                self._enviar_segmentos()
                 self.progresso.emit(valor, texto, etapa)
                 if self.log_callback and texto:
                     self.log_callback(f"[{datetime.now().strftime('%H:%M:%S')}] {texto}")
             texto = transcrever_com_diarizacao(
                 self.caminho, self.modelo, self.idioma,
-                progresso_callback, checar_cancelamento=lambda: self._cancelado
+                progresso_callback, checar_cancelamento=lambda: self._cancelado,
+                segmentos_callback=self._receber_segmentos, nome_base=self.nome_base
             )
             if self._cancelado:
                 self.cancelado.emit()
             else:
+                self._enviar_segmentos()
                 self.resultado.emit(texto)
         except Exception as e:
             if self._cancelado:
@@ -189,6 +211,20 @@ class TranscricaoThread(QThread):
             else:
                 self.erro.emit(str(e))
 
+class DuracaoThread(QThread):
+    """Lê a duração dos arquivos da fila sem travar a interface (-1 quando não for possível)."""
+    duracao_obtida = pyqtSignal(str, float)
+
+    def __init__(self, caminhos):
+        super().__init__()
+        self.caminhos = list(caminhos)
+
+    def run(self):
+        ffmpeg_cmd = localizar_ffmpeg()
+        for caminho in self.caminhos:
+            duracao = obter_duracao(caminho, ffmpeg_cmd) if ffmpeg_cmd else None
+            self.duracao_obtida.emit(caminho, duracao if duracao is not None else -1.0)
+
 class AnimatedProgressBar(QProgressBar):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -211,11 +247,37 @@ class AnimatedProgressBar(QProgressBar):
         else:
             self.setFormat(f"{status}")
 
+class BuscaTranscricoesThread(QThread):
+    """Atualiza o índice (só arquivos novos ou alterados) e busca a frase fora da thread da interface."""
+    resultados = pyqtSignal(str, list)
+
+    def __init__(self, texto):
+        super().__init__()
+        self.texto = texto
+
+    def run(self):
+        try:
+            INDICE_BUSCA.atualizar()
+            acertos = INDICE_BUSCA.buscar(self.texto, limite=LIMITE_RESULTADOS_BUSCA)
+        except Exception as e:
+            adicionar_log(f"Erro na busca nas transcrições: {e}")
+            acertos = []
+        self.resultados.emit(self.texto, acertos)
+
 class TranscricaoTab(QWidget):
     def __init__(self):
         super().__init__()
         self.config = carregar_config()
         self.caminho_arquivo = ""
+        self.nome_base_arquivo = ""  # nome base dos arquivos de saída da transcrição exibida
+        self.fila = []  # itens: dict com caminho, nome, nome_base, tamanho, duracao, status, percentual, thread, item
+        self.lote = []  # itens da execução atual da fila, para o progresso geral
+        self._fila_ativa = False
+        self._cancelamento_pedido = False
+        self._sondagens = []
+        # Trabalho cujos segmentos estão sendo mostrados enquanto são transcritos (um por vez)
+        self._trabalho_em_exibicao = None
+        self._exibir_em_andamento = False
         layout_principal = QHBoxLayout()
         layout_esquerda = QVBoxLayout()
         layout_direita = QVBoxLayout()
@@ -225,9 +287,11 @@ class TranscricaoTab(QWidget):
         self.combo_idioma = QComboBox()
         for cod, nome in IDIOMAS:
             self.combo_idioma.addItem(nome, cod)
-        self.btn_abrir = QPushButton("Selecionar arquivo")
+        self.btn_abrir = QPushButton("Adicionar arquivos")
         self.btn_abrir.setMinimumWidth(140)
         self.btn_abrir.clicked.connect(self.selecionar_arquivo)
+        self.btn_pasta = QPushButton("Adicionar pasta")
+        self.btn_pasta.clicked.connect(self.selecionar_pasta)
         hlayout_top.addWidget(QLabel("Modelo Whisper:"))
         hlayout_top.addWidget(self.combo_modelos)
         hlayout_top.addSpacing(12)
@@ -235,18 +299,28 @@ class TranscricaoTab(QWidget):
         hlayout_top.addWidget(self.combo_idioma)
         hlayout_top.addStretch(1)
         hlayout_top.addWidget(self.btn_abrir)
+        hlayout_top.addWidget(self.btn_pasta)
         layout_esquerda.addLayout(hlayout_top)
         self.label_arquivo = QLabel("Arquivo: nenhum selecionado")
         self.label_arquivo.setObjectName("ArquivoLabel")
         layout_esquerda.addWidget(self.label_arquivo)
+        self.lista_fila = QListWidget()
+        self.lista_fila.setMaximumHeight(140)
+        self.lista_fila.setToolTip("Fila de transcrição: os arquivos mais curtos são processados primeiro.")
+        self.lista_fila.itemClicked.connect(self.abrir_da_fila)
+        self.lista_fila.setVisible(False)
+        layout_esquerda.addWidget(self.lista_fila)
         botoes_transcricao_layout = QHBoxLayout()
         self.btn_transcrever = QPushButton("Transcrever")
         self.btn_transcrever.clicked.connect(self.transcrever)
         self.btn_cancelar = QPushButton("Cancelar Transcrição")
         self.btn_cancelar.clicked.connect(self.cancelar_transcricao)
         self.btn_cancelar.setEnabled(False)
+        self.btn_limpar_fila = QPushButton("Limpar fila")
+        self.btn_limpar_fila.clicked.connect(self.limpar_fila)
         botoes_transcricao_layout.addWidget(self.btn_transcrever)
         botoes_transcricao_layout.addWidget(self.btn_cancelar)
+        botoes_transcricao_layout.addWidget(self.btn_limpar_fila)
         layout_esquerda.addLayout(botoes_transcricao_layout)
         self.label_progresso = QLabel("Progresso:")
         self.label_progresso.setVisible(False)
@@ -269,8 +343,22 @@ class TranscricaoTab(QWidget):
         self.texto_transcricao = TranscricaoTextEdit()
         self.texto_transcricao.setObjectName("TranscricaoTextEdit")
         self.texto_transcricao.setFontSize(tamanho_fonte)
-        self.texto_transcricao.fileDropped.connect(self.arquivo_arrastado)
+        self.texto_transcricao.arquivosSoltos.connect(self.arquivos_arrastados)
+        self.texto_transcricao.fonteAlterada.connect(self.atualizar_tamanho_fonte_transcricao)
         layout_esquerda.addWidget(self.texto_transcricao)
+        # Transcrições prontas (ou em andamento) vão para o visualizador, que lê o arquivo aos
+        # poucos; o QTextEdit acima fica só para as mensagens (instruções, progresso, erros)
+        self.busca_na_transcricao = QLineEdit()
+        self.busca_na_transcricao.setPlaceholderText("Localizar nesta transcrição (Enter = próxima)...")
+        self.busca_na_transcricao.returnPressed.connect(self.localizar_na_transcricao)
+        self.busca_na_transcricao.setVisible(False)
+        layout_esquerda.addWidget(self.busca_na_transcricao)
+        self.visualizador = VisualizadorTranscricao()
+        self.visualizador.setFontSize(tamanho_fonte)
+        self.visualizador.arquivosSoltos.connect(self.arquivos_arrastados)
+        self.visualizador.fonteAlterada.connect(self.atualizar_tamanho_fonte_transcricao)
+        self.visualizador.setVisible(False)
+        layout_esquerda.addWidget(self.visualizador)
         btns_download_layout = QHBoxLayout()
         self.btn_download_transcricao = QPushButton("Baixar Transcrição")
         self.btn_download_transcricao.clicked.connect(self.baixar_transcricao)
@@ -282,9 +370,14 @@ class TranscricaoTab(QWidget):
         layout_esquerda.addLayout(btns_download_layout)
         self.busca_historico = QLineEdit()
         self.busca_historico.setPlaceholderText("Buscar no histórico...")
-        self.busca_historico.textChanged.connect(self.filtrar_historico)
+        self.timer_busca_historico = QTimer(self)
+        self.timer_busca_historico.setSingleShot(True)
+        self.timer_busca_historico.setInterval(ATRASO_BUSCA_HISTORICO_MS)
+        self.timer_busca_historico.timeout.connect(self.carregar_historico)
+        self.busca_historico.textChanged.connect(self.timer_busca_historico.start)
         layout_direita.addWidget(self.busca_historico)
-        layout_direita.addWidget(QLabel("Histórico de transcrições:"))
+        self.label_historico = QLabel("Histórico de transcrições:")
+        layout_direita.addWidget(self.label_historico)
         self.lista_historico = QListWidget()
         self.lista_historico.itemClicked.connect(self.abrir_do_historico)
         layout_direita.addWidget(self.lista_historico)
@@ -296,6 +389,20 @@ class TranscricaoTab(QWidget):
         botoes_historico_layout.addWidget(self.btn_remover)
         botoes_historico_layout.addWidget(self.btn_limpar)
         layout_direita.addLayout(botoes_historico_layout)
+        self.busca_transcricoes = QLineEdit()
+        self.busca_transcricoes.setPlaceholderText("Buscar frase em todas as transcrições...")
+        self.timer_busca_transcricoes = QTimer(self)
+        self.timer_busca_transcricoes.setSingleShot(True)
+        self.timer_busca_transcricoes.setInterval(ATRASO_BUSCA_TRANSCRICOES_MS)
+        self.timer_busca_transcricoes.timeout.connect(self.buscar_nas_transcricoes)
+        self.busca_transcricoes.textChanged.connect(self.timer_busca_transcricoes.start)
+        self.busca_transcricoes.returnPressed.connect(self.buscar_nas_transcricoes)
+        layout_direita.addWidget(self.busca_transcricoes)
+        self.lista_resultados_busca = QListWidget()
+        self.lista_resultados_busca.itemClicked.connect(self.abrir_resultado_busca)
+        self.lista_resultados_busca.setVisible(False)
+        layout_direita.addWidget(self.lista_resultados_busca)
+        self._buscas = []
         layout_direita.addWidget(QLabel("Console:"))
         self.console_log = QPlainTextEdit()
         self.console_log.setObjectName("ConsoleLog")
@@ -303,11 +410,11 @@ class TranscricaoTab(QWidget):
         self.console_log.setMaximumBlockCount(300)
         layout_direita.addWidget(self.console_log)
         layout_direita.setStretch(2, 4)
-        layout_direita.setStretch(5, 6)
+        layout_direita.setStretch(5, 3)
+        layout_direita.setStretch(7, 6)
         layout_principal.addLayout(layout_esquerda, 5)
         layout_principal.addLayout(layout_direita, 2)
         self.setLayout(layout_principal)
-        self.thread = None
         self.carregar_historico()
         self.atualizar_config_interface()
         self.adicionar_log_console("Programa iniciado.")
@@ -316,9 +423,29 @@ class TranscricaoTab(QWidget):
     def atualizar_tamanho_fonte_transcricao(self, tamanho):
         try:
             self.texto_transcricao.setFontSize(int(tamanho))
+            self.visualizador.setFontSize(int(tamanho))
         except Exception:
             pass
 
+    def _mostrar_mensagem(self):
+        """Troca o visualizador pela área de mensagens (o texto é definido por quem chama)."""
+        self.visualizador.setVisible(False)
+        self.visualizador.modelo.fechar()
+        self.busca_na_transcricao.setVisible(False)
+        self.texto_transcricao.setVisible(True)
+
+    def _mostrar_transcricao(self, caminho, acompanhar=False):
+        """Abre o arquivo de transcrição no visualizador (leitura sob demanda)."""
+        self.texto_transcricao.setVisible(False)
+        self.visualizador.abrir(caminho, acompanhar)
+        self.visualizador.setVisible(True)
+        self.busca_na_transcricao.setVisible(True)
+
+    def localizar_na_transcricao(self):
+        texto = self.busca_na_transcricao.text().strip()
+        if texto and not self.visualizador.localizar_proximo(texto):
+            self.adicionar_log_console(f"Texto não encontrado na transcrição: {texto}")
+
     def adicionar_log_console(self, mensagem):
         self.console_log.appendPlainText(mensagem)
         self.console_log.moveCursor(QTextCursor.MoveOperation.End)
@@ -331,11 +458,11 @@ class TranscricaoTab(QWidget):
             if not os.path.exists(path):
                 os.makedirs(path, exist_ok=True)
                 created.append(pasta)
-        for arq in ["config.json", "historico.json"]:
+        for arq in ["config.json"]:
             path = os.path.join(PASTA_SCRIPT, arq)
             if not os.path.exists(path):
                 with open(path, "w", encoding="utf-8") as f:
-                    f.write("[]" if arq == "historico.json" else "{}")
+                    f.write("{}")
                 created.append(arq)
         if created:
             self.adicionar_log_console(f"Criados: {', '.join(created)}")
@@ -375,48 +502,169 @@ class TranscricaoTab(QWidget):
         self.atualizar_config_interface()
 
     def selecionar_arquivo(self):
-        fname, _ = QFileDialog.getOpenFileName(
-            self, "Selecione um arquivo de áudio ou vídeo",
+        fnames, _ = QFileDialog.getOpenFileNames(
+            self, "Selecione arquivos de áudio ou vídeo",
             "", "Áudio/Vídeo (*.mp3 *.mp4 *.wav *.m4a *.ogg *.flac)"
         )
-        if fname:
-            self.setar_arquivo(fname)
+        if fnames:
+            self.adicionar_arquivos(fnames)
 
-    def arquivo_arrastado(self, file_path):
-        self.setar_arquivo(file_path)
+    def selecionar_pasta(self):
+        pasta = QFileDialog.getExistingDirectory(self, "Selecione uma pasta com áudios ou vídeos")
+        if pasta:
+            arquivos = expandir_caminhos([pasta])
+            if not arquivos:
+                QMessageBox.warning(self, "Aviso", "Nenhum arquivo de áudio ou vídeo suportado na pasta.")
+                return
+            self.adicionar_arquivos(arquivos)
+
+    def arquivos_arrastados(self, caminhos):
+        self.adicionar_arquivos(caminhos)
 
     def setar_arquivo(self, caminho):
-        try:
-            tamanho_bytes = os.path.getsize(caminho)
-            tamanho_mb = tamanho_bytes / (1024 * 1024)
-        except Exception:
-            tamanho_mb = 0
+        self.adicionar_arquivos([caminho])
+
+    def adicionar_arquivos(self, caminhos):
+        na_fila = {t["caminho"] for t in self.fila if t["status"] in (AGUARDANDO, TRANSCREVENDO)}
+        novos = []
+        for caminho in caminhos:
+            if caminho in na_fila:
+                continue
+            na_fila.add(caminho)
+            try:
+                tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+            except Exception:
+                tamanho_mb = 0
+            novos.append((caminho, tamanho_mb))
+        if not novos:
+            return
+
         aviso_mb = self.config.get("aviso_tamanho_mb", 300)
-        if tamanho_mb > aviso_mb:
+        grandes = [(c, t) for c, t in novos if t > aviso_mb]
+        if grandes:
+            if len(grandes) == 1:
+                detalhe = f"O arquivo selecionado possui mais de {aviso_mb} MB ({grandes[0][1]:.1f} MB)."
+            else:
+                detalhe = f"{len(grandes)} arquivos selecionados possuem mais de {aviso_mb} MB."
             resposta = QMessageBox.question(
                 self,
                 "Aviso: Arquivo grande",
-                f"O arquivo selecionado possui mais de {aviso_mb} MB ({tamanho_mb:.1f} MB).\n"
+                f"{detalhe}\n"
                 f"A transcrição pode demorar bastante tempo, dependendo do seu computador.\n\nDeseja continuar mesmo assim?",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 QMessageBox.StandardButton.No
             )
             if resposta != QMessageBox.StandardButton.Yes:
-                self.adicionar_log_console(f"Seleção de arquivo cancelada pelo usuário (tamanho: {tamanho_mb:.1f} MB).")
-                return
-        self.caminho_arquivo = caminho
-        nome = os.path.basename(caminho)
-        tamanho_str = f" ({tamanho_mb:.1f} MB)" if tamanho_mb else ""
-        self.label_arquivo.setText(f'📎 Arquivo: {nome}{tamanho_str}')
+                self.adicionar_log_console(f"{len(grandes)} arquivo(s) grande(s) não adicionado(s) à fila.")
+                caminhos_grandes = {c for c, _ in grandes}
+                novos = [(c, t) for c, t in novos if c not in caminhos_grandes]
+                if not novos:
+                    return
+
+        # A saída leva só o nome do arquivo: dois arquivos com o mesmo nome (pastas diferentes)
+        # na fila ao mesmo tempo gravariam no mesmo transcricao_<nome>.txt, então o segundo
+        # recebe um sufixo
+        nomes_em_uso = {t["nome_base"] for t in self.fila if t["status"] in (AGUARDANDO, TRANSCREVENDO)}
+        for caminho, tamanho_mb in novos:
+            nome_base = nome_base_unico(caminho, nomes_em_uso)
+            if nome_base != os.path.splitext(os.path.basename(caminho))[0]:
+                self.adicionar_log_console(
+                    f"Outro arquivo da fila tem o mesmo nome: {caminho} será salvo como transcricao_{nome_base}.txt"
+                )
+            nomes_em_uso.add(nome_base)
+            trabalho = {
+                "caminho": caminho,
+                "nome": os.path.basename(caminho),
+                "nome_base": nome_base,
+                "tamanho_mb": tamanho_mb,
+                "duracao": None,
+                "status": AGUARDANDO,
+                "percentual": 0,
+                "thread": None,
+                "item": QListWidgetItem(),
+            }
+            self.fila.append(trabalho)
+            self.lista_fila.addItem(trabalho["item"])
+            self._atualizar_item_fila(trabalho)
+            if self._fila_ativa:
+                self.lote.append(trabalho)
+        self.lista_fila.setVisible(True)
+        self._atualizar_label_fila()
+        for caminho, tamanho_mb in novos:
+            tamanho_str = f" ({tamanho_mb:.1f} MB)" if tamanho_mb else ""
+            self.adicionar_log_console(f"Arquivo adicionado à fila: {os.path.basename(caminho)}{tamanho_str}")
+
+        sondagem = DuracaoThread([c for c, _ in novos])
+        sondagem.duracao_obtida.connect(self._duracao_obtida)
+        sondagem.finished.connect(lambda s=sondagem: self._sondagens.remove(s) if s in self._sondagens else None)
+        self._sondagens.append(sondagem)
+        sondagem.start()
+        if self._fila_ativa:
+            self._agendar_trabalhos()
+
+    def _duracao_obtida(self, caminho, duracao):
+        for trabalho in self.fila:
+            if trabalho["caminho"] == caminho and trabalho["duracao"] is None:
+                trabalho["duracao"] = duracao if duracao >= 0 else None
+                self._atualizar_item_fila(trabalho)
+
+    def _atualizar_item_fila(self, trabalho):
+        partes = [trabalho["nome"]]
+        if trabalho["duracao"] is not None:
+            partes.append(format_timestamp(trabalho["duracao"]))
+        status = trabalho["status"]
+        if status == TRANSCREVENDO:
+            status = f"{status} {trabalho['percentual']}%"
+        partes.append(status)
+        trabalho["item"].setText("  —  ".join(partes))
+        trabalho["item"].setToolTip(trabalho.get("mensagem") or trabalho["caminho"])
+
+    def _atualizar_label_fila(self):
+        pendentes = [t for t in self.fila if t["status"] in (AGUARDANDO, TRANSCREVENDO)]
+        if len(self.fila) == 1:
+            trabalho = self.fila[0]
+            tamanho_str = f" ({trabalho['tamanho_mb']:.1f} MB)" if trabalho["tamanho_mb"] else ""
+            self.label_arquivo.setText(f'📎 Arquivo: {trabalho["nome"]}{tamanho_str}')
+        elif self.fila:
+            self.label_arquivo.setText(f"📎 Fila: {len(self.fila)} arquivo(s), {len(pendentes)} pendente(s)")
+        else:
+            self.label_arquivo.setText("Arquivo: nenhum selecionado")
         self.label_arquivo.setTextFormat(Qt.TextFormat.PlainText)
-        self.adicionar_log_console(f"Arquivo selecionado: {nome}{tamanho_str}")
+
+    def limpar_fila(self):
+        """Remove da fila tudo o que não está em andamento."""
+        for trabalho in [t for t in self.fila if t["status"] != TRANSCREVENDO]:
+            if trabalho["thread"] is not None and trabalho["thread"].isRunning():
+                continue
+            self.fila.remove(trabalho)
+            if trabalho in self.lote:
+                self.lote.remove(trabalho)
+            self.lista_fila.takeItem(self.lista_fila.row(trabalho["item"]))
+        self.lista_fila.setVisible(bool(self.fila))
+        self._atualizar_label_fila()
+
+    def abrir_da_fila(self, item):
+        trabalho = next((t for t in self.fila if t["item"] is item), None)
+        if trabalho is None or trabalho["status"] != CONCLUIDO:
+            return
+        base = trabalho["nome_base"]
+        caminho = caminho_transcricao(base)
+        if os.path.exists(caminho):
+            self._parar_exibicao_em_andamento()
+            self._mostrar_transcricao(caminho)
+            self.caminho_arquivo = trabalho["caminho"]
+            self.nome_base_arquivo = base
+            caminho_trad = os.path.join(TRANSCRICOES_DIR, f"transcricao_{base}_ingles.txt")
+            self.btn_download_traducao.setEnabled(os.path.exists(caminho_trad))
 
     def transcrever(self):
-        if not self.caminho_arquivo:
+        pendentes = [t for t in self.fila if t["status"] == AGUARDANDO]
+        if not pendentes:
             QMessageBox.warning(self, "Aviso", "Selecione um arquivo primeiro.")
             return
-        modelo = self.combo_modelos.currentText()
-        idioma = self.combo_idioma.currentData()
+        if self._fila_ativa:
+            return
+        self.config = self.carregar_config()
 
         # Ajuste para cor do texto conforme tema
         cor_progresso = "#b0f7b8"  # padrão para tema escuro
@@ -424,11 +672,14 @@ class TranscricaoTab(QWidget):
         if config.get("tema", "escuro") == "claro":
             cor_progresso = "#186b2c"  # verde da borda do arquivo no tema claro
 
+        self._mostrar_mensagem()
         self.texto_transcricao.setHtml(f"""
             <div style="color:{cor_progresso};font-size:17px;text-align:center;">
                 Processando, aguarde...
             </div>
         """)
+        self._trabalho_em_exibicao = None
+        self._exibir_em_andamento = True
         self.label_progresso.setVisible(True)
         self.progress.setVisible(True)
         self.label_etapa.setVisible(True)
@@ -439,17 +690,63 @@ class TranscricaoTab(QWidget):
         self.smooth_status = "Preparando"
         self.smooth_progress_timer.start(40)
         self.repaint()
-        self.adicionar_log_console(f"Iniciando transcrição ({os.path.basename(self.caminho_arquivo)})")
-        self.thread = TranscricaoThread(
-            self.caminho_arquivo, modelo, idioma, 
-            log_callback=self.adicionar_log_console
-        )
-        self.thread.progresso.connect(self.atualizar_progresso_detalhado)
-        self.thread.resultado.connect(self.exibir_transcricao)
-        self.thread.erro.connect(self.exibir_erro)
-        self.thread.cancelado.connect(self.tratamento_cancelado)
+        self._fila_ativa = True
+        self._cancelamento_pedido = False
+        self.lote = list(pendentes)
         self.btn_cancelar.setEnabled(True)
-        self.thread.start()
+        self.btn_transcrever.setEnabled(False)
+        self.adicionar_log_console(f"Iniciando fila de transcrição ({len(pendentes)} arquivo(s))")
+        self._agendar_trabalhos()
+
+    def _proximo_trabalho(self):
+        pendentes = [t for t in self.fila if t["status"] == AGUARDANDO]
+        if not pendentes:
+            return None
+        # Mais curtos primeiro; sem duração conhecida, vão por último ordenados pelo tamanho
+        return min(pendentes, key=lambda t: (t["duracao"] is None, t["duracao"] or 0, t["tamanho_mb"]))
+
+    def _agendar_trabalhos(self):
+        max_paralelo = max(1, int(self.config.get("transcricao_max_paralelo", 1)))
+        em_andamento = [t for t in self.fila if t["status"] == TRANSCREVENDO]
+        while not self._cancelamento_pedido and len(em_andamento) < max_paralelo:
+            trabalho = self._proximo_trabalho()
+            if trabalho is None:
+                break
+            self._iniciar_trabalho(trabalho)
+            em_andamento.append(trabalho)
+        if not em_andamento:
+            self._fila_finalizada()
+
+    def _iniciar_trabalho(self, trabalho):
+        trabalho["status"] = TRANSCREVENDO
+        trabalho["percentual"] = 0
+        trabalho["modelo"] = self.combo_modelos.currentText()
+        trabalho["idioma"] = self.combo_idioma.currentData()
+        self._atualizar_item_fila(trabalho)
+        self._atualizar_label_fila()
+        self.adicionar_log_console(f"Iniciando transcrição ({trabalho['nome']})")
+        thread = TranscricaoThread(
+            trabalho["caminho"], trabalho["modelo"], trabalho["idioma"],
+            log_callback=self.adicionar_log_console, nome_base=trabalho["nome_base"]
+        )
+        thread.progresso.connect(lambda v, t, e, tr=trabalho: self._progresso_trabalho(tr, v, t, e))
+        thread.resultado.connect(lambda texto, tr=trabalho: self.exibir_transcricao(tr, texto))
+        thread.segmentos.connect(lambda linhas, tr=trabalho: self.acrescentar_segmentos(tr, linhas))
+        thread.erro.connect(lambda msg, tr=trabalho: self.exibir_erro(tr, msg))
+        thread.cancelado.connect(lambda tr=trabalho: self.tratamento_cancelado(tr))
+        trabalho["thread"] = thread
+        thread.start()
+
+    def _progresso_trabalho(self, trabalho, valor, texto, etapa):
+        if valor is not None and valor >= 0:
+            trabalho["percentual"] = valor
+        self._atualizar_item_fila(trabalho)
+        if len(self.lote) > 1:
+            finalizados = sum(1 for t in self.lote if t["status"] in (CONCLUIDO, ERRO, CANCELADO))
+            soma = sum(100 if t["status"] in (CONCLUIDO, ERRO, CANCELADO) else t["percentual"] for t in self.lote)
+            valor = soma // len(self.lote)
+            etapa = f"{finalizados}/{len(self.lote)} · {trabalho['nome']}"
+        self.atualizar_progresso_detalhado(valor, texto, etapa)
 
     def atualizar_progresso_detalhado(self, valor, texto, etapa):
         if etapa:
@@ -482,18 +779,51 @@ class TranscricaoTab(QWidget):
             self.smooth_progress_timer.stop()
 
     def cancelar_transcricao(self):
-        if self.thread and self.thread.isRunning():
-            self.thread.cancelar()
-            self.btn_cancelar.setEnabled(False)
-            self.adicionar_log_console("Solicitado cancelamento da transcrição.")
+        if not self._fila_ativa:
+            return
+        self._cancelamento_pedido = True
+        for trabalho in self.fila:
+            if trabalho["status"] == AGUARDANDO:
+                trabalho["status"] = CANCELADO
+                self._atualizar_item_fila(trabalho)
+            elif trabalho["status"] == TRANSCREVENDO and trabalho["thread"]:
+                trabalho["thread"].cancelar()
+        self.btn_cancelar.setEnabled(False)
+        self.adicionar_log_console("Solicitado cancelamento da transcrição.")
+        self._agendar_trabalhos()
 
-    def tratamento_cancelado(self):
+    def _finalizar_trabalho(self, trabalho, status, mensagem=None):
+        trabalho["status"] = status
+        trabalho["mensagem"] = mensagem
+        self._atualizar_item_fila(trabalho)
+        self._atualizar_label_fila()
+        self._agendar_trabalhos()
+
+    def _fila_finalizada(self):
+        if not self._fila_ativa:
+            return
+        self._fila_ativa = False
+        self.progress.setValue(100)
         self.progress.setVisible(False)
         self.label_progresso.setVisible(False)
         self.label_etapa.setVisible(False)
         self.btn_cancelar.setEnabled(False)
+        self.btn_transcrever.setEnabled(True)
         self.progress.setIndeterminate(False)
         self.smooth_progress_timer.stop()
+        if self._cancelamento_pedido:
+            self._exibir_cancelamento()
+        if len(self.lote) > 1:
+            concluidos = sum(1 for t in self.lote if t["status"] == CONCLUIDO)
+            self.adicionar_log_console(f"Fila finalizada: {concluidos} de {len(self.lote)} arquivo(s) transcrito(s).")
+
+    def tratamento_cancelado(self, trabalho):
+        if self._trabalho_em_exibicao is trabalho:
+            self._trabalho_em_exibicao = None
+        self.adicionar_log_console(f"Transcrição cancelada pelo usuário ({trabalho['nome']}).")
+        self._finalizar_trabalho(trabalho, CANCELADO)
+
+    def _exibir_cancelamento(self):
         # Destaque vermelho forte para ambos os temas, e bold
         config = self.config if hasattr(self, "config") else carregar_config()
         if config.get("tema", "escuro") == "claro":
@@ -503,6 +833,7 @@ class TranscricaoTab(QWidget):
             cor_cancelado = "#ff6b6b"  # vermelho claro para escuro
             bg_cancelado = "transparent"
 
+        self._mostrar_mensagem()
         self.texto_transcricao.setHtml(f"""
             <div style="color:{cor_cancelado};background:{bg_cancelado};font-size:16px;text-align:center;font-weight:bold;padding:10px 0;border-radius:6px;">
                 Transcrição cancelada pelo usuário.
@@ -510,151 +841,184 @@ class TranscricaoTab(QWidget):
         """)
         self.adicionar_log_console("Transcrição cancelada pelo usuário.")
 
-    def exibir_transcricao(self, texto):
-        self.texto_transcricao.setPlainText(texto)
-        self.progress.setValue(100)
-        self.progress.setVisible(False)
-        self.label_progresso.setVisible(False)
-        self.label_etapa.setVisible(False)
-        self.btn_cancelar.setEnabled(False)
-        self.progress.setIndeterminate(False)
-        self.smooth_progress_timer.stop()
-        self.adicionar_ao_historico()
-        base = os.path.splitext(os.path.basename(self.caminho_arquivo))[0]
+    def acrescentar_segmentos(self, trabalho, linhas):
+        """Mostra os segmentos de um trabalho à medida que ficam prontos, sem redesenhar o texto todo."""
+        if not self._exibir_em_andamento:
+            return
+        if self._trabalho_em_exibicao is None:
+            self._trabalho_em_exibicao = trabalho
+            # As linhas já foram gravadas no arquivo parcial; o visualizador acompanha o arquivo
+            self._mostrar_transcricao(caminho_transcricao(trabalho["nome_base"]), acompanhar=True)
+        elif self._trabalho_em_exibicao is trabalho:
+            self.visualizador.acompanhar()
+
+    def _parar_exibicao_em_andamento(self):
+        """O usuário abriu outro texto: os segmentos que chegarem não entram mais na tela."""
+        self._exibir_em_andamento = False
+        self._trabalho_em_exibicao = None
+
+    def exibir_transcricao(self, trabalho, texto):
+        self.caminho_arquivo = trabalho["caminho"]
+        self.nome_base_arquivo = trabalho["nome_base"]
+        caminho = caminho_transcricao(trabalho["nome_base"])
+        if self._trabalho_em_exibicao is trabalho:
+            # O arquivo está completo: lê o restante e deixa de esperar linhas novas
+            self._trabalho_em_exibicao = None
+            self.visualizador.modelo.atualizar(acompanhar=False)
+        elif self._trabalho_em_exibicao is None:
+            if os.path.exists(caminho):
+                self._mostrar_transcricao(caminho)
+            else:
+                self._mostrar_mensagem()
+                self.texto_transcricao.setPlainText(texto)
+        self.adicionar_ao_historico(trabalho["nome_base"], trabalho["idioma"])
+        base = self.nome_base_arquivo
         caminho_trad = os.path.join(TRANSCRICOES_DIR, f"transcricao_{base}_ingles.txt")
         self.btn_download_traducao.setEnabled(os.path.exists(caminho_trad))
-        self.adicionar_log_console("Transcrição finalizada com sucesso.")
+        self.adicionar_log_console(f"Transcrição finalizada com sucesso ({trabalho['nome']}).")
+        self._finalizar_trabalho(trabalho, CONCLUIDO)
 
-    def exibir_erro(self, mensagem):
+    def exibir_erro(self, trabalho, mensagem):
+        if self._trabalho_em_exibicao is trabalho:
+            self._trabalho_em_exibicao = None
+        self._mostrar_mensagem()
         self.texto_transcricao.setHtml(
-            f'<div style="color:#ff7676;font-size:16px;"><b>Erro durante a transcrição:</b><br>{mensagem}</div>'
+            f'<div style="color:#ff7676;font-size:16px;"><b>Erro durante a transcrição de {trabalho["nome"]}:</b><br>{mensagem}</div>'
         )
-        self.progress.setVisible(False)
-        self.label_progresso.setVisible(False)
-        self.label_etapa.setVisible(False)
-        self.btn_cancelar.setEnabled(False)
-        self.progress.setIndeterminate(False)
-        self.smooth_progress_timer.stop()
-        self.adicionar_log_console(f"Erro durante a transcrição: {mensagem}")
+        self.adicionar_log_console(f"Erro durante a transcrição ({trabalho['nome']}): {mensagem}")
+        self._finalizar_trabalho(trabalho, ERRO, mensagem)
 
-    def adicionar_ao_historico(self):
-        base = os.path.splitext(os.path.basename(self.caminho_arquivo))[0]
+    def adicionar_ao_historico(self, base, idioma_cod):
         nome_transcricao = f"transcricao_{base}.txt"
-        idioma_cod = self.combo_idioma.currentData()
-        data = {
-            "arquivo": nome_transcricao,
-            "nome": nome_transcricao,
-            "data": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "idioma": idioma_cod
-        }
-        historico = self._ler_historico_arquivo()
-        historico = [h for h in historico if h["arquivo"] != data["arquivo"]]
-        historico.insert(0, data)
-        max_itens = self.config.get("max_historico", 20)
-        historico = historico[:max_itens]
-        self._salvar_historico_arquivo(historico)
+        try:
+            HISTORICO_TRANSCRICOES.adicionar(
+                nome_transcricao, nome_transcricao, datetime.now().strftime("%Y-%m-%d %H:%M"), idioma_cod
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao salvar histórico: {str(e)}")
+            self.adicionar_log_console(f"Erro ao salvar histórico: {e}")
+            return
         self.carregar_historico()
         self.adicionar_log_console(f"Transcrição adicionada ao histórico: {nome_transcricao}")
 
     def carregar_historico(self):
-        historico = self._ler_historico_arquivo()
-        self._historico_cache = historico
-        self.filtrar_historico(self.busca_historico.text())
-
-    def _ler_historico_arquivo(self):
-        if os.path.exists(HISTORICO_PATH):
-            try:
-                with open(HISTORICO_PATH, "r", encoding="utf-8") as f:
-                    historico = json.load(f)
-                    if isinstance(historico, list):
-                        return historico
-            except Exception:
-                pass
-        return []
-
-    def _salvar_historico_arquivo(self, historico):
+        """Consulta o histórico com o texto da busca e preenche a lista (cada item guarda o seu arquivo)."""
+        texto = self.busca_historico.text().strip()
+        idiomas = [cod for cod, nome in IDIOMAS if texto and texto.lower() in nome.lower()]
         try:
-            with open(HISTORICO_PATH, "w", encoding="utf-8") as f:
-                json.dump(historico, f, indent=2, ensure_ascii=False)
+            entradas = HISTORICO_TRANSCRICOES.filtrar(texto, idiomas, limite=LIMITE_LISTA_HISTORICO)
+            total = HISTORICO_TRANSCRICOES.total()
         except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao salvar histórico: {str(e)}")
-            self.adicionar_log_console(f"Erro ao salvar histórico: {e}")
-
-    def filtrar_historico(self, texto):
-        texto = texto.strip().lower()
+            self.adicionar_log_console(f"Erro ao ler histórico: {e}")
+            entradas, total = [], 0
+        self.lista_historico.setUpdatesEnabled(False)
         self.lista_historico.clear()
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                display = f"{h['nome']}  ({h['data']}, {idioma_nome})"
-                self.lista_historico.addItem(display)
+        for h in entradas:
+            idioma_nome = NOMES_IDIOMAS.get(h["idioma"], h["idioma"])
+            item = QListWidgetItem(f"{h['nome']}  ({h['data']}, {idioma_nome})")
+            item.setData(Qt.ItemDataRole.UserRole, h["arquivo"])
+            self.lista_historico.addItem(item)
+        self.lista_historico.setUpdatesEnabled(True)
+        if len(entradas) >= LIMITE_LISTA_HISTORICO:
+            self.label_historico.setText(f"Histórico de transcrições ({len(entradas)} mais recentes de {total}):")
+        else:
+            self.label_historico.setText("Histórico de transcrições:")
 
     def abrir_do_historico(self, item):
-        idx = self.lista_historico.currentRow()
-        filtrados = []
-        texto = self.busca_historico.text().strip().lower()
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                filtrados.append(h)
-        if idx >= len(filtrados):
+        nome_arquivo = item.data(Qt.ItemDataRole.UserRole)
+        if not nome_arquivo:
             return
-        nome_arquivo = filtrados[idx]["arquivo"]
         caminho = os.path.join(TRANSCRICOES_DIR, nome_arquivo)
         if os.path.exists(caminho):
-            with open(caminho, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-            self.texto_transcricao.clear()
-            self.texto_transcricao.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByKeyboard | Qt.TextInteractionFlag.TextSelectableByMouse)
-            self.texto_transcricao.setPlainText(conteudo)
+            self._parar_exibicao_em_andamento()
+            self._mostrar_transcricao(caminho)
             self.adicionar_log_console(f"Transcrição do histórico carregada: {nome_arquivo}")
         else:
             QMessageBox.warning(self, "Aviso", "Arquivo de transcrição não encontrado!")
             self.adicionar_log_console(f"Arquivo do histórico não encontrado: {nome_arquivo}")
 
     def remover_selecionado(self):
-        idx = self.lista_historico.currentRow()
-        texto = self.busca_historico.text().strip().lower()
-        filtrados = []
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                filtrados.append(h)
-        if idx < 0 or idx >= len(filtrados):
+        item = self.lista_historico.currentItem()
+        if item is None:
+            return
+        nome_arquivo = item.data(Qt.ItemDataRole.UserRole)
+        try:
+            HISTORICO_TRANSCRICOES.remover(nome_arquivo)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao salvar histórico: {str(e)}")
+            self.adicionar_log_console(f"Erro ao salvar histórico: {e}")
             return
-        to_remove = filtrados[idx]
-        historico = self._ler_historico_arquivo()
-        historico = [h for h in historico if h != to_remove]
-        self._salvar_historico_arquivo(historico)
         self.carregar_historico()
-        self.adicionar_log_console(f"Entrada removida do histórico: {to_remove['nome']}")
+        self.adicionar_log_console(f"Entrada removida do histórico: {nome_arquivo}")
 
     def limpar_historico(self):
         resp = QMessageBox.question(self, "Limpar histórico", "Tem certeza que deseja apagar todo o histórico?")
         if resp == QMessageBox.StandardButton.Yes:
             try:
-                if os.path.exists(HISTORICO_PATH):
-                    os.remove(HISTORICO_PATH)
+                HISTORICO_TRANSCRICOES.limpar()
                 self.adicionar_log_console("Histórico de transcrições limpo.")
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Erro ao apagar histórico: {str(e)}")
                 self.adicionar_log_console(f"Erro ao apagar histórico: {e}")
             self.carregar_historico()
 
+    def buscar_nas_transcricoes(self):
+        self.timer_busca_transcricoes.stop()
+        texto = self.busca_transcricoes.text().strip()
+        if not texto:
+            self.lista_resultados_busca.clear()
+            self.lista_resultados_busca.setVisible(False)
+            return
+        thread = BuscaTranscricoesThread(texto)
+        thread.resultados.connect(self.exibir_resultados_busca)
+        thread.finished.connect(lambda: self._buscas.remove(thread) if thread in self._buscas else None)
+        self._buscas.append(thread)
+        thread.start()
+
+    def exibir_resultados_busca(self, texto, acertos):
+        if texto != self.busca_transcricoes.text().strip():
+            return  # resposta de uma busca antiga; o usuário já digitou outra coisa
+        self.lista_resultados_busca.setUpdatesEnabled(False)
+        self.lista_resultados_busca.clear()
+        for acerto in acertos:
+            nome = acerto["arquivo"][len("transcricao_"):-len(".txt")]
+            item = QListWidgetItem(
+                f"{nome} [{format_timestamp(acerto['inicio_ms'] / 1000)}] {acerto['falante']}: {acerto['trecho']}"
+            )
+            item.setToolTip(acerto["trecho"])
+            item.setData(Qt.ItemDataRole.UserRole, acerto)
+            self.lista_resultados_busca.addItem(item)
+        if not acertos:
+            self.lista_resultados_busca.addItem("Nenhuma transcrição contém essa frase.")
+        self.lista_resultados_busca.setUpdatesEnabled(True)
+        self.lista_resultados_busca.setVisible(True)
+
+    def abrir_resultado_busca(self, item):
+        acerto = item.data(Qt.ItemDataRole.UserRole)
+        if not acerto:
+            return
+        caminho = os.path.join(TRANSCRICOES_DIR, acerto["arquivo"])
+        if not os.path.exists(caminho):
+            QMessageBox.warning(self, "Aviso", "Arquivo de transcrição não encontrado!")
+            self.adicionar_log_console(f"Arquivo da busca não encontrado: {acerto['arquivo']}")
+            return
+        self._parar_exibicao_em_andamento()
+        self._mostrar_transcricao(caminho)
+        self.ir_para_segmento(acerto["falante"], acerto["inicio_ms"], acerto["fim_ms"])
+        self.adicionar_log_console(
+            f"Transcrição aberta na busca: {acerto['arquivo']} em {format_timestamp(acerto['inicio_ms'] / 1000)}"
+        )
+
+    def ir_para_segmento(self, falante, inicio_ms, fim_ms):
+        """Seleciona e rola até a linha do segmento (mesmo cabeçalho escrito por linha_transcricao)."""
+        cabecalho = f"[{format_timestamp(inicio_ms / 1000)} -> {format_timestamp(fim_ms / 1000)}] {falante}:"
+        return self.visualizador.ir_para_texto(cabecalho)
+
     def baixar_transcricao(self):
         if not self.caminho_arquivo:
             QMessageBox.warning(self, "Aviso", "Nenhuma transcrição para baixar.")
             return
-        base = os.path.splitext(os.path.basename(self.caminho_arquivo))[0]
+        base = self.nome_base_arquivo
         nome_transcricao = f"transcricao_{base}.txt"
         caminho_transcr = os.path.join(TRANSCRICOES_DIR, nome_transcricao)
         if not os.path.exists(caminho_transcr):
@@ -670,7 +1034,7 @@ class TranscricaoTab(QWidget):
         if not self.caminho_arquivo:
             QMessageBox.warning(self, "Aviso", "Nenhuma tradução para baixar.")
             return
-        base = os.path.splitext(os.path.basename(self.caminho_arquivo))[0]
+        base = self.nome_base_arquivo
         nome_traducao = f"transcricao_{base}_ingles.txt"
         caminho_trad = os.path.join(TRANSCRICOES_DIR, nome_traducao)
         if not os.path.exists(caminho_trad):
@@ -0,0 +1,179 @@
+import numpy as np
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log
+
+# Agrupamento dos embeddings de voz (um por janela) em falantes. Todos os métodos
+# devolvem um rótulo inteiro por janela (0, 1, ... na ordem em que cada falante aparece
+# pela primeira vez) e -1 para janelas que não pertencem a nenhum falante.
+
+METODO_PADRAO = "dbscan"
+
+PARAMETROS_PADRAO = {
+    "dbscan": {"eps": 0.6, "min_samples": 3},
+    # Distância de cosseno média (average linkage) abaixo da qual dois grupos se juntam;
+    # acima de max_pontos janelas, o dendrograma é feito numa amostra e o resto é atribuído
+    "aglomerativo": {"limiar_distancia": 0.35, "max_pontos": 2000, "min_membros": 3},
+    # Similaridade de cosseno mínima com o centróide para entrar num falante existente
+    "online": {"limiar_similaridade": 0.75, "max_falantes": 32, "min_membros": 3},
+}
+
+# Janelas comparadas com os centróides por vez (memória ~ LOTE x falantes)
+LOTE_ATRIBUICAO = 4096
+
+def normalizar_l2(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    normas = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(normas, 1e-12)
+
+def renumerar(labels):
+    """Rótulos 0..K-1 na ordem da primeira aparição; -1 é mantido."""
+    labels = np.asarray(labels)
+    mapa = {}
+    for label in labels:
+        if label != -1 and label not in mapa:
+            mapa[label] = len(mapa)
+    return np.array([mapa.get(label, -1) for label in labels], dtype=int)
+
+def centroides_dos_rotulos(embeddings, labels):
+    """Centróides L2-normalizados de cada rótulo (índice = rótulo), ignorando -1."""
+    quantidade = int(labels.max()) + 1 if len(labels) and labels.max() >= 0 else 0
+    centroides = np.zeros((quantidade, embeddings.shape[1]), dtype=np.float32)
+    np.add.at(centroides, labels[labels >= 0], embeddings[labels >= 0])
+    return normalizar_l2(centroides) if quantidade else centroides
+
+def atribuir_aos_centroides(embeddings, centroides, limiar_similaridade=None):
+    """Rótulo do centróide mais próximo (cosseno) de cada janela, em lotes de memória fixa."""
+    labels = np.full(len(embeddings), -1, dtype=int)
+    if len(centroides) == 0:
+        return labels
+    for inicio in range(0, len(embeddings), LOTE_ATRIBUICAO):
+        similaridades = embeddings[inicio:inicio + LOTE_ATRIBUICAO] @ centroides.T
+        melhores = similaridades.argmax(axis=1)
+        if limiar_similaridade is not None:
+            aceitos = similaridades[np.arange(len(melhores)), melhores] >= limiar_similaridade
+            melhores = np.where(aceitos, melhores, -1)
+        labels[inicio:inicio + LOTE_ATRIBUICAO] = melhores
+    return labels
+
+def descartar_grupos_pequenos(labels, min_membros):
+    """Grupos com menos de `min_membros` janelas viram -1 (como o ruído do DBSCAN)."""
+    if min_membros <= 1 or not len(labels):
+        return labels
+    rotulos, contagens = np.unique(labels[labels >= 0], return_counts=True)
+    pequenos = rotulos[contagens < min_membros]
+    if len(pequenos):
+        labels = np.where(np.isin(labels, pequenos), -1, labels)
+    return labels
+
+def agrupar_dbscan(embeddings, eps=0.6, min_samples=3):
+    """O método original: DBSCAN euclidiano sobre todos os embeddings (memória cresce com N)."""
+    from sklearn.cluster import DBSCAN
+    return DBSCAN(eps=eps, min_samples=min_samples).fit(embeddings).labels_
+
+def agrupar_aglomerativo(embeddings, limiar_distancia=0.35, max_pontos=2000, min_membros=3):
+    """
+    Agrupamento hierárquico (average linkage, distância de cosseno) com corte por distância,
+    sem número de falantes fixo. O dendrograma usa no máximo `max_pontos` janelas igualmente
+    espaçadas no tempo (memória ~ max_pontos² / 2 distâncias); as demais janelas vão para o
+    centróide mais próximo.
+    """
+    from scipy.cluster.hierarchy import linkage, fcluster
+
+    embeddings = normalizar_l2(embeddings)
+    if len(embeddings) < 2:
+        return np.zeros(len(embeddings), dtype=int)
+    if len(embeddings) > max_pontos:
+        amostra = np.linspace(0, len(embeddings) - 1, max_pontos).astype(int)
+    else:
+        amostra = np.arange(len(embeddings))
+    arvore = linkage(embeddings[amostra].astype(np.float64), method="average", metric="cosine")
+    labels_amostra = fcluster(arvore, t=limiar_distancia, criterion="distance") - 1
+    if len(amostra) == len(embeddings):
+        labels = labels_amostra
+    else:
+        centroides = centroides_dos_rotulos(embeddings[amostra], labels_amostra)
+        labels = atribuir_aos_centroides(embeddings, centroides)
+    return descartar_grupos_pequenos(labels, min_membros)
+
+class AgrupamentoOnline:
+    """
+    Agrupamento incremental: cada janela entra no falante de centróide mais parecido
+    (se a similaridade passar do limiar) ou abre um falante novo. Guarda só a soma dos
+    vetores de cada falante, então a memória não depende da duração do áudio.
+    """
+
+    def __init__(self, limiar_similaridade=0.75, max_falantes=32, min_membros=3):
+        self.limiar_similaridade = limiar_similaridade
+        self.max_falantes = max_falantes
+        self.min_membros = min_membros
+        self.somas = None
+        self.contagens = []
+
+    def centroides(self):
+        return normalizar_l2(self.somas) if self.somas is not None else np.zeros((0, 0), dtype=np.float32)
+
+    def adicionar(self, embeddings):
+        """Atribui as janelas (na ordem) e devolve os rótulos provisórios."""
+        embeddings = normalizar_l2(embeddings)
+        labels = np.empty(len(embeddings), dtype=int)
+        centroides = self.centroides()
+        for i, vetor in enumerate(embeddings):
+            if len(self.contagens):
+                similaridades = centroides @ vetor
+                melhor = int(similaridades.argmax())
+                novo = similaridades[melhor] < self.limiar_similaridade and len(self.contagens) < self.max_falantes
+            else:
+                novo = True
+            if novo:
+                self.somas = vetor[None, :].copy() if self.somas is None else np.vstack([self.somas, vetor])
+                self.contagens.append(1)
+                melhor = len(self.contagens) - 1
+                centroides = np.vstack([centroides, vetor]) if len(centroides) else vetor[None, :].copy()
+            else:
+                self.somas[melhor] += vetor
+                self.contagens[melhor] += 1
+                centroides[melhor] = self.somas[melhor] / max(np.linalg.norm(self.somas[melhor]), 1e-12)
+            labels[i] = melhor
+        return labels
+
+    def finalizar(self, embeddings):
+        """
+        Segunda passada com os centróides finais: corrige as janelas atribuídas no começo,
+        quando os centróides ainda eram instáveis, e descarta falantes com poucas janelas;
+        janelas abaixo do limiar com todos os falantes restantes ficam -1.
+        """
+        embeddings = normalizar_l2(embeddings)
+        validos = np.array(self.contagens) >= self.min_membros
+        if not validos.any():
+            return np.full(len(embeddings), -1, dtype=int)
+        indices_validos = np.flatnonzero(validos)
+        labels = atribuir_aos_centroides(
+            embeddings, self.centroides()[indices_validos], self.limiar_similaridade
+        )
+        return np.where(labels >= 0, indices_validos[np.maximum(labels, 0)], -1)
+
+def agrupar_online(embeddings, limiar_similaridade=0.75, max_falantes=32, min_membros=3):
+    agrupamento = AgrupamentoOnline(limiar_similaridade, max_falantes, min_membros)
+    agrupamento.adicionar(embeddings)
+    return agrupamento.finalizar(embeddings)
+
+METODOS_AGRUPAMENTO = {
+    "dbscan": agrupar_dbscan,
+    "aglomerativo": agrupar_aglomerativo,
+    "online": agrupar_online,
+}
+
+def agrupar_embeddings(embeddings, metodo=None, **parametros):
+    """
+    Agrupa os embeddings com o método escolhido ("dbscan", "aglomerativo" ou "online").
+    Parâmetros não informados vêm de PARAMETROS_PADRAO.
+    """
+    metodo = metodo or METODO_PADRAO
+    if metodo not in METODOS_AGRUPAMENTO:
+        adicionar_log(f"Método de agrupamento desconhecido '{metodo}'; usando '{METODO_PADRAO}'.")
+        metodo = METODO_PADRAO
+    if len(embeddings) == 0:
+        return np.zeros(0, dtype=int)
+    parametros = dict(PARAMETROS_PADRAO[metodo], **parametros)
+    return renumerar(METODOS_AGRUPAMENTO[metodo](embeddings, **parametros))
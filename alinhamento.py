@@ -0,0 +1,123 @@
+import heapq
+from bisect import bisect_right
+
+def alinhar_intervalos(consultas, intervalos):
+    """
+    Para cada intervalo de `consultas`, retorna a lista de índices de `intervalos`
+    que se sobrepõem a ele (bordas inclusivas: ini <= fim_consulta e fim >= ini_consulta).
+
+    Ambas as listas são de pares (inicio, fim) e devem estar ordenadas pelo início,
+    como acontece com as janelas da diarização e com os segmentos do Whisper; os fins
+    podem estar em qualquer ordem. Os intervalos que já começaram ficam num heap pelo
+    fim e saem dele quando terminam antes da consulta atual (não servem mais a nenhuma
+    consulta seguinte); os que continuam vivos são percorridos pelo início, pulando os
+    que saíram. Custo O((n + m + total de sobreposições) · log n), qualquer que seja a
+    ordem dos fins (um intervalo longo no começo não faz cada consulta percorrer o prefixo).
+    """
+    if not intervalos:
+        return [[] for _ in consultas]
+    total = len(intervalos)
+    # proximo_vivo[k]: menor índice >= k que ainda não saiu (total = nenhum)
+    proximo_vivo = list(range(total + 1))
+
+    def vivo_a_partir(k):
+        raiz = k
+        while proximo_vivo[raiz] != raiz:
+            raiz = proximo_vivo[raiz]
+        while proximo_vivo[k] != raiz:
+            proximo_vivo[k], k = raiz, proximo_vivo[k]
+        return raiz
+
+    resultado = []
+    ativos = []
+    proximo = 0
+    for ini_consulta, fim_consulta in consultas:
+        while proximo < total and intervalos[proximo][0] <= fim_consulta:
+            heapq.heappush(ativos, (intervalos[proximo][1], proximo))
+            proximo += 1
+        while ativos and ativos[0][0] < ini_consulta:
+            _, k = heapq.heappop(ativos)
+            proximo_vivo[k] = k + 1
+        indices = []
+        k = vivo_a_partir(0)
+        while k < proximo and intervalos[k][0] <= fim_consulta:
+            indices.append(k)
+            k = vivo_a_partir(k + 1)
+        resultado.append(indices)
+    return resultado
+
+def atribuir_por_sobreposicao(intervalos, segmentos):
+    """
+    Distribui os segmentos (dicts com start/end, ordenados pelo início) entre os
+    `intervalos` (pares ordenados): cada segmento vai para um único intervalo, o de
+    maior sobreposição, ou o mais próximo quando não se sobrepõe a nenhum.
+    Retorna, para cada intervalo, a lista de índices dos segmentos atribuídos a ele.
+    """
+    grupos = [[] for _ in intervalos]
+    if not intervalos:
+        return grupos
+    pares = [(seg["start"], seg["end"]) for seg in segmentos]
+    inicios = [ini for ini, _ in intervalos]
+    # Índice do intervalo de maior fim até cada posição: com os fins fora de ordem, o
+    # vizinho mais próximo à esquerda nem sempre é o último que começou antes
+    maior_fim = []
+    for k, (_, fim) in enumerate(intervalos):
+        maior_fim.append(k if not maior_fim or fim > intervalos[maior_fim[-1]][1] else maior_fim[-1])
+    for j, indices in enumerate(alinhar_intervalos(pares, intervalos)):
+        ini, fim = pares[j]
+        if indices:
+            melhor = max(indices, key=lambda k: (min(fim, intervalos[k][1]) - max(ini, intervalos[k][0]), -k))
+        else:
+            posicao = bisect_right(inicios, ini)
+            esquerda = [maior_fim[posicao - 1]] if posicao > 0 else []
+            candidatos = esquerda + ([posicao] if posicao < len(intervalos) else [])
+            melhor = min(candidatos, key=lambda k: max(intervalos[k][0] - fim, ini - intervalos[k][1], 0))
+        grupos[melhor].append(j)
+    return grupos
+
+def _votar(ativos, anterior):
+    """Falante com mais janelas ativas; empate favorece o falante anterior; 'unknown' só sem outro voto."""
+    conhecidos = {falante: votos for falante, votos in ativos.items() if falante != "unknown"}
+    if not conhecidos:
+        return "unknown"
+    maximo = max(conhecidos.values())
+    empatados = [falante for falante, votos in conhecidos.items() if votos == maximo]
+    if anterior in empatados:
+        return anterior
+    return min(empatados)
+
+def construir_turnos(diarizacao, intervalo_maximo=0.5):
+    """
+    Converte as janelas sobrepostas da diarização (inicio, fim, falante) em turnos sem
+    sobreposição. A linha do tempo é cortada em todas as bordas de janela; cada trecho
+    recebe o falante da maioria das janelas que o cobrem, e trechos seguidos do mesmo
+    falante (separados por no máximo `intervalo_maximo` s) viram um só turno.
+    """
+    eventos = []
+    for ini, fim, falante in diarizacao:
+        if fim > ini:
+            eventos.append((ini, 1, falante))
+            eventos.append((fim, -1, falante))
+    # No mesmo instante, as janelas que terminam saem antes das que começam
+    eventos.sort(key=lambda evento: (evento[0], evento[1]))
+
+    turnos = []
+    ativos = {}
+    anterior = None
+    i = 0
+    while i < len(eventos):
+        instante = eventos[i][0]
+        if ativos and anterior is not None and instante > anterior:
+            falante = _votar(ativos, turnos[-1][2] if turnos else None)
+            if turnos and turnos[-1][2] == falante and anterior - turnos[-1][1] <= intervalo_maximo:
+                turnos[-1][1] = instante
+            else:
+                turnos.append([anterior, instante, falante])
+        while i < len(eventos) and eventos[i][0] == instante:
+            _, delta, falante = eventos[i]
+            ativos[falante] = ativos.get(falante, 0) + delta
+            if ativos[falante] == 0:
+                del ativos[falante]
+            i += 1
+        anterior = instante
+    return [tuple(turno) for turno in turnos]
@@ -0,0 +1,353 @@
+"""
+Benchmark ponta a ponta do pipeline de transcrição com áudio sintético.
+
+Gera gravações determinísticas (várias durações, números de falantes e proporções de
+silêncio), executa cada etapa do pipeline e registra tempo de parede, tempo de CPU,
+fator de tempo real (RTF = tempo / duração do áudio) e pico de memória (RSS).
+Roda offline, na CPU, com o modelo `tiny` (que precisa já estar no cache do Whisper).
+
+    python benchmark_pipeline.py --saida resultados.json
+    python benchmark_pipeline.py --rapido --baseline baseline.json --tolerancia 0.2
+    python benchmark_pipeline.py --salvar-baseline baseline.json
+    python benchmark_pipeline.py --agrupamento --saida agrupamento.json
+
+O áudio sintético não tem fala real: o texto do Whisper não importa aqui, só o custo.
+"""
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+from metricas import pico_rss_mb
+
+TAXA_SINTETICA = 44100  # diferente de 16 kHz de propósito: a extração também reamostra
+
+CENARIOS_PADRAO = [
+    # (duração s, falantes, proporção de silêncio)
+    (30, 1, 0.1),
+    (30, 2, 0.4),
+    (120, 2, 0.1),
+    (120, 4, 0.4),
+    (600, 3, 0.2),
+]
+CENARIOS_RAPIDOS = [(20, 2, 0.2), (60, 3, 0.3)]
+
+# Benchmark só do agrupamento de falantes (embeddings sintéticos): (duração em min, falantes)
+CENARIOS_AGRUPAMENTO = [(10, 2), (60, 4), (180, 6), (360, 8)]
+PASSO_JANELA_S = 0.75  # window - overlap de PARAMETROS_DIARIZACAO
+
+ETAPAS = ["extracao", "vad", "diarizacao", "carga_modelo", "transcricao", "combinacao", "traducao", "ponta_a_ponta"]
+
+def gerar_audio_sintetico(caminho, duracao_s, falantes, silencio, semente=0, taxa=TAXA_SINTETICA):
+    """
+    Grava um WAV mono 16 bits com turnos alternados de "falantes" sintéticos: cada um tem
+    frequência fundamental, harmônicos e ritmo de sílabas próprios. `silencio` é a fração
+    aproximada do tempo sem sinal, distribuída em pausas entre os turnos.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(semente)
+    perfis = [
+        {
+            "f0": 95 + 160 * i / max(falantes - 1, 1) + rng.uniform(-5, 5),
+            "harmonicos": rng.uniform(0.2, 1.0, size=8),
+            "silabas_hz": rng.uniform(3.0, 6.0),
+        }
+        for i in range(falantes)
+    ]
+    total = int(duracao_s * taxa)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    falante = 0
+    while pos < total:
+        turno = int(rng.uniform(2.0, 6.0) * taxa)
+        pausa = int(turno * silencio / max(1 - silencio, 1e-3) * rng.uniform(0.5, 1.5))
+        fim = min(total, pos + turno)
+        t = np.arange(fim - pos) / taxa
+        perfil = perfis[falante]
+        f0 = perfil["f0"] * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+        fase = 2 * np.pi * np.cumsum(f0) / taxa
+        sinal = sum(a * np.sin((k + 1) * fase) for k, a in enumerate(perfil["harmonicos"]))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * perfil["silabas_hz"] * t - np.pi / 2))
+        sinal = sinal * envelope + 0.01 * rng.standard_normal(len(t))
+        audio[pos:fim] = 0.3 * sinal / np.max(np.abs(sinal))
+        pos = fim + pausa
+        if falantes > 1:
+            falante = (falante + int(rng.integers(1, falantes))) % falantes
+
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    with wave.open(caminho, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(taxa)
+        wav.writeframes(pcm.tobytes())
+    return caminho
+
+class Cronometro:
+    """Mede uma etapa: tempo de parede, tempo de CPU do processo e pico de RSS ao final."""
+
+    def __init__(self, duracao_audio_s):
+        self.duracao_audio_s = duracao_audio_s
+        self.medidas = {}
+
+    def medir(self, etapa, funcao, *args, **kwargs):
+        parede = time.perf_counter()
+        cpu = time.process_time()
+        resultado = funcao(*args, **kwargs)
+        parede = time.perf_counter() - parede
+        cpu = time.process_time() - cpu
+        self.medidas.setdefault(etapa, []).append({
+            "parede_s": parede,
+            "cpu_s": cpu,
+            "rtf": parede / self.duracao_audio_s if self.duracao_audio_s else None,
+            "pico_rss_mb": pico_rss_mb(),
+        })
+        return resultado
+
+    def resumo(self):
+        """Mediana das repetições de cada etapa."""
+        saida = {}
+        for etapa, medidas in self.medidas.items():
+            saida[etapa] = {
+                chave: (statistics.median(m[chave] for m in medidas) if medidas[0][chave] is not None else None)
+                for chave in ("parede_s", "cpu_s", "rtf")
+            }
+            saida[etapa]["pico_rss_mb"] = max((m["pico_rss_mb"] or 0) for m in medidas) or None
+            saida[etapa]["repeticoes"] = len(medidas)
+        return saida
+
+def executar_cenario(caminho, duracao_s, modelo_nome, idioma, repeticoes, ponta_a_ponta):
+    import Transcricao_core_V3 as core
+    from ffmpeg_utils import garantir_ffmpeg, decodificar_pcm
+    from vad_webrtc import filtrar_fala
+    from diarizacao_resemblyzer import diarize_audio
+    from decodificacao_whisper import transcrever_e_traduzir
+
+    ffmpeg_cmd = garantir_ffmpeg()
+    if not ffmpeg_cmd:
+        raise RuntimeError("FFmpeg não encontrado.")
+    cronometro = Cronometro(duracao_s)
+    for _ in range(repeticoes):
+        audio = cronometro.medir("extracao", decodificar_pcm, caminho, ffmpeg_cmd)
+        audio_fala, mapa = cronometro.medir("vad", filtrar_fala, audio)
+        diarizacao = cronometro.medir("diarizacao", diarize_audio, audio_fala, verbose=False, **core.PARAMETROS_DIARIZACAO)
+        if mapa:
+            diarizacao = mapa.mapear_diarizacao(diarizacao)
+
+        # Carga a frio: o modelo sai do cache em memória antes de cada medida
+        core.MODELOS_WHISPER.descarregar(modelo_nome)
+        modelo = cronometro.medir("carga_modelo", core.MODELOS_WHISPER.obter, modelo_nome)
+        try:
+            resultado, _ = cronometro.medir("transcricao", transcrever_e_traduzir, modelo, audio_fala, idioma, False)
+            if mapa:
+                mapa.mapear_segmentos(resultado["segments"])
+            falantes = sorted({d[2] for d in diarizacao if d[2] != "unknown"})
+            label_map = {f: f"Speaker {i + 1}" for i, f in enumerate(falantes)}
+            cronometro.medir("combinacao", core.combinar_falantes, diarizacao, resultado["segments"], label_map)
+            cronometro.medir("traducao", modelo.transcribe, audio_fala, task="translate", language=idioma)
+        finally:
+            core.MODELOS_WHISPER.liberar(modelo_nome)
+
+        if ponta_a_ponta:
+            cronometro.medir("ponta_a_ponta", core.transcrever_com_diarizacao, caminho, modelo_nome, idioma)
+    return cronometro.resumo()
+
+def gerar_embeddings_sinteticos(janelas, falantes, semente=0, dimensao=256, ruido=0.03, semelhanca=0.5):
+    """
+    Embeddings L2-normalizados com turnos de falantes: cada falante tem um centro (todos com
+    similaridade ~`semelhanca` entre si, como vozes reais) e cada janela é centro + ruído.
+    Retorna (embeddings, rótulos verdadeiros).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(semente)
+    comum = rng.standard_normal(dimensao)
+    comum /= np.linalg.norm(comum)
+    centros = rng.standard_normal((falantes, dimensao))
+    centros /= np.linalg.norm(centros, axis=1, keepdims=True)
+    centros = np.sqrt(semelhanca) * comum + np.sqrt(1 - semelhanca) * centros
+    centros /= np.linalg.norm(centros, axis=1, keepdims=True)
+    verdade = np.empty(janelas, dtype=int)
+    pos, falante = 0, 0
+    while pos < janelas:
+        turno = int(rng.integers(4, 16))
+        verdade[pos:pos + turno] = falante
+        pos += turno
+        if falantes > 1:
+            falante = (falante + int(rng.integers(1, falantes))) % falantes
+    embeddings = centros[verdade] + ruido * rng.standard_normal((janelas, dimensao))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype(np.float32), verdade
+
+def pureza(labels, verdade):
+    """Fração das janelas cujo grupo tem a maioria do mesmo falante verdadeiro (ruído conta como erro)."""
+    import numpy as np
+
+    acertos = 0
+    for label in set(labels) - {-1}:
+        acertos += np.bincount(verdade[labels == label]).max()
+    return acertos / len(verdade)
+
+def executar_benchmark_agrupamento(cenarios, metodos=None):
+    """Tempo, pico de memória alocada (tracemalloc) e qualidade de cada método por duração."""
+    from agrupamento_falantes import agrupar_embeddings, METODOS_AGRUPAMENTO
+
+    resultados = []
+    for indice, (duracao_min, falantes) in enumerate(cenarios):
+        janelas = int(duracao_min * 60 / PASSO_JANELA_S)
+        embeddings, verdade = gerar_embeddings_sinteticos(janelas, falantes, semente=indice)
+        print(f"Agrupamento: {duracao_min} min, {janelas} janelas, {falantes} falantes", flush=True)
+        for metodo in metodos or list(METODOS_AGRUPAMENTO):
+            medida = {"duracao_min": duracao_min, "janelas": janelas, "falantes": falantes, "metodo": metodo}
+            tracemalloc.start()
+            parede = time.perf_counter()
+            try:
+                labels = agrupar_embeddings(embeddings, metodo)
+            except (ImportError, MemoryError) as e:
+                tracemalloc.stop()
+                medida["erro"] = f"{type(e).__name__}: {e}"
+                print(f"  {metodo:<13} {medida['erro']}")
+                resultados.append(medida)
+                continue
+            parede = time.perf_counter() - parede
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            medida.update({
+                "parede_s": parede,
+                "pico_alocado_mb": pico / (1024 * 1024),
+                "falantes_encontrados": len(set(labels) - {-1}),
+                "pureza": pureza(labels, verdade),
+            })
+            print(
+                f"  {metodo:<13} {parede:>8.2f}s  pico {medida['pico_alocado_mb']:>8.1f} MB  "
+                f"falantes {medida['falantes_encontrados']:>3}  pureza {medida['pureza']:.3f}"
+            )
+            resultados.append(medida)
+    return resultados
+
+def comparar_com_baseline(resultados, baseline, tolerancia):
+    """Lista de regressões: etapas cujo tempo de parede passou de baseline * (1 + tolerancia)."""
+    base = {c["nome"]: c["etapas"] for c in baseline.get("cenarios", [])}
+    regressoes = []
+    for cenario in resultados["cenarios"]:
+        etapas_base = base.get(cenario["nome"])
+        if not etapas_base:
+            continue
+        for etapa, medida in cenario["etapas"].items():
+            anterior = etapas_base.get(etapa)
+            if not anterior or not anterior.get("parede_s"):
+                continue
+            razao = medida["parede_s"] / anterior["parede_s"]
+            situacao = "REGRESSÃO" if razao > 1 + tolerancia else ("melhora" if razao < 1 - tolerancia else "ok")
+            print(f"{cenario['nome']:<28} {etapa:<14} {anterior['parede_s']:>9.2f}s -> {medida['parede_s']:>9.2f}s  ({razao:5.2f}x) {situacao}")
+            if situacao == "REGRESSÃO":
+                regressoes.append((cenario["nome"], etapa, razao))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de transcrição com áudio sintético.")
+    parser.add_argument("--modelo", default="tiny")
+    parser.add_argument("--idioma", default="en")
+    parser.add_argument("--rapido", action="store_true", help="Só os cenários curtos.")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--sem-ponta-a-ponta", action="store_true", help="Não executa transcrever_com_diarizacao inteiro.")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Piora relativa aceita no tempo de parede.")
+    parser.add_argument("--salvar-baseline", help="Também grava os resultados neste arquivo de baseline.")
+    parser.add_argument("--manter-audio", action="store_true", help="Não apaga os WAVs sintéticos.")
+    parser.add_argument("--agrupamento", action="store_true",
+                        help="Mede só o agrupamento de falantes (embeddings sintéticos, sem modelos).")
+    parser.add_argument("--metodos", help="Métodos de agrupamento separados por vírgula (padrão: todos).")
+    args = parser.parse_args(argv)
+
+    if args.agrupamento:
+        cenarios = CENARIOS_AGRUPAMENTO[:2] if args.rapido else CENARIOS_AGRUPAMENTO
+        metodos = [m.strip() for m in args.metodos.split(",")] if args.metodos else None
+        resultados = {
+            "versao": 1,
+            "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "agrupamento": executar_benchmark_agrupamento(cenarios, metodos),
+        }
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Resultados salvos em {args.saida}")
+        return 0
+
+    # CPU e offline: nada de GPU nem downloads durante a medida
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    import Transcricao_core_V3 as core
+    from cache_transcricoes import CACHE_TRANSCRICOES
+
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    if not os.path.exists(os.path.join(cache_dir, "whisper", f"{args.modelo}.pt")):
+        print(f"Modelo '{args.modelo}' não está no cache do Whisper ({cache_dir}); baixe-o antes de rodar offline.")
+        return 2
+    CACHE_TRANSCRICOES._limite_mb = 0  # o cache de resultados esconderia o custo real
+
+    pasta = tempfile.mkdtemp(prefix="benchmark_pipeline_")
+    cenarios = CENARIOS_RAPIDOS if args.rapido else CENARIOS_PADRAO
+    resultados = {
+        "versao": 1,
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "maquina": {
+            "plataforma": platform.platform(),
+            "processador": platform.processor(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {"modelo": args.modelo, "idioma": args.idioma, "repeticoes": args.repeticoes},
+        "cenarios": [],
+    }
+    try:
+        for indice, (duracao_s, falantes, silencio) in enumerate(cenarios):
+            nome = f"bench_{duracao_s}s_{falantes}f_{int(silencio * 100)}sil"
+            caminho = gerar_audio_sintetico(os.path.join(pasta, f"{nome}.wav"), duracao_s, falantes, silencio, semente=indice)
+            print(f"Cenário {nome}...", flush=True)
+            etapas = executar_cenario(
+                caminho, duracao_s, args.modelo, args.idioma, args.repeticoes, not args.sem_ponta_a_ponta
+            )
+            resultados["cenarios"].append({
+                "nome": nome, "duracao_s": duracao_s, "falantes": falantes, "silencio": silencio, "etapas": etapas,
+            })
+            for etapa in ETAPAS:
+                if etapa in etapas:
+                    m = etapas[etapa]
+                    rss = f"{m['pico_rss_mb']:.0f} MB" if m["pico_rss_mb"] else "-"
+                    print(f"  {etapa:<14} {m['parede_s']:>8.2f}s  cpu {m['cpu_s']:>8.2f}s  rtf {m['rtf']:.3f}  rss {rss}")
+            # Arquivos de saída de transcrever_com_diarizacao para o áudio sintético
+            for sufixo in ("", "_ingles"):
+                saida = os.path.join(core.get_app_dir(), "Transcricoes", f"transcricao_{nome}{sufixo}.txt")
+                if os.path.exists(saida):
+                    os.remove(saida)
+    finally:
+        if not args.manter_audio:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {args.saida}")
+    if args.salvar_baseline:
+        with open(args.salvar_baseline, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Baseline salva em {args.salvar_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressoes = comparar_com_baseline(resultados, baseline, args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} etapa(s) acima da tolerância de {args.tolerancia:.0%}.")
+            return 1
+        print("Sem regressões acima da tolerância.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log, DEBUG
+
+# Sobe quando o formato das entradas ou das transcrições mudar, invalidando o cache antigo
+VERSAO_CACHE = 2
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+def carregar_config():
+    config_path = os.path.join(get_app_dir(), "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def hash_audio(audio, hasher=None):
+    """SHA-256 do PCM decodificado (array float32), independente do contêiner e do nome do arquivo."""
+    hasher = hasher or hashlib.sha256()
+    hasher.update(audio.tobytes())
+    return hasher
+
+def hash_audio_em_fluxo(caminho, ffmpeg_cmd, duracao_bloco_s=60, cancelar=None):
+    """Mesmo hash de hash_audio, mas lendo o PCM em blocos (para arquivos longos)."""
+    from ffmpeg_utils import ler_pcm_em_blocos
+
+    hasher = hashlib.sha256()
+    for _, _, _, bloco in ler_pcm_em_blocos(caminho, ffmpeg_cmd, duracao_bloco_s, cancelar=cancelar):
+        hash_audio(bloco, hasher)
+    return hasher.hexdigest()
+
+class CacheTranscricoes:
+    """
+    Resultados de transcrição indexados pelo conteúdo do áudio e pelos parâmetros do pipeline.
+    Cada entrada é um JSON em <app>/cache_transcricoes; o tamanho total é limitado e as
+    entradas menos usadas recentemente (mtime) são removidas primeiro.
+    """
+
+    def __init__(self, pasta=None, limite_mb=None):
+        self.pasta = pasta or os.path.join(get_app_dir(), "cache_transcricoes")
+        self._limite_mb = limite_mb
+        self._lock = threading.Lock()
+
+    def limite_mb(self):
+        if self._limite_mb is not None:
+            return self._limite_mb
+        return float(carregar_config().get("cache_transcricoes_mb", 200))
+
+    def chave(self, hash_pcm, parametros):
+        dados = json.dumps(
+            {"versao": VERSAO_CACHE, "audio": hash_pcm, "parametros": parametros},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, f"{chave}.json")
+
+    def obter(self, chave):
+        """Retorna o dict salvo para a chave, ou None."""
+        caminho = self._caminho(chave)
+        with self._lock:
+            if not os.path.exists(caminho):
+                return None
+            try:
+                with open(caminho, "r", encoding="utf-8") as f:
+                    entrada = json.load(f)
+                os.utime(caminho)  # marca como usada recentemente
+            except Exception as e:
+                adicionar_log(f"Cache de transcrições: entrada inválida removida ({e}).")
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+                return None
+        adicionar_log(f"Cache de transcrições: acerto ({chave[:12]}).")
+        return entrada
+
+    def salvar(self, chave, entrada):
+        if self.limite_mb() <= 0:
+            return
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = self._caminho(chave)
+        temporario = caminho + ".tmp"
+        entrada = dict(entrada, criado=time.time())
+        with self._lock:
+            try:
+                with open(temporario, "w", encoding="utf-8") as f:
+                    json.dump(entrada, f, ensure_ascii=False)
+                os.replace(temporario, caminho)
+            except Exception as e:
+                adicionar_log(f"Cache de transcrições: falha ao salvar entrada: {e}")
+                return
+            self._aplicar_limite()
+        adicionar_log(f"Cache de transcrições: resultado salvo ({chave[:12]}).")
+
+    def _aplicar_limite(self):
+        limite = self.limite_mb() * 1024 * 1024
+        entradas = []
+        for nome in os.listdir(self.pasta):
+            if not nome.endswith(".json"):
+                continue
+            caminho = os.path.join(self.pasta, nome)
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= limite:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+                adicionar_log(f"Cache de transcrições: entrada removida por limite de tamanho ({os.path.basename(caminho)}).", DEBUG)
+            except OSError:
+                pass
+
+CACHE_TRANSCRICOES = CacheTranscricoes()
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log, DEBUG
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+PASTA_SCRIPT = get_app_dir()
+CHECKPOINTS_DIR = os.path.join(PASTA_SCRIPT, "Checkpoints")
+
+# Sobe quando o formato do diário mudar: diários de outra versão não são reaproveitados
+VERSAO_CHECKPOINT = 1
+# Checkpoints de trabalhos que nunca foram retomados são apagados depois deste tempo
+IDADE_MAXIMA_DIAS = 7
+
+def chave_trabalho(caminho, parametros):
+    """Identifica o trabalho pelo arquivo (caminho, tamanho, data de modificação) e pelos parâmetros."""
+    info = os.stat(caminho)
+    dados = json.dumps({
+        "versao": VERSAO_CHECKPOINT,
+        "arquivo": os.path.abspath(caminho),
+        "tamanho": info.st_size,
+        "mtime": info.st_mtime_ns,
+        "parametros": parametros,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()[:32]
+
+class CheckpointTrabalho:
+    """
+    Diário (só acrescenta) das etapas concluídas de uma transcrição, em Checkpoints/<chave>.
+    Cada linha do diario.jsonl é uma etapa pronta; arrays grandes vão para arquivos .npy
+    gravados antes da linha que os cita, então uma linha só existe com o dado completo.
+    Uma última linha cortada (queda no meio da escrita) é ignorada na leitura.
+    """
+
+    def __init__(self, chave, pasta=None):
+        self.chave = chave
+        self.pasta = os.path.join(pasta or CHECKPOINTS_DIR, chave)
+        self.caminho_diario = os.path.join(self.pasta, "diario.jsonl")
+        self.registros = []
+        self._lock = threading.Lock()
+        self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho_diario):
+            return
+        try:
+            validos = 0
+            with open(self.caminho_diario, "rb") as f:
+                for linha in f:
+                    try:
+                        if not linha.endswith(b"\n"):
+                            raise ValueError("linha incompleta")
+                        self.registros.append(json.loads(linha.decode("utf-8")))
+                    except ValueError:
+                        break
+                    validos += len(linha)
+            # Corta a linha incompleta para que os próximos registros não se juntem a ela
+            if validos < os.path.getsize(self.caminho_diario):
+                os.truncate(self.caminho_diario, validos)
+        except OSError as e:
+            adicionar_log(f"Checkpoint: não foi possível ler {self.caminho_diario}: {e}")
+            self.registros = []
+        if self.registros:
+            adicionar_log(f"Checkpoint encontrado: {len(self.registros)} etapa(s) já concluída(s) serão reaproveitadas.")
+
+    def registrar(self, etapa, **dados):
+        """Acrescenta a etapa ao diário e só retorna depois de gravada no disco."""
+        registro = dict(dados, etapa=etapa, momento=time.time())
+        linha = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(self.pasta, exist_ok=True)
+            with open(self.caminho_diario, "a", encoding="utf-8") as f:
+                f.write(linha + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.registros.append(registro)
+        adicionar_log(f"Checkpoint: etapa '{etapa}' gravada.", DEBUG)
+
+    def ultimo(self, etapa):
+        """Registro mais recente da etapa, ou None."""
+        for registro in reversed(self.registros):
+            if registro["etapa"] == etapa:
+                return registro
+        return None
+
+    def todos(self, etapa):
+        return [registro for registro in self.registros if registro["etapa"] == etapa]
+
+    def salvar_array(self, etapa, array, **dados):
+        nome = f"{etapa}.npy"
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = os.path.join(self.pasta, nome + ".tmp")
+        with open(temporario, "wb") as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, os.path.join(self.pasta, nome))
+        self.registrar(etapa, arquivo=nome, **dados)
+
+    def carregar_array(self, etapa):
+        """Array salvo por salvar_array(), ou None se a etapa não existir ou o arquivo estiver ruim."""
+        registro = self.ultimo(etapa)
+        if registro is None:
+            return None
+        try:
+            return np.load(os.path.join(self.pasta, registro["arquivo"]))
+        except Exception as e:
+            adicionar_log(f"Checkpoint: não foi possível ler a etapa '{etapa}': {e}")
+            return None
+
+    def limpar(self):
+        """Apaga o checkpoint (chamar depois que a transcrição final estiver salva)."""
+        with self._lock:
+            shutil.rmtree(self.pasta, ignore_errors=True)
+            self.registros = []
+
+def limpar_checkpoints_antigos(idade_maxima_dias=IDADE_MAXIMA_DIAS):
+    """Remove checkpoints sem alteração há mais de `idade_maxima_dias` (trabalhos abandonados)."""
+    if not os.path.isdir(CHECKPOINTS_DIR):
+        return 0
+    limite = time.time() - idade_maxima_dias * 86400
+    removidos = 0
+    for entrada in os.scandir(CHECKPOINTS_DIR):
+        if not entrada.is_dir():
+            continue
+        diario = os.path.join(entrada.path, "diario.jsonl")
+        try:
+            modificado = os.path.getmtime(diario) if os.path.exists(diario) else entrada.stat().st_mtime
+        except OSError:
+            continue
+        if modificado < limite:
+            shutil.rmtree(entrada.path, ignore_errors=True)
+            removidos += 1
+    if removidos:
+        adicionar_log(f"Checkpoints: {removidos} trabalho(s) abandonado(s) removido(s).")
+    return removidos
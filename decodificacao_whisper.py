@@ -0,0 +1,225 @@
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log
+from erros_usuario import verificar_cancelamento
+
+# Mesmos limiares padrão do whisper.transcribe
+TEMPERATURAS = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+LIMIAR_COMPRESSAO = 2.4
+LIMIAR_LOGPROB = -1.0
+LIMIAR_SEM_FALA = 0.6
+
+def _decodificar_com_fallback(modelo, features, opcoes_base):
+    """Decodifica features já codificadas, subindo a temperatura como o whisper.transcribe faz."""
+    from whisper.decoding import DecodingOptions
+
+    resultado = None
+    for temperatura in TEMPERATURAS:
+        opcoes = DecodingOptions(temperature=temperatura, **opcoes_base)
+        resultado = modelo.decode(features, opcoes)[0]
+        precisa_fallback = (
+            resultado.compression_ratio > LIMIAR_COMPRESSAO
+            or resultado.avg_logprob < LIMIAR_LOGPROB
+        )
+        if resultado.no_speech_prob > LIMIAR_SEM_FALA and resultado.avg_logprob < LIMIAR_LOGPROB:
+            precisa_fallback = False  # silêncio: não adianta tentar de novo
+        if not precisa_fallback:
+            break
+    return resultado
+
+def _eh_silencio(resultado):
+    return resultado.no_speech_prob > LIMIAR_SEM_FALA and resultado.avg_logprob <= LIMIAR_LOGPROB
+
+def segmentos_de_tokens(tokens, tokenizer, deslocamento_s, tamanho_janela, passo_entrada, precisao):
+    """
+    Converte os tokens de uma janela em segmentos (inicio, fim, texto) usando os tokens de
+    timestamp, seguindo a mesma regra do whisper.transcribe.
+    Retorna (segmentos, avanco_em_frames).
+    """
+    from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+
+    ts_inicio = tokenizer.timestamp_begin
+    eh_ts = [t >= ts_inicio for t in tokens]
+    termina_com_ts_unico = eh_ts[-2:] == [False, True]
+    consecutivos = [i + 1 for i in range(len(tokens) - 1) if eh_ts[i] and eh_ts[i + 1]]
+
+    def texto(trecho):
+        return tokenizer.decode([t for t in trecho if t < tokenizer.eot])
+
+    brutos = []
+    if consecutivos:
+        fatias = consecutivos + ([len(tokens)] if termina_com_ts_unico else [])
+        ultimo = 0
+        for atual in fatias:
+            trecho = tokens[ultimo:atual]
+            inicio = deslocamento_s + (trecho[0] - ts_inicio) * precisao
+            fim = deslocamento_s + (trecho[-1] - ts_inicio) * precisao
+            brutos.append((inicio, fim, texto(trecho)))
+            ultimo = atual
+        if termina_com_ts_unico:
+            avanco = tamanho_janela
+        else:
+            avanco = (tokens[ultimo - 1] - ts_inicio) * passo_entrada
+    else:
+        duracao = tamanho_janela * HOP_LENGTH / SAMPLE_RATE
+        timestamps = [t for t in tokens if t >= ts_inicio]
+        if timestamps and timestamps[-1] != ts_inicio:
+            duracao = (timestamps[-1] - ts_inicio) * precisao
+        brutos.append((deslocamento_s, deslocamento_s + duracao, texto(tokens)))
+        avanco = tamanho_janela
+
+    segmentos = [(i, f, t) for i, f, t in brutos if f > i and t.strip()]
+    return segmentos, max(int(avanco), 1)
+
+def decodificar_janelas(modelo, audio, idioma=None, traduzir=False, deslocamento_s=0.0,
+                        seek_inicial=0, contexto=None, cancelar=None, tarefa="transcribe"):
+    """
+    Percorre o áudio em janelas de 30 s. Cada janela passa pelo encoder UMA vez e as mesmas
+    features alimentam o decoder de transcrição e, se `traduzir`, o de tradução para inglês.
+
+    `audio` pode ser um caminho ou um array float32 de 16 kHz.
+    Gera dicts {"seek", "proximo_seek", "inicio", "fim", "idioma", "contexto",
+    "transcricao": [...], "traducao": [...]}, onde cada item das listas é um segmento no
+    formato do whisper (start/end/text). Para continuar uma decodificação interrompida,
+    passe o "proximo_seek" e o "contexto" (tokens de prompt) da última janela pronta.
+    `cancelar` (função) é consultada antes de cada janela; se pedir, levanta TranscricaoCancelada.
+    Com `tarefa="translate"` só a tradução é decodificada (e conduz o avanço das janelas),
+    como em modelo.transcribe(task="translate"); os segmentos saem em "traducao".
+    """
+    import torch
+    from whisper.audio import log_mel_spectrogram, pad_or_trim, N_FRAMES, N_SAMPLES, HOP_LENGTH, SAMPLE_RATE
+    from whisper.tokenizer import get_tokenizer
+
+    fp16 = modelo.device != torch.device("cpu")
+    dtype = torch.float16 if fp16 else torch.float32
+    mel = log_mel_spectrogram(audio, modelo.dims.n_mels, padding=N_SAMPLES)
+    frames_conteudo = mel.shape[-1] - N_FRAMES
+    passo_entrada = N_FRAMES // modelo.dims.n_audio_ctx
+    precisao = passo_entrada * HOP_LENGTH / SAMPLE_RATE
+
+    tokens_anteriores = {"transcribe": [], "translate": []}
+    if contexto:
+        tokens_anteriores.update({tarefa: list(tokens) for tarefa, tokens in contexto.items()})
+    seek = seek_inicial
+    while seek < frames_conteudo:
+        verificar_cancelamento(cancelar)
+        tamanho_janela = min(N_FRAMES, frames_conteudo - seek)
+        inicio_janela = deslocamento_s + seek * HOP_LENGTH / SAMPLE_RATE
+        trecho_mel = pad_or_trim(mel[:, seek:seek + tamanho_janela], N_FRAMES).to(modelo.device).to(dtype)
+        with torch.no_grad():
+            features = modelo.embed_audio(trecho_mel.unsqueeze(0))
+
+        if idioma is None:
+            if modelo.is_multilingual:
+                _, probs = modelo.detect_language(features)
+                idioma = max(probs[0], key=probs[0].get)
+            else:
+                idioma = "en"
+            adicionar_log(f"Idioma detectado pelo Whisper: {idioma}")
+
+        tokenizer = get_tokenizer(
+            modelo.is_multilingual, num_languages=modelo.num_languages, language=idioma, task=tarefa
+        )
+        saida = {"seek": seek, "inicio": inicio_janela, "idioma": idioma, "transcricao": [], "traducao": []}
+
+        resultado = _decodificar_com_fallback(modelo, features, {
+            "task": tarefa, "language": idioma, "fp16": fp16,
+            "prompt": tokens_anteriores[tarefa] or None,
+        })
+        if _eh_silencio(resultado):
+            seek += tamanho_janela
+            saida["fim"] = deslocamento_s + seek * HOP_LENGTH / SAMPLE_RATE
+            saida["proximo_seek"] = seek
+            saida["contexto"] = {tarefa: list(tokens) for tarefa, tokens in tokens_anteriores.items()}
+            yield saida
+            continue
+
+        segmentos, avanco = segmentos_de_tokens(
+            resultado.tokens, tokenizer, inicio_janela, tamanho_janela, passo_entrada, precisao
+        )
+        chave = "transcricao" if tarefa == "transcribe" else "traducao"
+        saida[chave] = [{"seek": seek, "start": i, "end": f, "text": t} for i, f, t in segmentos]
+        if resultado.temperature > 0.5:
+            tokens_anteriores[tarefa] = []
+        else:
+            tokens_anteriores[tarefa] = (tokens_anteriores[tarefa] + resultado.tokens)[-223:]
+        fim_janela = inicio_janela + avanco * HOP_LENGTH / SAMPLE_RATE
+
+        if traduzir and tarefa == "transcribe":
+            verificar_cancelamento(cancelar)
+            traducao = _decodificar_com_fallback(modelo, features, {
+                "task": "translate", "language": idioma, "fp16": fp16,
+                "prompt": tokens_anteriores["translate"] or None,
+            })
+            segmentos_trad, _ = segmentos_de_tokens(
+                traducao.tokens, tokenizer, inicio_janela, tamanho_janela, passo_entrada, precisao
+            )
+            # A próxima janela começa onde a transcrição parou: descarta o que ficaria repetido
+            saida["traducao"] = [
+                {"seek": seek, "start": i, "end": f, "text": t}
+                for i, f, t in segmentos_trad if i < fim_janela
+            ]
+            if traducao.temperature > 0.5:
+                tokens_anteriores["translate"] = []
+            else:
+                tokens_anteriores["translate"] = (tokens_anteriores["translate"] + traducao.tokens)[-223:]
+
+        seek += avanco
+        saida["fim"] = fim_janela
+        saida["proximo_seek"] = seek
+        saida["contexto"] = {tarefa: list(tokens) for tarefa, tokens in tokens_anteriores.items()}
+        yield saida
+
+def transcrever_e_traduzir(modelo, audio, idioma=None, traduzir=True, janela_callback=None, janelas_anteriores=(),
+                           cancelar=None):
+    """
+    Equivalente a chamar modelo.transcribe() e modelo.transcribe(task="translate"),
+    mas codificando cada janela de 30 s uma única vez.
+    `janela_callback`, se informado, recebe cada janela assim que é decodificada.
+    `janelas_anteriores` são janelas já prontas de uma execução interrompida: entram no
+    resultado (e passam pelo callback) e a decodificação continua depois da última delas.
+    `cancelar` é repassada a decodificar_janelas (parada entre janelas).
+    Retorna (resultado, resultado_traduzido) no formato do whisper; o segundo é None se traduzir=False.
+    """
+    segmentos, traduzidos = [], []
+    idioma_detectado = idioma
+    seek_inicial, contexto = 0, None
+    for janela in janelas_anteriores:
+        idioma_detectado = janela["idioma"]
+        seek_inicial, contexto = janela["proximo_seek"], janela["contexto"]
+        segmentos.extend(janela["transcricao"])
+        traduzidos.extend(janela["traducao"])
+        if janela_callback:
+            janela_callback(janela)
+    janelas = 0
+    for janela in decodificar_janelas(modelo, audio, idioma_detectado, traduzir,
+                                      seek_inicial=seek_inicial, contexto=contexto, cancelar=cancelar):
+        janelas += 1
+        idioma_detectado = janela["idioma"]
+        segmentos.extend(janela["transcricao"])
+        traduzidos.extend(janela["traducao"])
+        if janela_callback:
+            janela_callback(janela)
+    if traduzir:
+        adicionar_log(f"Decodificação com encoder compartilhado: {janelas} janelas de 30 s codificadas uma vez.")
+    else:
+        adicionar_log(f"Decodificação: {janelas} janelas de 30 s.")
+
+    def montar(lista):
+        for i, seg in enumerate(lista):
+            seg["id"] = i
+        return {"text": "".join(seg["text"] for seg in lista), "segments": lista, "language": idioma_detectado}
+
+    return montar(segmentos), (montar(traduzidos) if traduzir else None)
+
+def traduzir_em_janelas(modelo, audio, idioma=None, cancelar=None):
+    """
+    Equivalente a modelo.transcribe(task="translate"), janela a janela: `cancelar` é
+    consultada antes de cada janela de 30 s. Retorna o resultado no formato do whisper.
+    """
+    traduzidos = []
+    for janela in decodificar_janelas(modelo, audio, idioma, cancelar=cancelar, tarefa="translate"):
+        idioma = janela["idioma"]
+        traduzidos.extend(janela["traducao"])
+    for i, seg in enumerate(traduzidos):
+        seg["id"] = i
+    return {"text": "".join(seg["text"] for seg in traduzidos), "segments": traduzidos, "language": idioma}
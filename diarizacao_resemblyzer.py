@@ -1,13 +1,13 @@
 import numpy as np
 import os
 import sys
+import time
 import shutil
-from resemblyzer import VoiceEncoder
-import librosa
-from sklearn.cluster import DBSCAN
 
 # Importe o logger global para registrar tudo que acontece
-from logs_tab import adicionar_log
+from registro_log import adicionar_log, DEBUG
+from erros_usuario import verificar_cancelamento
+from agrupamento_falantes import agrupar_embeddings
 
 def get_app_dir():
     if getattr(sys, 'frozen', False):
@@ -43,42 +43,205 @@ def ensure_pretrained_in_temp():
         adicionar_log("Modo dev: usando modelo Resemblyzer local.")
         return resource_path("resemblyzer/pretrained.pt")
 
-def diarize_audio(audio_path, window=1.5, overlap=0.75, dbscan_eps=0.6, dbscan_min_samples=3, verbose=True):
+# Parâmetros do Resemblyzer: 1 frame de mel a cada 10 ms, janelas parciais de 160 frames
+MEL_PASSO_AMOSTRAS = 160
+MEL_FRAMES_PARCIAIS = 160
+MB_POR_JANELA_ESTIMADO = 1.0
+
+def memoria_disponivel_mb(encoder=None):
+    """Memória livre (MB) no dispositivo do encoder; None se não for possível descobrir."""
+    try:
+        import torch
+        if encoder is not None and str(encoder.device).startswith("cuda"):
+            livre, _ = torch.cuda.mem_get_info(encoder.device)
+            return livre / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        if os.name == "nt":
+            import ctypes
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.ullAvailPhys / (1024 * 1024)
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        return None
+
+def tamanho_lote_embeddings(encoder=None, minimo=16, maximo=512):
+    """Quantas janelas cabem em um lote usando no máximo 25% da memória livre."""
+    livre = memoria_disponivel_mb(encoder)
+    if livre is None:
+        return 128
+    return int(max(minimo, min(maximo, (livre * 0.25) / MB_POR_JANELA_ESTIMADO)))
+
+def extrair_embeddings_em_lote(encoder, wav, intervalos_amostras, tamanho_lote=None, cancelar=None):
+    """
+    Mesmo resultado de embed_utterance(wav[inicio:fim]) para cada (inicio, fim) de
+    `intervalos_amostras` (janelas de até 1.6 s), com o mel e o encoder calculados em lotes.
+    Como no embed_utterance, cada janela é completada com zeros até 160 frames e tem o seu
+    próprio mel: as amostras vizinhas não entram nas bordas.
+    `cancelar` (função) é consultada antes de cada lote.
+    """
+    import torch
+    from resemblyzer.audio import wav_to_mel_spectrogram
+
+    if len(intervalos_amostras) == 0:
+        return np.zeros((0, 256), dtype=np.float32)
+    comprimento = MEL_FRAMES_PARCIAIS * MEL_PASSO_AMOSTRAS
+    if tamanho_lote is None:
+        tamanho_lote = tamanho_lote_embeddings(encoder)
+    adicionar_log(f"Embeddings em lote: {len(intervalos_amostras)} janelas, lote de {tamanho_lote}.", DEBUG)
+
+    embeddings = []
+    with torch.no_grad():
+        for i in range(0, len(intervalos_amostras), tamanho_lote):
+            verificar_cancelamento(cancelar)
+            intervalos = intervalos_amostras[i:i + tamanho_lote]
+            janelas = np.zeros((len(intervalos), comprimento), dtype=np.float32)
+            for j, (inicio, fim) in enumerate(intervalos):
+                trecho = wav[inicio:min(fim, inicio + comprimento)]
+                janelas[j, :len(trecho)] = trecho
+            # O librosa calcula o mel de cada linha; o .T de wav_to_mel_spectrogram deixa
+            # (frames, mels, janelas), que volta para (janelas, frames, mels)
+            mel = wav_to_mel_spectrogram(janelas).transpose(2, 0, 1)[:, :MEL_FRAMES_PARCIAIS]
+            lote = torch.from_numpy(np.ascontiguousarray(mel)).to(encoder.device)
+            embeddings.append(encoder(lote).cpu().numpy())
+    return np.concatenate(embeddings, axis=0)
+
+class EstadoFalantes:
+    """
+    Centróides (L2-normalizados) dos falantes já vistos, para manter os mesmos rótulos
+    quando o áudio é diarizado em blocos.
+    """
+
+    def __init__(self, limiar_similaridade=0.75):
+        self.limiar_similaridade = limiar_similaridade
+        self.somas = []
+        self.contagens = []
+
+    def _centroides(self):
+        return np.array([soma / np.linalg.norm(soma) for soma in self.somas])
+
+    def exportar(self):
+        """Estado em tipos simples (JSON), para o checkpoint entre blocos."""
+        return {"somas": [np.asarray(soma).tolist() for soma in self.somas], "contagens": list(self.contagens)}
+
+    def restaurar(self, estado):
+        self.somas = [np.array(soma, dtype=np.float32) for soma in estado["somas"]]
+        self.contagens = list(estado["contagens"])
+
+    def rotular(self, embeddings, labels):
+        """Troca os rótulos locais do bloco por rótulos globais; -1 continua -1."""
+        mapeamento = {}
+        for label in sorted(set(labels) - {-1}):
+            membros = embeddings[labels == label]
+            centroide = membros.mean(axis=0)
+            centroide /= np.linalg.norm(centroide)
+            if self.somas:
+                similaridades = self._centroides() @ centroide
+                melhor = int(np.argmax(similaridades))
+                if similaridades[melhor] >= self.limiar_similaridade and melhor not in mapeamento.values():
+                    self.somas[melhor] = self.somas[melhor] + membros.sum(axis=0)
+                    self.contagens[melhor] += len(membros)
+                    mapeamento[label] = melhor
+                    continue
+            self.somas.append(membros.sum(axis=0))
+            self.contagens.append(len(membros))
+            mapeamento[label] = len(self.somas) - 1
+        return np.array([mapeamento.get(label, -1) for label in labels])
+
+def diarize_audio(audio_path, window=1.5, overlap=0.75, dbscan_eps=0.6, dbscan_min_samples=3, verbose=True,
+                  em_lote=True, tamanho_lote=None, estado_falantes=None, agrupamento=None,
+                  embeddings=None, embeddings_callback=None, cancelar=None):
     """
-    Diariza áudio usando Resemblyzer + DBSCAN.
+    Diariza áudio usando Resemblyzer + agrupamento dos embeddings (agrupamento_falantes).
+    `agrupamento` escolhe o método ("dbscan", "aglomerativo", "online"); None mantém o
+    DBSCAN com `dbscan_eps` e `dbscan_min_samples`.
+    `audio_path` pode ser um caminho ou um array numpy float32 mono de 16 kHz.
     Retorna lista de (start, end, speaker_id).
     Todos os arquivos temporários e recursos são buscados/gerados na pasta do app.
+    Com em_lote=True os embeddings são extraídos em lotes (ver extrair_embeddings_em_lote).
+    Com `estado_falantes` (EstadoFalantes) os rótulos são mantidos entre chamadas sucessivas.
+    `embeddings` reaproveita embeddings já extraídos deste áudio (checkpoint) e pula o encoder;
+    `embeddings_callback` recebe os embeddings assim que são extraídos.
+    `cancelar` (função) é consultada entre os lotes de embeddings; se pedir, levanta TranscricaoCancelada.
     """
+    # Aceita o PCM já decodificado (float32, 16 kHz) para evitar uma nova decodificação
+    if isinstance(audio_path, np.ndarray):
+        wav, sr = audio_path.astype(np.float32, copy=False), 16000
+        audio_path = "<áudio em memória>"
+    else:
+        audio_path = os.path.abspath(audio_path)
+        wav, sr = None, 16000
     adicionar_log(f"Iniciando diarização do áudio: {audio_path}")
     # Garante o modelo Resemblyzer na pasta correta
     ensure_pretrained_in_temp()
-    audio_path = os.path.abspath(audio_path)
-    wav, sr = librosa.load(audio_path, sr=16000)
+    if wav is None:
+        import librosa
+        wav, sr = librosa.load(audio_path, sr=16000)
     duration = len(wav) / sr
 
     adicionar_log(f"Áudio carregado, duração: {duration:.2f}s, sample rate: {sr}")
 
     step = window - overlap
-    segments = []
     segment_times = []
     for start in np.arange(0, duration - window, step):
-        s = int(start * sr)
-        e = int((start + window) * sr)
-        segments.append(wav[s:e])
         segment_times.append((start, start + window))
 
-    adicionar_log(f"Total de segmentos para diarização: {len(segments)}")
+    adicionar_log(f"Total de segmentos para diarização: {len(segment_times)}")
 
-    encoder = VoiceEncoder()
-    adicionar_log("Modelo de voz Resemblyzer carregado.")
+    if embeddings is not None and len(embeddings) == len(segment_times):
+        adicionar_log(f"Reaproveitando {len(embeddings)} embeddings já extraídos.")
+    else:
+        # Importado só aqui: resemblyzer (torch) pesa vários segundos na abertura
+        from resemblyzer import VoiceEncoder
 
-    embeddings = np.array([encoder.embed_utterance(seg) for seg in segments])
-    adicionar_log("Embeddings extraídos de todos os segmentos.")
+        encoder = VoiceEncoder()
+        adicionar_log("Modelo de voz Resemblyzer carregado.")
 
-    clustering = DBSCAN(eps=dbscan_eps, min_samples=dbscan_min_samples).fit(embeddings)
-    labels = clustering.labels_
+        inicio = time.perf_counter()
+        if em_lote and window <= MEL_FRAMES_PARCIAIS * MEL_PASSO_AMOSTRAS / sr:
+            intervalos = [(int(s * sr), int(e * sr)) for s, e in segment_times]
+            embeddings = extrair_embeddings_em_lote(encoder, wav, intervalos, tamanho_lote, cancelar)
+        else:
+            embeddings = []
+            for s, e in segment_times:
+                verificar_cancelamento(cancelar)
+                embeddings.append(encoder.embed_utterance(wav[int(s * sr):int(e * sr)]))
+            embeddings = np.array(embeddings)
+        decorrido = time.perf_counter() - inicio
+        adicionar_log(
+            f"Embeddings extraídos de todos os segmentos em {decorrido:.2f}s "
+            f"({len(segment_times) / max(decorrido, 1e-6):.0f} janelas/s, em_lote={em_lote})."
+        )
+        if embeddings_callback and len(embeddings):
+            embeddings_callback(embeddings)
 
-    adicionar_log(f"Clustering DBSCAN realizado. Labels únicos: {set(labels)}")
+    if len(embeddings) == 0:
+        adicionar_log("Áudio curto demais para diarização.")
+        return []
+
+    inicio = time.perf_counter()
+    if agrupamento is None:
+        labels = agrupar_embeddings(embeddings, "dbscan", eps=dbscan_eps, min_samples=dbscan_min_samples)
+    else:
+        labels = agrupar_embeddings(embeddings, agrupamento)
+    if estado_falantes is not None:
+        labels = estado_falantes.rotular(embeddings, labels)
+
+    adicionar_log(
+        f"Agrupamento '{agrupamento or 'dbscan'}' realizado em {time.perf_counter() - inicio:.2f}s "
+        f"({len(embeddings)} janelas). Labels únicos: {set(labels)}"
+    )
 
     diarization_result = []
     for (start, end), label in zip(segment_times, labels):
@@ -94,4 +257,41 @@ def diarize_audio(audio_path, window=1.5, overlap=0.75, dbscan_eps=0.6, dbscan_m
 
     adicionar_log(f"Diarização finalizada para {audio_path}")
 
-    return diarization_result
\ No newline at end of file
+    return diarization_result
+
+def comparar_embeddings(audio_path, window=1.5, overlap=0.75):
+    """Mede o caminho em lote contra o laço janela a janela no mesmo arquivo."""
+    import librosa
+    from resemblyzer import VoiceEncoder
+
+    wav, sr = librosa.load(os.path.abspath(audio_path), sr=16000)
+    duration = len(wav) / sr
+    intervalos = [(int(s * sr), int((s + window) * sr)) for s in np.arange(0, duration - window, window - overlap)]
+    encoder = VoiceEncoder()
+
+    t0 = time.perf_counter()
+    laco = np.array([encoder.embed_utterance(wav[s:e]) for s, e in intervalos])
+    t_laco = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    lote = extrair_embeddings_em_lote(encoder, wav, intervalos)
+    t_lote = time.perf_counter() - t0
+
+    similaridades = np.sum(laco * lote, axis=1) if len(intervalos) else np.ones(1)
+    return {
+        "duracao_s": duration,
+        "janelas": len(intervalos),
+        "laco_s": t_laco,
+        "lote_s": t_lote,
+        "aceleracao": t_laco / max(t_lote, 1e-9),
+        "janelas_por_s_laco": len(intervalos) / max(t_laco, 1e-9),
+        "janelas_por_s_lote": len(intervalos) / max(t_lote, 1e-9),
+        "similaridade_cosseno_media": float(np.mean(similaridades)),
+        "similaridade_cosseno_minima": float(np.min(similaridades)),
+        "diferenca_maxima": float(np.abs(laco - lote).max()) if len(intervalos) else 0.0,
+    }
+
+if __name__ == "__main__":
+    import json
+    for caminho in sys.argv[1:]:
+        print(json.dumps(comparar_embeddings(caminho), indent=2))
@@ -1,9 +1,10 @@
 import os
 import sys
+import threading
 from datetime import datetime
 
 # Importe o logger global para registrar também na aba de logs do programa
-from logs_tab import adicionar_log
+from registro_log import adicionar_log, rotacionar_se_necessario, arquivos_rotacionados
 
 def get_app_dir():
     if getattr(sys, 'frozen', False):
@@ -17,13 +18,27 @@ def get_app_dir():
 
 PASTA_SCRIPT = get_app_dir()
 ERRO_PATH = os.path.join(PASTA_SCRIPT, "erros_usuarios.log")
+_lock = threading.Lock()
+
+class TranscricaoCancelada(Exception):
+    """Cancelamento pedido pelo usuário: não é um erro e não vai para o log de erros."""
+
+    def __init__(self, mensagem="Transcrição cancelada pelo usuário."):
+        super().__init__(mensagem)
+
+def verificar_cancelamento(cancelar):
+    """Levanta TranscricaoCancelada se `cancelar` (função sem argumentos ou None) pedir."""
+    if cancelar is not None and cancelar():
+        raise TranscricaoCancelada()
 
 def registrar_erro_usuario(modulo, mensagem):
     """Registra erros do usuário em um arquivo centralizado na pasta do app e na aba de logs."""
     try:
         linha = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {modulo}: {mensagem}"
-        with open(ERRO_PATH, "a", encoding="utf-8") as f:
-            f.write(linha + "\n")
+        with _lock:
+            rotacionar_se_necessario(ERRO_PATH)
+            with open(ERRO_PATH, "a", encoding="utf-8") as f:
+                f.write(linha + "\n")
         # Também registra no log global do programa
         adicionar_log(f"[ERRO USUÁRIO] {linha}")
     except Exception as e:
@@ -46,7 +61,9 @@ def limpar_erros():
     """Limpa o arquivo de erros do usuário."""
     try:
         if os.path.exists(ERRO_PATH):
-            os.remove(ERRO_PATH)
+            with _lock:
+                for caminho in [ERRO_PATH] + arquivos_rotacionados(ERRO_PATH):
+                    os.remove(caminho)
             adicionar_log("Arquivo de erros do usuário limpo.")
     except Exception as e:
         print(f"Erro ao limpar erros do usuário: {e}")
@@ -1,10 +1,13 @@
 import os
 import sys
 import shutil
-from PyQt6.QtWidgets import QMessageBox
+import re
+import subprocess
+import threading
 
 # Importe o logger global para registrar tudo que acontece
-from logs_tab import adicionar_log
+from registro_log import adicionar_log, notificar_erro
+from erros_usuario import verificar_cancelamento
 
 def get_app_dir():
     if getattr(sys, 'frozen', False):
@@ -16,6 +19,24 @@ def get_app_dir():
         os.makedirs(app_dir, exist_ok=True)
     return app_dir
 
+def localizar_ffmpeg(log=False):
+    """
+    Procura o FFmpeg na pasta do app e no PATH, sem baixar nem abrir diálogos
+    (seguro para chamar fora da thread da interface). Retorna o caminho ou None.
+    """
+    ffmpeg_bin = "ffmpeg.exe" if os.name == "nt" else "ffmpeg"
+    ffmpeg_path = os.path.join(get_app_dir(), ffmpeg_bin)
+    if os.path.exists(ffmpeg_path):
+        if log:
+            adicionar_log(f"FFmpeg encontrado na pasta do app: {ffmpeg_path}")
+        return ffmpeg_path
+    ffmpeg_global = shutil.which(ffmpeg_bin)
+    if ffmpeg_global:
+        if log:
+            adicionar_log(f"FFmpeg encontrado no PATH do sistema: {ffmpeg_global}")
+        return ffmpeg_global
+    return None
+
 def garantir_ffmpeg(window_parent=None, log_callback=None):
     """
     Garante que o FFmpeg esteja disponível. Se não estiver, tenta baixar para a pasta do app.
@@ -25,16 +46,10 @@ def garantir_ffmpeg(window_parent=None, log_callback=None):
     pasta_app = get_app_dir()
     ffmpeg_path = os.path.join(pasta_app, ffmpeg_bin)
 
-    # 1. Verifica se já existe na pasta do app
-    if os.path.exists(ffmpeg_path):
-        adicionar_log(f"FFmpeg encontrado na pasta do app: {ffmpeg_path}")
-        return ffmpeg_path
-
-    # 2. Verifica no PATH do sistema
-    ffmpeg_global = shutil.which(ffmpeg_bin)
-    if ffmpeg_global:
-        adicionar_log(f"FFmpeg encontrado no PATH do sistema: {ffmpeg_global}")
-        return ffmpeg_global
+    # 1 e 2. Pasta do app ou PATH do sistema
+    ffmpeg_local = localizar_ffmpeg(log=True)
+    if ffmpeg_local:
+        return ffmpeg_local
 
     # 3. Tenta baixar o ffmpeg para a pasta do app (Windows)
     if os.name == "nt":
@@ -65,12 +80,156 @@ def garantir_ffmpeg(window_parent=None, log_callback=None):
         except Exception as e:
             msg = f"Falha ao baixar FFmpeg: {e}\nBaixe manualmente e coloque em {pasta_app}"
             adicionar_log(msg)
-            # Corrigido: sempre passar um QWidget ou None como parent!
-            QMessageBox.critical(window_parent if window_parent else None, "Erro FFmpeg", msg)
+            notificar_erro("Erro FFmpeg", msg, window_parent)
             return None
 
     # 4. Se não conseguir, avisa
     msg = f"FFmpeg não encontrado. Baixe e coloque em: {pasta_app}"
     adicionar_log(msg)
-    QMessageBox.critical(window_parent if window_parent else None, "Erro FFmpeg", msg)
-    return None
\ No newline at end of file
+    notificar_erro("Erro FFmpeg", msg, window_parent)
+    return None
+
+TAXA_PCM = 16000
+# Bytes lidos do pipe por vez (~1 s de PCM): o cancelamento é verificado entre as leituras
+BYTES_LEITURA = TAXA_PCM * 2
+
+class ErroFFmpeg(RuntimeError):
+    """Falha do FFmpeg com o código de saída do processo (vai para as métricas)."""
+
+    def __init__(self, mensagem, codigo_saida):
+        super().__init__(mensagem)
+        self.codigo_saida = codigo_saida
+
+def _opcoes_processo():
+    startupinfo = None
+    if os.name == "nt":
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return {
+        "creationflags": subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        "startupinfo": startupinfo,
+    }
+
+def _comando_pcm(ffmpeg_cmd, caminho, taxa, inicio_s=0.0):
+    # -ss antes do -i: o FFmpeg pula direto para o ponto, sem decodificar o começo
+    posicao = ['-ss', f"{inicio_s:.3f}"] if inicio_s > 0 else []
+    return [
+        ffmpeg_cmd, '-nostdin', '-hide_banner', '-loglevel', 'error',
+        *posicao, '-i', caminho,
+        '-vn', '-ac', '1', '-ar', str(taxa),
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-'
+    ]
+
+def obter_duracao(caminho, ffmpeg_cmd):
+    """Duração do arquivo em segundos, lida do cabeçalho pelo FFmpeg; None se não for possível."""
+    try:
+        processo = subprocess.run(
+            [ffmpeg_cmd, '-nostdin', '-hide_banner', '-i', caminho],
+            capture_output=True, text=True, errors="replace", **_opcoes_processo()
+        )
+    except Exception as e:
+        adicionar_log(f"Falha ao obter duração de {caminho}: {e}")
+        return None
+    achado = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", processo.stderr or "")
+    if not achado:
+        return None
+    horas, minutos, segundos = achado.groups()
+    return int(horas) * 3600 + int(minutos) * 60 + float(segundos)
+
+def _ler_pipe(fluxo, tamanho, cancelar=None):
+    """Lê até `tamanho` bytes (menos só no fim do fluxo) em pedaços de BYTES_LEITURA."""
+    if cancelar is None:
+        return fluxo.read(tamanho)
+    dados = bytearray()
+    while len(dados) < tamanho:
+        verificar_cancelamento(cancelar)
+        pedaco = fluxo.read(min(BYTES_LEITURA, tamanho - len(dados)))
+        if not pedaco:
+            break
+        dados += pedaco
+    return dados
+
+def ler_pcm_em_blocos(caminho, ffmpeg_cmd, duracao_bloco_s, sobreposicao_s=0.0, taxa=TAXA_PCM, inicio_s=0.0,
+                      cancelar=None):
+    """
+    Lê o PCM do stdout do FFmpeg em blocos de `duracao_bloco_s`, sem carregar o arquivo inteiro.
+    Gera (inicio_audio_s, inicio_bloco_s, fim_bloco_s, audio): `audio` começa em inicio_audio_s e
+    inclui `sobreposicao_s` do bloco anterior antes de inicio_bloco_s.
+    Com `inicio_s` (retomada) a leitura começa nesse ponto, já com a sobreposição anterior a ele.
+    `cancelar` (função) é consultada durante a leitura; se pedir, o FFmpeg é encerrado e
+    TranscricaoCancelada é levantada.
+    """
+    import numpy as np
+
+    inicio_leitura = max(0.0, inicio_s - sobreposicao_s)
+    processo = subprocess.Popen(
+        _comando_pcm(ffmpeg_cmd, caminho, taxa, inicio_leitura),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_opcoes_processo()
+    )
+    erros = []
+    leitor_erros = threading.Thread(target=lambda: erros.append(processo.stderr.read()), daemon=True)
+    leitor_erros.start()
+
+    bytes_bloco = int(duracao_bloco_s * taxa) * 2
+    amostras_sobreposicao = int(sobreposicao_s * taxa)
+    cauda = np.zeros(0, dtype=np.float32)
+    inicio_bloco = 0.0
+    try:
+        if inicio_s > 0:
+            dados = _ler_pipe(processo.stdout, int(round((inicio_s - inicio_leitura) * taxa)) * 2, cancelar)
+            cauda = np.frombuffer(dados, dtype=np.int16).astype(np.float32) / 32768.0
+            inicio_bloco = inicio_leitura + len(cauda) / taxa
+        while True:
+            dados = _ler_pipe(processo.stdout, bytes_bloco, cancelar)
+            if not dados:
+                break
+            bloco = np.frombuffer(dados, dtype=np.int16).astype(np.float32) / 32768.0
+            fim_bloco = inicio_bloco + len(bloco) / taxa
+            yield inicio_bloco - len(cauda) / taxa, inicio_bloco, fim_bloco, np.concatenate([cauda, bloco])
+            cauda = bloco[-amostras_sobreposicao:] if amostras_sobreposicao else cauda[:0]
+            inicio_bloco = fim_bloco
+    finally:
+        if processo.poll() is None:
+            processo.kill()
+        processo.wait()
+        leitor_erros.join(timeout=5)
+    if processo.returncode != 0:
+        raise ErroFFmpeg((erros[0] if erros else b"").decode("utf-8", errors="replace"), processo.returncode)
+
+def decodificar_pcm(caminho, ffmpeg_cmd, taxa=TAXA_PCM, cancelar=None):
+    """
+    Decodifica qualquer arquivo de áudio/vídeo em um único passo, lendo o PCM mono
+    direto do stdout do FFmpeg (sem arquivo temporário).
+    Retorna um array numpy float32 em [-1, 1] na taxa `taxa`.
+    Se `cancelar` (função) pedir durante a leitura, o FFmpeg é encerrado na hora e
+    TranscricaoCancelada é levantada.
+    """
+    import numpy as np
+
+    processo = subprocess.Popen(
+        _comando_pcm(ffmpeg_cmd, caminho, taxa),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_opcoes_processo()
+    )
+    erros = []
+    leitor_erros = threading.Thread(target=lambda: erros.append(processo.stderr.read()), daemon=True)
+    leitor_erros.start()
+
+    dados = bytearray()
+    try:
+        while True:
+            verificar_cancelamento(cancelar)
+            pedaco = processo.stdout.read(BYTES_LEITURA)
+            if not pedaco:
+                break
+            dados += pedaco
+    finally:
+        if processo.poll() is None:
+            processo.kill()
+        processo.wait()
+        leitor_erros.join(timeout=5)
+    if processo.returncode != 0:
+        raise ErroFFmpeg((erros[0] if erros else b"").decode("utf-8", errors="replace"), processo.returncode)
+    audio = np.frombuffer(dados, dtype=np.int16).astype(np.float32) / 32768.0
+    adicionar_log(f"Áudio decodificado em memória: {len(audio) / taxa:.2f}s a {taxa} Hz.")
+    return audio
@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+PASTA_SCRIPT = get_app_dir()
+HISTORICO_DB_PATH = os.path.join(PASTA_SCRIPT, "historico.db")
+# Formato antigo: lista JSON reescrita inteira a cada alteração (importada uma única vez)
+HISTORICO_JSON_PATH = os.path.join(PASTA_SCRIPT, "historico.json")
+
+# PRAGMA user_version do banco; sobe quando o esquema mudar
+VERSAO_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    arquivo TEXT NOT NULL UNIQUE,
+    nome TEXT NOT NULL,
+    data TEXT NOT NULL,
+    idioma TEXT NOT NULL DEFAULT 'auto'
+);
+CREATE INDEX IF NOT EXISTS idx_historico_nome ON historico (nome COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_historico_data ON historico (data);
+CREATE INDEX IF NOT EXISTS idx_historico_idioma ON historico (idioma);
+"""
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class HistoricoTranscricoes:
+    """
+    Histórico de transcrições em SQLite (historico.db na pasta do app), sem limite de tamanho.
+    Cada alteração grava só a linha afetada; na primeira abertura o historico.json antigo é importado.
+    """
+
+    def __init__(self, caminho=None, caminho_json=None):
+        self.caminho = caminho or HISTORICO_DB_PATH
+        self.caminho_json = HISTORICO_JSON_PATH if caminho_json is None else caminho_json
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao < VERSAO_ESQUEMA:
+                self._importar_json(conexao)
+                conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+                conexao.commit()
+            self._conexao = conexao
+        return self._conexao
+
+    def _importar_json(self, conexao):
+        if not self.caminho_json or not os.path.exists(self.caminho_json):
+            return
+        try:
+            with open(self.caminho_json, "r", encoding="utf-8") as f:
+                entradas = json.load(f)
+        except Exception as e:
+            adicionar_log(f"Histórico: não foi possível importar {self.caminho_json}: {e}")
+            return
+        if not isinstance(entradas, list):
+            return
+        # A lista antiga vem da mais recente para a mais antiga
+        linhas = [
+            (h["arquivo"], h.get("nome", h["arquivo"]), h.get("data", ""), h.get("idioma", "auto"))
+            for h in reversed(entradas)
+            if isinstance(h, dict) and h.get("arquivo")
+        ]
+        with conexao:
+            conexao.executemany(
+                "INSERT OR IGNORE INTO historico (arquivo, nome, data, idioma) VALUES (?, ?, ?, ?)", linhas
+            )
+        adicionar_log(f"Histórico: {len(linhas)} entrada(s) importada(s) de {os.path.basename(self.caminho_json)}.")
+
+    def adicionar(self, arquivo, nome, data, idioma):
+        """Insere a entrada, ou atualiza data/idioma se o arquivo já estiver no histórico."""
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute("DELETE FROM historico WHERE arquivo = ?", (arquivo,))
+                conexao.execute(
+                    "INSERT INTO historico (arquivo, nome, data, idioma) VALUES (?, ?, ?, ?)",
+                    (arquivo, nome, data, idioma)
+                )
+
+    def remover(self, arquivo):
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute("DELETE FROM historico WHERE arquivo = ?", (arquivo,))
+
+    def limpar(self):
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute("DELETE FROM historico")
+
+    def total(self):
+        with self._lock:
+            return self._conectar().execute("SELECT COUNT(*) FROM historico").fetchone()[0]
+
+    def filtrar(self, texto="", idiomas=(), limite=None):
+        """
+        Entradas (dicts) mais recentes primeiro cujo nome ou data contém `texto`,
+        ou cujo idioma está em `idiomas` (códigos cujo nome exibido casou com o texto).
+        """
+        texto = texto.strip()
+        sql = "SELECT arquivo, nome, data, idioma FROM historico"
+        parametros = []
+        if texto:
+            padrao = f"%{_escapar_like(texto)}%"
+            condicoes = ["nome LIKE ? ESCAPE '\\'", "data LIKE ? ESCAPE '\\'"]
+            parametros += [padrao, padrao]
+            if idiomas:
+                condicoes.append(f"idioma IN ({', '.join('?' for _ in idiomas)})")
+                parametros += list(idiomas)
+            sql += " WHERE " + " OR ".join(condicoes)
+        sql += " ORDER BY data DESC, id DESC"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+        with self._lock:
+            return [dict(linha) for linha in self._conectar().execute(sql, parametros)]
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+HISTORICO_TRANSCRICOES = HistoricoTranscricoes()
@@ -0,0 +1,279 @@
+import os
+import re
+import sys
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+PASTA_SCRIPT = get_app_dir()
+INDICE_DB_PATH = os.path.join(PASTA_SCRIPT, "indice_busca.db")
+TRANSCRICOES_DIR = os.path.join(PASTA_SCRIPT, "Transcricoes")
+
+# Linha gravada por linha_transcricao(): "[0:01:02 -> 0:01:05] Speaker 1: texto"
+LINHA_SEGMENTO = re.compile(r"^\[(\d+):(\d{2}):(\d{2}) -> (\d+):(\d{2}):(\d{2})\] ([^:]+): (.*)$")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS transcricoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    arquivo TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL DEFAULT 0,
+    tamanho INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS segmentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transcricao_id INTEGER NOT NULL REFERENCES transcricoes(id) ON DELETE CASCADE,
+    falante TEXT NOT NULL,
+    inicio_ms INTEGER NOT NULL,
+    fim_ms INTEGER NOT NULL,
+    texto TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segmentos_transcricao ON segmentos (transcricao_id, inicio_ms);
+"""
+
+# Índice FTS5 com conteúdo externo: o texto fica só em `segmentos`, os gatilhos mantêm o índice
+ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS segmentos_fts USING fts5(
+    texto, content='segmentos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segmentos_ai AFTER INSERT ON segmentos BEGIN
+    INSERT INTO segmentos_fts(rowid, texto) VALUES (new.id, new.texto);
+END;
+CREATE TRIGGER IF NOT EXISTS segmentos_ad AFTER DELETE ON segmentos BEGIN
+    INSERT INTO segmentos_fts(segmentos_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+END;
+"""
+
+def e_transcricao(nome):
+    """Só as transcrições no idioma original entram no índice (a tradução repetiria os acertos)."""
+    return nome.startswith("transcricao_") and nome.endswith(".txt") and not nome.endswith("_ingles.txt")
+
+def ler_segmentos_arquivo(caminho):
+    """Segmentos (dicts speaker/start/end/text) de um arquivo de transcrição já gravado."""
+    segmentos = []
+    with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+        for linha in f:
+            achado = LINHA_SEGMENTO.match(linha.rstrip("\n"))
+            if not achado:
+                continue
+            h1, m1, s1, h2, m2, s2, falante, texto = achado.groups()
+            segmentos.append({
+                "speaker": falante,
+                "start": int(h1) * 3600 + int(m1) * 60 + int(s1),
+                "end": int(h2) * 3600 + int(m2) * 60 + int(s2),
+                "text": texto,
+            })
+    return segmentos
+
+def consulta_fts(texto):
+    """Cada palavra vira um termo entre aspas (sem operadores do FTS5); a última casa por prefixo."""
+    termos = re.findall(r"\w+", texto, flags=re.UNICODE)
+    if not termos:
+        return None
+    partes = [f'"{termo}"' for termo in termos]
+    partes[-1] += "*"
+    return " ".join(partes)
+
+class IndiceBusca:
+    """
+    Índice de texto completo (SQLite FTS5) de todas as transcrições, com falante e tempo
+    de cada segmento. É atualizado quando uma transcrição é salva e, de forma incremental
+    (por mtime/tamanho), para arquivos alterados fora do programa.
+    """
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or INDICE_DB_PATH
+        self._conexao = None
+        self._fts = False
+        self._lock = threading.Lock()
+        self._em_gravacao = set()  # nomes das transcrições que ainda estão sendo escritas
+
+    def _conectar(self):
+        if self._conexao is None:
+            conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA foreign_keys=ON")
+            conexao.executescript(ESQUEMA)
+            try:
+                conexao.executescript(ESQUEMA_FTS)
+                self._fts = True
+            except sqlite3.OperationalError as e:
+                # SQLite sem FTS5: a busca continua funcionando com LIKE, só que sem ranking
+                adicionar_log(f"Índice de busca: FTS5 indisponível ({e}); usando busca simples.")
+            self._conexao = conexao
+        return self._conexao
+
+    @contextmanager
+    def em_gravacao(self, caminho):
+        """Enquanto ativo, atualizar() não reindexa o arquivo parcial (quem grava indexa)."""
+        arquivo = os.path.basename(caminho)
+        with self._lock:
+            self._em_gravacao.add(arquivo)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._em_gravacao.discard(arquivo)
+
+    def indexar_segmentos(self, caminho, segmentos, substituir=True, a_partir_de=None):
+        """
+        Indexa os segmentos (dicts speaker/start/end/text, tempos em segundos) da transcrição
+        gravada em `caminho`. Com substituir=False os segmentos são acrescentados aos já
+        indexados (modo em blocos, um bloco por vez); com `a_partir_de` (início do bloco, em s)
+        os segmentos já indexados cujo ponto médio cai no bloco são apagados antes, então
+        indexar o mesmo bloco de novo não duplica nada.
+        """
+        arquivo = os.path.basename(caminho)
+        linhas = [
+            # Truncado (e não arredondado) para bater com o segundo exibido por format_timestamp
+            (seg["speaker"], int(seg["start"] * 1000), int(seg["end"] * 1000), seg["text"].strip())
+            for seg in segmentos
+            if seg.get("text", "").strip()
+        ]
+        try:
+            info = os.stat(caminho)
+            mtime, tamanho = info.st_mtime, info.st_size
+        except OSError:
+            mtime, tamanho = 0, 0
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                if substituir:
+                    conexao.execute("DELETE FROM transcricoes WHERE arquivo = ?", (arquivo,))
+                conexao.execute(
+                    "INSERT INTO transcricoes (arquivo, mtime, tamanho) VALUES (?, ?, ?) "
+                    "ON CONFLICT(arquivo) DO UPDATE SET mtime = excluded.mtime, tamanho = excluded.tamanho",
+                    (arquivo, mtime, tamanho)
+                )
+                transcricao_id = conexao.execute(
+                    "SELECT id FROM transcricoes WHERE arquivo = ?", (arquivo,)
+                ).fetchone()[0]
+                if not substituir and a_partir_de is not None:
+                    # Mesmo critério do modo em blocos (ponto médio); o -1 cobre o truncamento para ms
+                    conexao.execute(
+                        "DELETE FROM segmentos WHERE transcricao_id = ? AND inicio_ms + fim_ms >= ?",
+                        (transcricao_id, 2 * int(a_partir_de * 1000) - 1)
+                    )
+                conexao.executemany(
+                    "INSERT INTO segmentos (transcricao_id, falante, inicio_ms, fim_ms, texto) VALUES (?, ?, ?, ?, ?)",
+                    [(transcricao_id,) + linha for linha in linhas]
+                )
+        return len(linhas)
+
+    def indexar_arquivo(self, caminho):
+        """(Re)indexa uma transcrição a partir do arquivo (tempos com precisão de segundos)."""
+        return self.indexar_segmentos(caminho, ler_segmentos_arquivo(caminho))
+
+    def atualizar(self, pasta=None):
+        """
+        Sincroniza o índice com a pasta de transcrições: indexa arquivos novos ou alterados
+        e remove os que sumiram. Retorna quantos arquivos foram (re)indexados.
+        """
+        pasta = pasta or TRANSCRICOES_DIR
+        if not os.path.isdir(pasta):
+            return 0
+        with self._lock:
+            conhecidos = {
+                linha["arquivo"]: (linha["mtime"], linha["tamanho"])
+                for linha in self._conectar().execute("SELECT arquivo, mtime, tamanho FROM transcricoes")
+            }
+            em_gravacao = set(self._em_gravacao)
+        presentes = set()
+        indexados = 0
+        for entrada in os.scandir(pasta):
+            if not entrada.is_file() or not e_transcricao(entrada.name):
+                continue
+            presentes.add(entrada.name)
+            if entrada.name in em_gravacao:
+                continue
+            info = entrada.stat()
+            if conhecidos.get(entrada.name) == (info.st_mtime, info.st_size):
+                continue
+            try:
+                self.indexar_arquivo(entrada.path)
+                indexados += 1
+            except Exception as e:
+                adicionar_log(f"Índice de busca: falha ao indexar {entrada.name}: {e}")
+        removidos = [arquivo for arquivo in conhecidos if arquivo not in presentes]
+        if removidos:
+            with self._lock:
+                conexao = self._conectar()
+                with conexao:
+                    conexao.executemany("DELETE FROM transcricoes WHERE arquivo = ?", [(a,) for a in removidos])
+        if indexados or removidos:
+            adicionar_log(f"Índice de busca atualizado: {indexados} arquivo(s) indexado(s), {len(removidos)} removido(s).")
+        return indexados
+
+    def remover(self, caminho):
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute("DELETE FROM transcricoes WHERE arquivo = ?", (os.path.basename(caminho),))
+
+    def buscar(self, texto, limite=200):
+        """
+        Segmentos que contêm as palavras de `texto` (a última pode ser prefixo), do mais
+        relevante ao menos relevante. Cada acerto: arquivo, falante, inicio_ms, fim_ms, trecho.
+        """
+        consulta = consulta_fts(texto)
+        if not consulta:
+            return []
+        with self._lock:
+            conexao = self._conectar()
+            if self._fts:
+                linhas = conexao.execute(
+                    """
+                    SELECT t.arquivo, s.falante, s.inicio_ms, s.fim_ms,
+                           snippet(segmentos_fts, 0, '[', ']', '…', 16) AS trecho
+                    FROM segmentos_fts
+                    JOIN segmentos s ON s.id = segmentos_fts.rowid
+                    JOIN transcricoes t ON t.id = s.transcricao_id
+                    WHERE segmentos_fts MATCH ?
+                    ORDER BY bm25(segmentos_fts)
+                    LIMIT ?
+                    """,
+                    (consulta, int(limite))
+                ).fetchall()
+            else:
+                linhas = conexao.execute(
+                    """
+                    SELECT t.arquivo, s.falante, s.inicio_ms, s.fim_ms, s.texto AS trecho
+                    FROM segmentos s JOIN transcricoes t ON t.id = s.transcricao_id
+                    WHERE s.texto LIKE ?
+                    ORDER BY t.arquivo, s.inicio_ms
+                    LIMIT ?
+                    """,
+                    (f"%{texto.strip()}%", int(limite))
+                ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+INDICE_BUSCA = IndiceBusca()
+
+def indexar_transcricao(caminho, segmentos=None, substituir=True, a_partir_de=None):
+    """Atualiza o índice após salvar uma transcrição; falhas só vão para o log."""
+    try:
+        if segmentos is None:
+            INDICE_BUSCA.indexar_arquivo(caminho)
+        else:
+            INDICE_BUSCA.indexar_segmentos(caminho, segmentos, substituir=substituir, a_partir_de=a_partir_de)
+    except Exception as e:
+        adicionar_log(f"Índice de busca: falha ao indexar {os.path.basename(caminho)}: {e}")
@@ -1,36 +1,36 @@
 import os
-import sys
-from datetime import datetime
+import shutil
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPlainTextEdit, QPushButton, QFileDialog, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QThread
+from PyQt6.QtGui import QTextCursor
 
-def get_app_dir():
-    if getattr(sys, 'frozen', False):
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
-    if not os.path.exists(app_dir):
-        os.makedirs(app_dir, exist_ok=True)
-    return app_dir
+# O log em si não depende de Qt (registro_log); aqui ele só é ligado ao sinal da aba
+from registro_log import (
+    adicionar_log, registrar_ouvinte, registrar_notificador_erro, descarregar_log,
+    ler_final_arquivo, arquivos_rotacionados, get_app_dir, PASTA_SCRIPT, LOG_PATH
+)
 
-PASTA_SCRIPT = get_app_dir()
-LOG_PATH = os.path.join(PASTA_SCRIPT, "output.log")
+# Mesmo limite do widget: linhas além disso seriam descartadas logo após a leitura
+MAX_LINHAS_LOG = 1000
 
 class LogSignal(QObject):
     log_message = pyqtSignal(str)
+    erro_usuario = pyqtSignal(str, str)  # titulo, mensagem
 
 global_log_signal = LogSignal()
+registrar_ouvinte(global_log_signal.log_message.emit)
+# Erros vindos de threads de trabalho viram sinal e são exibidos na thread da interface
+registrar_notificador_erro(lambda titulo, mensagem, parent: global_log_signal.erro_usuario.emit(titulo, mensagem))
+
+class CarregarLogThread(QThread):
+    """Lê só o final do output.log, fora da thread da interface."""
+    carregado = pyqtSignal(object)  # lista de linhas, ou None se o arquivo não existe
 
-def adicionar_log(mensagem):
-    """Adiciona uma mensagem ao log com timestamp e emite o sinal para atualizar a aba."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    linha = f"{timestamp} - {mensagem.strip()}"
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(linha + "\n")
-    global_log_signal.log_message.emit(linha)
+    def run(self):
+        descarregar_log()
+        self.carregado.emit(ler_final_arquivo(LOG_PATH, MAX_LINHAS_LOG) if os.path.exists(LOG_PATH) else None)
 
 class LogsTab(QWidget):
     def __init__(self):
@@ -41,7 +41,7 @@ class LogsTab(QWidget):
         layout.addWidget(self.label)
         self.text_log = QPlainTextEdit()
         self.text_log.setReadOnly(True)
-        self.text_log.setMaximumBlockCount(1000)
+        self.text_log.setMaximumBlockCount(MAX_LINHAS_LOG)
         self.text_log.setObjectName("ConsoleLog")  # Adiciona o objectName para o CSS global agir
         layout.addWidget(self.text_log)
         self.btn_salvar = QPushButton("Salvar logs em arquivo")
@@ -52,20 +52,39 @@ class LogsTab(QWidget):
         layout.addWidget(self.btn_limpar)
         self.setLayout(layout)
 
+        # Linhas que chegam enquanto o arquivo é lido esperam aqui e entram depois dele
+        self.pendentes = None
+        self.thread_carregar = None
         global_log_signal.log_message.connect(self.adicionar_log)
         self.carregar_log_inicial()
 
     def adicionar_log(self, mensagem):
+        if self.pendentes is not None:
+            self.pendentes.append(mensagem)
+            return
         self.text_log.appendPlainText(mensagem)
 
     def carregar_log_inicial(self):
-        if os.path.exists(LOG_PATH):
-            with open(LOG_PATH, "r", encoding="utf-8") as f:
-                self.text_log.setPlainText(f.read())
-        else:
+        self.pendentes = []
+        self.text_log.setPlainText("Carregando logs...")
+        self.thread_carregar = CarregarLogThread()
+        self.thread_carregar.carregado.connect(self.exibir_log_inicial)
+        self.thread_carregar.start()
+
+    def exibir_log_inicial(self, linhas):
+        pendentes, self.pendentes = self.pendentes or [], None
+        if linhas is None and not pendentes:
             self.text_log.setPlainText("Nenhum log encontrado.")
+            return
+        linhas = linhas or []
+        # O que já foi gravado antes da leitura também veio pelo sinal: não repete
+        recentes = set(linhas[-len(pendentes):]) if pendentes else set()
+        linhas += [linha for linha in pendentes if linha not in recentes]
+        self.text_log.setPlainText("\n".join(linhas[-MAX_LINHAS_LOG:]))
+        self.text_log.moveCursor(QTextCursor.MoveOperation.End)
 
     def salvar_logs(self):
+        descarregar_log()
         if os.path.exists(LOG_PATH):
             caminho, _ = QFileDialog.getSaveFileName(
                 self,
@@ -74,8 +93,7 @@ class LogsTab(QWidget):
                 "Log Files (*.log);;Text Files (*.txt);;All Files (*)"
             )
             if caminho:
-                with open(LOG_PATH, "r", encoding="utf-8") as src, open(caminho, "w", encoding="utf-8") as dst:
-                    dst.write(src.read())
+                shutil.copyfile(LOG_PATH, caminho)
 
     def limpar_logs(self):
         resposta = QMessageBox.question(
@@ -85,6 +103,12 @@ class LogsTab(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if resposta == QMessageBox.StandardButton.Yes:
+            descarregar_log()
             with open(LOG_PATH, "w", encoding="utf-8") as f:
                 f.write("")
+            for antigo in arquivos_rotacionados(LOG_PATH):
+                try:
+                    os.remove(antigo)
+                except OSError:
+                    pass
             self.text_log.setPlainText("")
\ No newline at end of file
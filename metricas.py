@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from registro_log import PASTA_SCRIPT, adicionar_log, rotacionar_se_necessario
+
+# Eventos estruturados por etapa, um JSON por linha, ao lado do output.log
+METRICAS_PATH = os.path.join(PASTA_SCRIPT, "metricas.jsonl")
+
+_lock = threading.Lock()
+
+def rss_atual_mb():
+    """Memória residente atual do processo em MB (None se não for possível medir)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name == "nt":
+        contadores = _contadores_memoria_windows()
+        return contadores.WorkingSetSize / (1024 * 1024) if contadores else None
+    try:
+        # macOS: sem RSS atual na biblioteca padrão; o pico é a melhor aproximação
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+    except ImportError:
+        return None
+
+def pico_rss_mb():
+    """Pico de memória residente do processo até agora, em MB (None se não for possível medir)."""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB; macOS em bytes
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+    except ImportError:
+        pass
+    contadores = _contadores_memoria_windows()
+    return contadores.PeakWorkingSetSize / (1024 * 1024) if contadores else None
+
+def _contadores_memoria_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ContadoresMemoria(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        contadores = ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return None
+        return contadores
+    except Exception:
+        return None
+
+def nova_execucao():
+    """Identificador curto que agrupa os eventos de uma mesma transcrição/conversão."""
+    return uuid.uuid4().hex[:12]
+
+def registrar_evento(evento):
+    try:
+        linha = json.dumps(evento, ensure_ascii=False, default=str)
+        with _lock:
+            rotacionar_se_necessario(METRICAS_PATH)
+            with open(METRICAS_PATH, "a", encoding="utf-8") as f:
+                f.write(linha + "\n")
+    except Exception as e:
+        adicionar_log(f"Falha ao gravar métrica: {e}")
+
+@contextmanager
+def medir_etapa(etapa, **campos):
+    """
+    Mede uma etapa do pipeline e grava um evento em metricas.jsonl ao sair do bloco.
+    O dict devolvido aceita campos extras durante a etapa (ex.: audio_s, ffmpeg_codigo_saida).
+    Exceções são registradas com status "erro" e propagadas normalmente.
+    """
+    evento = {"etapa": etapa, **campos}
+    inicio = time.time()
+    inicio_perf = time.perf_counter()
+    rss_inicio = rss_atual_mb()
+    evento["status"] = "ok"
+    try:
+        yield evento
+    except BaseException as e:
+        evento["status"] = "erro"
+        evento["erro"] = str(e)
+        codigo = getattr(e, "codigo_saida", None)
+        if codigo is not None:
+            evento.setdefault("ffmpeg_codigo_saida", codigo)
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio_perf
+        rss_fim = rss_atual_mb()
+        evento.update({
+            "inicio": datetime.fromtimestamp(inicio).isoformat(timespec="milliseconds"),
+            "fim": datetime.fromtimestamp(inicio + duracao).isoformat(timespec="milliseconds"),
+            "duracao_s": round(duracao, 4),
+            "rss_inicio_mb": round(rss_inicio, 1) if rss_inicio is not None else None,
+            "rss_fim_mb": round(rss_fim, 1) if rss_fim is not None else None,
+            "rss_delta_mb": round(rss_fim - rss_inicio, 1) if None not in (rss_inicio, rss_fim) else None,
+            "thread": threading.current_thread().name,
+        })
+        audio_s = evento.get("audio_s")
+        if audio_s:
+            evento["rtf"] = round(duracao / audio_s, 4)
+        registrar_evento(evento)
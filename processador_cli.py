@@ -0,0 +1,152 @@
+"""
+Linha de comando do Processador de Áudio e Vídeo, sem interface gráfica (não importa PyQt6).
+
+Exemplos:
+    python -m processador_cli transcrever gravacoes/ reuniao.mp4 --modelo small --idioma pt
+    python -m processador_cli converter video.mp4 https://youtu.be/... --formatos 2,5
+
+O resultado de cada arquivo sai como JSON no stdout (ou em --saida-json); os logs vão
+para output.log e, com --verbose, também para o stderr. O código de saída é 0 quando
+todos os arquivos foram processados e 1 quando algum falhou.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+from registro_log import adicionar_log, registrar_ouvinte, definir_nivel, configurar_rotacao
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+def carregar_config():
+    config_path = os.path.join(get_app_dir(), "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def transcrever_arquivos(caminhos, modelo, idioma):
+    from Transcricao_core_V3 import transcrever_com_diarizacao, expandir_caminhos, nome_base_unico
+
+    pasta_transcricoes = os.path.join(get_app_dir(), "Transcricoes")
+    resultados = []
+    arquivos = expandir_caminhos(caminhos)
+    for caminho in caminhos:
+        if not os.path.exists(caminho):
+            resultados.append({"arquivo": caminho, "status": "erro", "erro": "Arquivo não encontrado."})
+    # Mesmo esquema da fila da interface: arquivos com o mesmo nome em pastas diferentes
+    # não podem gravar no mesmo transcricao_<nome>.txt
+    nomes_em_uso = set()
+    for caminho in arquivos:
+        inicio = time.monotonic()
+        base = nome_base_unico(caminho, nomes_em_uso)
+        nomes_em_uso.add(base)
+        resultado = {"arquivo": os.path.abspath(caminho)}
+        try:
+            transcrever_com_diarizacao(caminho, modelo, idioma, nome_base=base)
+            caminho_transcr = os.path.join(pasta_transcricoes, f"transcricao_{base}.txt")
+            caminho_trad = os.path.join(pasta_transcricoes, f"transcricao_{base}_ingles.txt")
+            resultado.update({
+                "status": "ok",
+                "transcricao": caminho_transcr,
+                "traducao": caminho_trad if idioma != "en" and os.path.exists(caminho_trad) else None,
+            })
+        except Exception as e:
+            resultado.update({"status": "erro", "erro": str(e)})
+        resultado["segundos"] = round(time.monotonic() - inicio, 2)
+        resultados.append(resultado)
+    return resultados
+
+def converter_origens(origens, formatos, diretorio_saida, max_paralelo):
+    from Processamento_video import processar_video
+
+    os.makedirs(diretorio_saida, exist_ok=True)
+    resultados = []
+    for origem in origens:
+        inicio = time.monotonic()
+        resultado = {"origem": origem}
+        try:
+            _, arquivos = processar_video(origem, diretorio_saida, formatos, max_paralelo=max_paralelo)
+            if arquivos:
+                resultado.update({"status": "ok", "arquivos": arquivos})
+            else:
+                resultado.update({"status": "erro", "erro": "Nenhum arquivo foi gerado."})
+        except Exception as e:
+            resultado.update({"status": "erro", "erro": str(e)})
+        resultado["segundos"] = round(time.monotonic() - inicio, 2)
+        resultados.append(resultado)
+    return resultados
+
+def criar_parser(config):
+    parser = argparse.ArgumentParser(
+        prog="python -m processador_cli",
+        description="Transcreve ou converte arquivos de áudio/vídeo sem interface gráfica."
+    )
+    parser.add_argument("--saida-json", help="Grava o resultado JSON neste arquivo em vez do stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs (inclusive de depuração) no stderr.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_transcrever = sub.add_parser("transcrever", help="Transcreve arquivos ou pastas (com diarização).")
+    p_transcrever.add_argument("caminhos", nargs="+", help="Arquivos de áudio/vídeo ou pastas.")
+    p_transcrever.add_argument("--modelo", default=config.get("modelo", "small"),
+                               choices=["tiny", "base", "small", "medium", "large"])
+    p_transcrever.add_argument("--idioma", default=config.get("idioma", "auto"),
+                               help="Código do idioma (pt, en, es, ...) ou 'auto'.")
+
+    p_converter = sub.add_parser("converter", help="Converte arquivos locais ou URLs para os formatos escolhidos.")
+    p_converter.add_argument("origens", nargs="+", help="Arquivos locais ou URLs.")
+    p_converter.add_argument("--formatos", default="2",
+                             help="Identificadores separados por vírgula (1=MP4, 2=MP3, 3 a 8=presets).")
+    p_converter.add_argument("--saida", default=os.path.join(get_app_dir(), "saida_audio"),
+                             help="Pasta de saída.")
+    p_converter.add_argument("--max-paralelo", type=int, default=config.get("conversao_max_paralelo"))
+    return parser
+
+def main(argv=None):
+    config = carregar_config()
+    args = criar_parser(config).parse_args(argv)
+    definir_nivel("DEBUG" if args.verbose else config.get("log_nivel", "INFO"))
+    configurar_rotacao(config.get("log_limite_mb", 10), config.get("log_arquivos_mantidos", 3))
+    if args.verbose:
+        registrar_ouvinte(lambda linha: print(linha, file=sys.stderr, flush=True))
+    adicionar_log(f"CLI iniciada: {args.comando}")
+
+    # Qualquer print das bibliotecas vai para o stderr: o stdout fica só com o JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.comando == "transcrever":
+            resultados = transcrever_arquivos(args.caminhos, args.modelo, args.idioma)
+        else:
+            formatos = [f.strip() for f in args.formatos.split(",") if f.strip()]
+            resultados = converter_origens(args.origens, formatos, args.saida, args.max_paralelo)
+
+    falhas = sum(1 for r in resultados if r["status"] != "ok")
+    saida = {
+        "comando": args.comando,
+        "resultados": resultados,
+        "sucesso": len(resultados) - falhas,
+        "falhas": falhas,
+    }
+    texto = json.dumps(saida, indent=2, ensure_ascii=False)
+    if args.saida_json:
+        with open(args.saida_json, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+    adicionar_log(f"CLI finalizada: {len(resultados) - falhas} ok, {falhas} com falha.")
+    return 1 if falhas or not resultados else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+# Log do programa sem dependência de Qt: o núcleo (extração, diarização, transcrição,
+# conversão) registra por aqui e a interface se inscreve como ouvinte.
+
+def get_app_dir():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.join(base_dir, "ProcessadorDeAudioVideo")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+PASTA_SCRIPT = get_app_dir()
+LOG_PATH = os.path.join(PASTA_SCRIPT, "output.log")
+
+# Níveis do log: abaixo do nível mínimo a mensagem é descartada antes de qualquer
+# formatação ou E/S, então laços quentes podem registrar em DEBUG sem custo
+DEBUG = 10
+INFO = 20
+AVISO = 30
+ERRO = 40
+NOMES_NIVEIS = {DEBUG: "DEBUG", INFO: "INFO", AVISO: "AVISO", ERRO: "ERRO"}
+
+_nivel_minimo = INFO
+# Rotação por tamanho: output.log -> output.log.1 -> ... -> output.log.N (o mais antigo é apagado)
+_rotacao = {"limite_mb": 10.0, "arquivos": 3}
+_ouvintes = []
+_notificadores_erro = []
+_lock = threading.Lock()
+
+class EscritorLog:
+    """
+    Grava o log em segundo plano: as linhas entram numa fila e uma thread as escreve
+    em lotes, abrindo o arquivo uma vez por lote. O lote é gravado a cada `intervalo_s`
+    (ou antes, quando acumula `max_lote` linhas), em descarregar() e na saída do programa.
+    """
+
+    def __init__(self, caminho, intervalo_s=0.5, max_lote=500):
+        self.caminho = caminho
+        self.intervalo_s = intervalo_s
+        self.max_lote = max_lote
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def escrever(self, texto):
+        self._garantir_thread()
+        self._fila.put(texto)
+
+    def _garantir_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="EscritorLog", daemon=True)
+                self._thread.start()
+
+    def _executar(self):
+        while True:
+            item = self._fila.get()
+            limite = time.monotonic() + self.intervalo_s
+            lote, avisos = [], []
+            while True:
+                if isinstance(item, threading.Event):
+                    avisos.append(item)
+                else:
+                    lote.append(item)
+                if len(lote) >= self.max_lote:
+                    break
+                try:
+                    # Com um descarregar() pendente, grava só o que já está na fila
+                    restante = 0 if avisos else limite - time.monotonic()
+                    item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+                except queue.Empty:
+                    break
+            if lote:
+                self._gravar("".join(lote))
+            for aviso in avisos:
+                aviso.set()
+
+    def _gravar(self, texto):
+        try:
+            rotacionar_se_necessario(self.caminho)
+            with open(self.caminho, "a", encoding="utf-8") as f:
+                f.write(texto)
+        except Exception as e:
+            if sys.__stderr__:
+                sys.__stderr__.write(f"[LOG] Falha ao gravar {self.caminho}: {e}\n")
+
+    def descarregar(self, timeout=5.0):
+        """Bloqueia até tudo o que já foi enfileirado estar no disco."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        aviso = threading.Event()
+        self._fila.put(aviso)
+        aviso.wait(timeout)
+
+def configurar_rotacao(limite_mb=None, arquivos=None):
+    """Tamanho máximo (MB) de cada arquivo de log e quantos arquivos antigos manter (0 = nenhum)."""
+    if limite_mb is not None:
+        _rotacao["limite_mb"] = float(limite_mb)
+    if arquivos is not None:
+        _rotacao["arquivos"] = max(0, int(arquivos))
+
+def arquivos_rotacionados(caminho):
+    """Caminhos caminho.1, caminho.2, ... que existem no disco (do mais novo ao mais antigo)."""
+    antigos = []
+    indice = 1
+    while os.path.exists(f"{caminho}.{indice}"):
+        antigos.append(f"{caminho}.{indice}")
+        indice += 1
+    return antigos
+
+def rotacionar_se_necessario(caminho):
+    """Se `caminho` passou do limite, desloca os arquivos antigos e começa um arquivo novo."""
+    limite = _rotacao["limite_mb"] * 1024 * 1024
+    try:
+        if limite <= 0 or os.path.getsize(caminho) < limite:
+            return False
+    except OSError:
+        return False
+    manter = _rotacao["arquivos"]
+    try:
+        for indice in range(manter, 0, -1):
+            origem = caminho if indice == 1 else f"{caminho}.{indice - 1}"
+            if os.path.exists(origem):
+                os.replace(origem, f"{caminho}.{indice}")
+        if manter == 0 or os.path.exists(caminho):
+            os.remove(caminho)
+        # Sobras de uma configuração anterior que mantinha mais arquivos
+        for excedente in arquivos_rotacionados(caminho)[manter:]:
+            os.remove(excedente)
+    except OSError as e:
+        if sys.__stderr__:
+            sys.__stderr__.write(f"[LOG] Falha ao rotacionar {caminho}: {e}\n")
+        return False
+    return True
+
+def ler_final_arquivo(caminho, max_linhas, tamanho_bloco=64 * 1024):
+    """
+    Últimas `max_linhas` linhas de um arquivo de texto, lendo blocos a partir do fim
+    (o custo depende só do trecho lido, não do tamanho do arquivo).
+    """
+    try:
+        with open(caminho, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            posicao = f.tell()
+            blocos = []
+            quebras = 0
+            while posicao > 0 and quebras <= max_linhas:
+                tamanho = min(tamanho_bloco, posicao)
+                posicao -= tamanho
+                f.seek(posicao)
+                bloco = f.read(tamanho)
+                blocos.append(bloco)
+                quebras += bloco.count(b"\n")
+    except OSError:
+        return []
+    dados = b"".join(reversed(blocos))
+    linhas = dados.decode("utf-8", errors="replace").splitlines()
+    if posicao > 0 and linhas:
+        linhas = linhas[1:]  # a primeira pode estar cortada no meio
+    return linhas[-max_linhas:]
+
+ESCRITOR_LOG = EscritorLog(LOG_PATH)
+atexit.register(ESCRITOR_LOG.descarregar)
+
+class FluxoLog:
+    """Objeto tipo arquivo para sys.stdout/sys.stderr: o texto impresso vai para o escritor do log."""
+
+    encoding = "utf-8"
+    errors = "replace"
+
+    def write(self, texto):
+        if texto:
+            ESCRITOR_LOG.escrever(texto)
+        return len(texto)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def writable(self):
+        return True
+
+def definir_nivel(nivel):
+    """Nível mínimo registrado: número (DEBUG, INFO...) ou nome ("DEBUG", "INFO", "AVISO", "ERRO")."""
+    global _nivel_minimo
+    if isinstance(nivel, str):
+        nivel = {nome: valor for valor, nome in NOMES_NIVEIS.items()}.get(nivel.upper(), INFO)
+    _nivel_minimo = nivel
+
+def nivel_ativo(nivel):
+    return nivel >= _nivel_minimo
+
+def descarregar_log():
+    """Garante que o output.log está atualizado (antes de ler, copiar ou limpar o arquivo)."""
+    ESCRITOR_LOG.descarregar()
+
+def registrar_ouvinte(funcao):
+    """`funcao(linha)` é chamada para cada linha registrada com adicionar_log."""
+    with _lock:
+        if funcao not in _ouvintes:
+            _ouvintes.append(funcao)
+
+def remover_ouvinte(funcao):
+    with _lock:
+        if funcao in _ouvintes:
+            _ouvintes.remove(funcao)
+
+def adicionar_log(mensagem, nivel=INFO):
+    """
+    Adiciona uma mensagem ao log com timestamp e repassa a linha aos ouvintes.
+    A gravação no disco é assíncrona (EscritorLog); mensagens abaixo do nível mínimo são ignoradas.
+    """
+    if nivel < _nivel_minimo:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    prefixo = "" if nivel == INFO else f"[{NOMES_NIVEIS.get(nivel, nivel)}] "
+    linha = f"{timestamp} - {prefixo}{mensagem.strip()}"
+    ESCRITOR_LOG.escrever(linha + "\n")
+    with _lock:
+        ouvintes = list(_ouvintes)
+    for ouvinte in ouvintes:
+        try:
+            ouvinte(linha)
+        except Exception:
+            pass
+
+def registrar_notificador_erro(funcao):
+    """`funcao(titulo, mensagem, parent)` mostra ao usuário erros que exigem atenção (ex.: QMessageBox)."""
+    with _lock:
+        if funcao not in _notificadores_erro:
+            _notificadores_erro.append(funcao)
+
+def notificar_erro(titulo, mensagem, parent=None):
+    """Avisa o usuário pelos notificadores registrados; sem nenhum (modo sem interface), usa o stderr."""
+    with _lock:
+        notificadores = list(_notificadores_erro)
+    if not notificadores:
+        print(f"{titulo}: {mensagem}", file=sys.stderr)
+        return
+    for notificador in notificadores:
+        try:
+            notificador(titulo, mensagem, parent)
+        except Exception as e:
+            adicionar_log(f"Falha ao notificar erro '{titulo}': {e}")
@@ -0,0 +1,80 @@
+"""
+Relatório de tempo de importação dos módulos carregados na abertura do programa.
+
+Roda `python -X importtime` num processo separado e falha (código 1) se algum pacote
+pesado for importado na abertura ou se o tempo total passar do limite. Serve como
+verificação de regressão: torch, whisper, librosa etc. só devem ser carregados quando
+uma transcrição ou conversão começa. A parte dos pacotes pesados também roda no pytest
+(test_tempo_importacao.py); o limite em ms depende da máquina e fica só aqui.
+
+    python tempo_importacao.py
+    python tempo_importacao.py --limite-ms 600 --top 20
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+# Módulos importados pela janela principal antes de ela aparecer. Transcricao_main_V3 não
+# entra direto porque redireciona o stderr para o output.log ao ser importado.
+MODULOS_ABERTURA = ["Transcricao_tab_V3", "Transcricao_conversao_tab_V3", "logs_tab", "processador_cli"]
+
+# Só podem aparecer depois que o usuário inicia um processamento
+PACOTES_PESADOS = ["torch", "whisper", "librosa", "numba", "sklearn", "scipy", "resemblyzer", "yt_dlp"]
+
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def medir_importacao(modulos):
+    """Retorna lista de (modulo, proprio_us, acumulado_us, nivel) na ordem do -X importtime."""
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    ambiente = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=pasta, capture_output=True, text=True, env=ambiente
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else "falha ao importar")
+    registros = []
+    for linha in processo.stderr.splitlines():
+        achado = LINHA_IMPORTTIME.match(linha)
+        if achado:
+            proprio, acumulado, recuo, modulo = achado.groups()
+            registros.append((modulo, int(proprio), int(acumulado), (len(recuo) - 1) // 2))
+    return registros
+
+def pacotes_pesados_importados(registros):
+    """Quais de PACOTES_PESADOS aparecem entre os módulos importados."""
+    importados = {modulo.split(".")[0] for modulo, _, _, _ in registros}
+    return [p for p in PACOTES_PESADOS if p in importados]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica o tempo de importação da abertura do programa.")
+    parser.add_argument("--limite-ms", type=float, default=800.0, help="Tempo total máximo (ms).")
+    parser.add_argument("--top", type=int, default=15, help="Quantos módulos mais lentos listar.")
+    parser.add_argument("modulos", nargs="*", default=MODULOS_ABERTURA)
+    args = parser.parse_args(argv)
+
+    registros = medir_importacao(args.modulos)
+    total_ms = sum(acumulado for _, _, acumulado, nivel in registros if nivel == 0) / 1000
+
+    print(f"Tempo total de importação: {total_ms:.0f} ms (limite: {args.limite_ms:.0f} ms)")
+    print(f"{'acumulado (ms)':>15}  {'próprio (ms)':>13}  módulo")
+    for modulo, proprio, acumulado, _ in sorted(registros, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{acumulado / 1000:>15.1f}  {proprio / 1000:>13.1f}  {modulo}")
+
+    pesados = pacotes_pesados_importados(registros)
+    falhou = False
+    if pesados:
+        print(f"ERRO: pacotes pesados importados na abertura: {', '.join(pesados)}")
+        falhou = True
+    if total_ms > args.limite_ms:
+        print(f"ERRO: importação levou {total_ms:.0f} ms, acima do limite de {args.limite_ms:.0f} ms")
+        falhou = True
+    if not falhou:
+        print("OK")
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
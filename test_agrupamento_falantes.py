@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import agrupamento_falantes
+from agrupamento_falantes import (
+    AgrupamentoOnline, agrupar_embeddings, atribuir_aos_centroides, normalizar_l2, renumerar
+)
+
+# Embeddings sintéticos: falantes com centros quase ortogonais em 256 dimensões e
+# pouco ruído, como os vetores L2-normalizados do Resemblyzer
+
+def grupos_separaveis(semente, falantes=3, por_falante=40, ruido=0.01):
+    rng = np.random.default_rng(semente)
+    centros = normalizar_l2(rng.normal(size=(falantes, 256)))
+    verdade = np.repeat(np.arange(falantes), por_falante)
+    rng.shuffle(verdade)
+    embeddings = normalizar_l2(centros[verdade] + rng.normal(scale=ruido, size=(len(verdade), 256)))
+    return embeddings, renumerar(verdade)
+
+def metodos_disponiveis():
+    metodos = [pytest.param("online")]
+    for metodo, modulo in (("dbscan", "sklearn"), ("aglomerativo", "scipy")):
+        try:
+            __import__(modulo)
+            metodos.append(pytest.param(metodo))
+        except ImportError:
+            metodos.append(pytest.param(metodo, marks=pytest.mark.skip(reason=f"{modulo} não instalado")))
+    return metodos
+
+@pytest.mark.parametrize("metodo", metodos_disponiveis())
+@pytest.mark.parametrize("semente", range(5))
+def test_metodos_separam_grupos(metodo, semente):
+    embeddings, verdade = grupos_separaveis(semente)
+    assert np.array_equal(agrupar_embeddings(embeddings, metodo), verdade)
+
+@pytest.mark.parametrize("metodo", metodos_disponiveis())
+def test_grupos_pequenos_viram_ruido(metodo):
+    embeddings, verdade = grupos_separaveis(0)
+    # Duas janelas isoladas, cada uma longe de todos os falantes e da outra
+    rng = np.random.default_rng(1)
+    isoladas = normalizar_l2(rng.normal(size=(2, 256)))
+    labels = agrupar_embeddings(np.vstack([embeddings, isoladas]), metodo)
+    assert np.array_equal(labels[:len(verdade)], verdade)
+    assert list(labels[len(verdade):]) == [-1, -1]
+
+def test_aglomerativo_amostra_e_atribui_aos_centroides():
+    pytest.importorskip("scipy")
+    embeddings, verdade = grupos_separaveis(2, falantes=4, por_falante=150)
+    labels = agrupar_embeddings(embeddings, "aglomerativo", max_pontos=60)
+    assert np.array_equal(labels, verdade)
+
+def test_atribuir_aos_centroides_em_lotes_e_limiar(monkeypatch):
+    monkeypatch.setattr(agrupamento_falantes, "LOTE_ATRIBUICAO", 7)
+    centroides = np.eye(3, dtype=np.float32)
+    embeddings = normalizar_l2(np.array([[1, 0.1, 0], [0, 1, 0.2], [0.1, 0, 1], [1, 1, 1]] * 5, dtype=np.float32))
+    assert list(atribuir_aos_centroides(embeddings, centroides)[:3]) == [0, 1, 2]
+    com_limiar = atribuir_aos_centroides(embeddings, centroides, limiar_similaridade=0.9)
+    assert list(com_limiar) == [0, 1, 2, -1] * 5
+    assert list(atribuir_aos_centroides(embeddings, np.zeros((0, 3), dtype=np.float32))) == [-1] * 20
+
+def test_online_processado_em_partes_igual_a_uma_vez():
+    embeddings, verdade = grupos_separaveis(3)
+    agrupamento = AgrupamentoOnline()
+    for inicio in range(0, len(embeddings), 17):
+        agrupamento.adicionar(embeddings[inicio:inicio + 17])
+    assert np.array_equal(renumerar(agrupamento.finalizar(embeddings)), verdade)
+
+def test_entrada_vazia():
+    assert len(agrupar_embeddings(np.zeros((0, 256), dtype=np.float32), "online")) == 0
+
+def test_metodo_desconhecido_usa_o_padrao():
+    pytest.importorskip("sklearn")
+    embeddings, verdade = grupos_separaveis(4)
+    assert np.array_equal(agrupar_embeddings(embeddings, "inexistente"), verdade)
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from alinhamento import alinhar_intervalos, atribuir_por_sobreposicao, construir_turnos
+
+# Referências de força bruta (O(n·m)) para comparar com a varredura de alinhamento.py
+
+def sobreposicoes_forca_bruta(consultas, intervalos):
+    return [
+        [k for k, (ini, fim) in enumerate(intervalos) if ini <= fim_consulta and fim >= ini_consulta]
+        for ini_consulta, fim_consulta in consultas
+    ]
+
+def atribuicao_forca_bruta(intervalos, segmentos):
+    grupos = [[] for _ in intervalos]
+    if not intervalos:
+        return grupos
+    for j, seg in enumerate(segmentos):
+        ini, fim = seg["start"], seg["end"]
+        sobrepostos = [k for k, (a, b) in enumerate(intervalos) if a <= fim and b >= ini]
+        if sobrepostos:
+            melhor = max(sobrepostos, key=lambda k: (min(fim, intervalos[k][1]) - max(ini, intervalos[k][0]), -k))
+        else:
+            melhor = min(
+                range(len(intervalos)),
+                key=lambda k: (max(intervalos[k][0] - fim, ini - intervalos[k][1], 0), k)
+            )
+        grupos[melhor].append(j)
+    return grupos
+
+def turnos_forca_bruta(diarizacao, intervalo_maximo=0.5):
+    janelas = [(ini, fim, falante) for ini, fim, falante in diarizacao if fim > ini]
+    bordas = sorted({t for ini, fim, _ in janelas for t in (ini, fim)})
+    turnos = []
+    for a, b in zip(bordas, bordas[1:]):
+        votos = {}
+        for ini, fim, falante in janelas:
+            if ini <= a and fim >= b:
+                votos[falante] = votos.get(falante, 0) + 1
+        if not votos:
+            continue
+        conhecidos = {f: v for f, v in votos.items() if f != "unknown"}
+        anterior = turnos[-1][2] if turnos else None
+        if not conhecidos:
+            falante = "unknown"
+        else:
+            maximo = max(conhecidos.values())
+            empatados = sorted(f for f, v in conhecidos.items() if v == maximo)
+            falante = anterior if anterior in empatados else empatados[0]
+        if turnos and turnos[-1][2] == falante and a - turnos[-1][1] <= intervalo_maximo:
+            turnos[-1][1] = b
+        else:
+            turnos.append([a, b, falante])
+    return [tuple(turno) for turno in turnos]
+
+def intervalos_aleatorios(rng, quantidade, duracao_maxima=5.0, grade=None):
+    """Pares ordenados pelo início, com fins fora de ordem; `grade` arredonda as bordas (empates)."""
+    pares = []
+    for _ in range(quantidade):
+        ini = rng.uniform(0, 100)
+        fim = ini + rng.uniform(0, duracao_maxima)
+        if grade:
+            ini, fim = round(ini / grade) * grade, round(fim / grade) * grade
+        pares.append((ini, fim))
+    return sorted(pares, key=lambda par: par[0])
+
+@pytest.mark.parametrize("semente", range(30))
+def test_alinhar_intervalos_igual_forca_bruta(semente):
+    rng = random.Random(semente)
+    grade = rng.choice([None, 1.0, 0.5])
+    intervalos = intervalos_aleatorios(rng, rng.randint(0, 60), grade=grade)
+    consultas = intervalos_aleatorios(rng, rng.randint(0, 60), duracao_maxima=rng.choice([1.0, 8.0]), grade=grade)
+    assert alinhar_intervalos(consultas, intervalos) == sobreposicoes_forca_bruta(consultas, intervalos)
+
+@pytest.mark.parametrize("semente", range(30))
+def test_atribuir_por_sobreposicao_igual_forca_bruta(semente):
+    rng = random.Random(semente)
+    grade = rng.choice([None, 1.0])
+    intervalos = intervalos_aleatorios(rng, rng.randint(0, 40), duracao_maxima=rng.choice([2.0, 10.0]), grade=grade)
+    segmentos = [{"start": ini, "end": fim} for ini, fim in intervalos_aleatorios(rng, rng.randint(0, 40), grade=grade)]
+    assert atribuir_por_sobreposicao(intervalos, segmentos) == atribuicao_forca_bruta(intervalos, segmentos)
+
+@pytest.mark.parametrize("semente", range(30))
+def test_construir_turnos_igual_forca_bruta(semente):
+    rng = random.Random(semente)
+    falantes = ["speaker_0", "speaker_1", "speaker_2", "unknown"]
+    # Janelas de 1.5 s a cada 0.75 s, como na diarização, mais algumas de tamanho qualquer
+    diarizacao = [(i * 0.75, i * 0.75 + 1.5, rng.choice(falantes)) for i in range(rng.randint(0, 40))]
+    diarizacao += [(ini, fim, rng.choice(falantes)) for ini, fim in intervalos_aleatorios(rng, rng.randint(0, 10), grade=0.25)]
+    rng.shuffle(diarizacao)
+    assert construir_turnos(diarizacao) == turnos_forca_bruta(diarizacao)
+
+def test_entradas_vazias():
+    assert alinhar_intervalos([], []) == []
+    assert alinhar_intervalos([(0, 1), (2, 3)], []) == [[], []]
+    assert alinhar_intervalos([], [(0, 1)]) == []
+    assert atribuir_por_sobreposicao([], [{"start": 0, "end": 1}]) == []
+    assert atribuir_por_sobreposicao([(0, 1)], []) == [[]]
+    assert construir_turnos([]) == []
+
+def test_bordas_identicas_se_sobrepoem():
+    intervalos = [(0.0, 1.0), (1.0, 2.0), (2.0, 3.0)]
+    consultas = [(1.0, 1.0), (1.0, 2.0), (2.0, 2.0)]
+    assert alinhar_intervalos(consultas, intervalos) == [[0, 1], [0, 1, 2], [1, 2]]
+    assert alinhar_intervalos(consultas, intervalos) == sobreposicoes_forca_bruta(consultas, intervalos)
+
+def test_intervalo_longo_cobrindo_varios():
+    # Um intervalo longo no começo mantém o maior fim alto durante toda a varredura
+    intervalos = [(0.0, 1000.0)] + [(float(i), i + 0.5) for i in range(1, 200)]
+    consultas = [(i + 0.6, i + 0.9) for i in range(200)] + [(1500.0, 1501.0)]
+    assert alinhar_intervalos(consultas, intervalos) == sobreposicoes_forca_bruta(consultas, intervalos)
+    segmentos = [{"start": ini, "end": fim} for ini, fim in consultas]
+    assert atribuir_por_sobreposicao(intervalos, segmentos) == atribuicao_forca_bruta(intervalos, segmentos)
+    diarizacao = [(0.0, 1000.0, "speaker_0")] + [(float(i), i + 0.5, "speaker_1") for i in range(1, 200)]
+    assert construir_turnos(diarizacao) == turnos_forca_bruta(diarizacao)
+
+class ContaAcessos(list):
+    def __init__(self, itens):
+        super().__init__(itens)
+        self.acessos = 0
+
+    def __getitem__(self, indice):
+        self.acessos += 1
+        return super().__getitem__(indice)
+
+def test_intervalo_longo_nao_percorre_o_prefixo_a_cada_consulta():
+    # Com o intervalo 0 vivo até o fim, uma varredura pelo maior fim visitaria todo o
+    # prefixo em cada consulta (n²/2 acessos)
+    n = 3000
+    intervalos = ContaAcessos([(0.0, n + 10.0)] + [(float(i), i + 0.5) for i in range(1, n)])
+    consultas = [(i + 0.2, i + 0.9) for i in range(n)]
+    resultado = alinhar_intervalos(consultas, intervalos)
+    assert resultado == [[0]] + [[0, i] for i in range(1, n)]
+    sobreposicoes = sum(map(len, resultado))
+    assert intervalos.acessos <= 5 * (len(intervalos) + len(consultas) + sobreposicoes)
+
+def test_fins_fora_de_ordem_escolhe_o_mais_proximo():
+    # O intervalo 0 termina depois do 1: é o mais próximo de um segmento que não se sobrepõe a nenhum
+    intervalos = [(0.0, 9.0), (1.0, 2.0), (20.0, 21.0)]
+    segmentos = [{"start": 10.0, "end": 11.0}]
+    assert atribuir_por_sobreposicao(intervalos, segmentos) == [[0], [], []]
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from diarizacao_resemblyzer import extrair_embeddings_em_lote
+
+def test_lote_igual_a_embed_utterance():
+    pytest.importorskip("librosa")
+    resemblyzer = pytest.importorskip("resemblyzer")
+    encoder = resemblyzer.VoiceEncoder("cpu", verbose=False)
+    rng = np.random.default_rng(0)
+    tempo = np.arange(16000 * 8) / 16000
+    wav = (0.3 * np.sin(2 * np.pi * 220 * tempo * (1 + 0.2 * np.sin(tempo))) +
+           0.05 * rng.normal(size=len(tempo))).astype(np.float32)
+    # Janelas de 1,5 s a cada 0,75 s, como na diarização, e uma última mais curta no fim do áudio
+    intervalos = [(int(s * 16000), int((s + 1.5) * 16000)) for s in np.arange(0, 8 - 1.5, 0.75)]
+    intervalos.append((len(wav) - 12000, len(wav)))
+    laco = np.array([encoder.embed_utterance(wav[ini:fim]) for ini, fim in intervalos])
+    lote = extrair_embeddings_em_lote(encoder, wav, intervalos, tamanho_lote=3)
+    assert lote.shape == laco.shape
+    np.testing.assert_allclose(lote, laco, atol=1e-5)
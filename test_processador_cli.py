@@ -0,0 +1,33 @@
+import os
+
+import processador_cli
+import Transcricao_core_V3
+
+def test_mesmo_nome_em_pastas_diferentes_nao_sobrescreve(tmp_path, monkeypatch):
+    for pasta in ("a", "b"):
+        (tmp_path / pasta).mkdir()
+        (tmp_path / pasta / "aula.mp4").write_bytes(b"")
+    pasta_transcricoes = tmp_path / "ProcessadorDeAudioVideo" / "Transcricoes"
+    pasta_transcricoes.mkdir(parents=True)
+    chamadas = []
+
+    def transcrever_falso(caminho, modelo, idioma, nome_base=None):
+        chamadas.append(nome_base)
+        (pasta_transcricoes / f"transcricao_{nome_base}.txt").write_text(caminho, encoding="utf-8")
+
+    monkeypatch.setattr(processador_cli, "get_app_dir", lambda: str(tmp_path / "ProcessadorDeAudioVideo"))
+    monkeypatch.setattr(Transcricao_core_V3, "transcrever_com_diarizacao", transcrever_falso)
+    caminhos = [str(tmp_path / "a" / "aula.mp4"), str(tmp_path / "b" / "aula.mp4")]
+    resultados = processador_cli.transcrever_arquivos(caminhos, "tiny", "pt")
+
+    assert chamadas == ["aula", "aula_2"]
+    assert [r["status"] for r in resultados] == ["ok", "ok"]
+    saidas = [r["transcricao"] for r in resultados]
+    assert [os.path.basename(s) for s in saidas] == ["transcricao_aula.txt", "transcricao_aula_2.txt"]
+    for caminho, saida in zip(caminhos, saidas):
+        with open(saida, encoding="utf-8") as f:
+            assert f.read() == caminho
+
+def test_nome_base_unico():
+    assert Transcricao_core_V3.nome_base_unico("x/aula.mp4", set()) == "aula"
+    assert Transcricao_core_V3.nome_base_unico("y/aula.wav", {"aula", "aula_2"}) == "aula_3"
@@ -0,0 +1,11 @@
+import pytest
+
+# A abertura importa as abas Qt: sem PyQt6 não há o que medir
+pytest.importorskip("PyQt6")
+
+from tempo_importacao import MODULOS_ABERTURA, medir_importacao, pacotes_pesados_importados
+
+def test_abertura_nao_importa_pacotes_pesados():
+    registros = medir_importacao(MODULOS_ABERTURA)
+    assert registros, "python -X importtime não gerou nenhum registro"
+    assert pacotes_pesados_importados(registros) == []
@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtWidgets import QApplication, QStyleOptionViewItem
+
+from visualizador_transcricao import VisualizadorTranscricao
+
+PALAVRAS = "então a gente combinou de revisar o orçamento na próxima reunião com o cliente e a equipe".split()
+
+@pytest.fixture
+def visualizador(tmp_path):
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(0)
+    linhas = [
+        f"[0:00:{i % 60:02d} -> 0:00:{(i + 3) % 60:02d}] Speaker {i % 3 + 1}: "
+        + " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(1, 120)))
+        for i in range(300)
+    ]
+    caminho = tmp_path / "transcricao_teste.txt"
+    caminho.write_text("".join(linha + "\n\n" for linha in linhas), encoding="utf-8")
+    view = VisualizadorTranscricao()
+    view.resize(700, 500)
+    view.show()
+    view.abrir(str(caminho))
+    view.modelo.atualizar()
+    app.processEvents()
+    yield view, linhas
+    view.close()
+
+def test_altura_estimada_sem_ler_o_arquivo(visualizador, monkeypatch):
+    view, linhas = visualizador
+    def nao_ler(numero):
+        raise AssertionError("sizeHint não deve ler o arquivo")
+    monkeypatch.setattr(view.modelo, "linha", nao_ler)
+    opcao = QStyleOptionViewItem()
+    view.initViewItemOption(opcao)
+    for numero in range(len(linhas)):
+        view.itemDelegate().sizeHint(opcao, view.modelo.index(numero, 0))
+
+def test_altura_estimada_cobre_o_texto(visualizador):
+    view, linhas = visualizador
+    opcao = QStyleOptionViewItem()
+    view.initViewItemOption(opcao)
+    largura = max(50, view.viewport().width() - 8)
+    for numero, linha in enumerate(linhas):
+        assert view.modelo.linha(numero) == linha
+        exata = opcao.fontMetrics.boundingRect(
+            QRect(0, 0, largura, 1_000_000), int(Qt.TextFlag.TextWordWrap), linha
+        ).height() + 4
+        estimada = view.itemDelegate().sizeHint(opcao, view.modelo.index(numero, 0)).height()
+        assert exata <= estimada <= exata + 3 * opcao.fontMetrics.height(), linha
+
+def test_busca_seleciona_linha_distante(visualizador):
+    view, linhas = visualizador
+    assert view.ir_para_texto(linhas[-1])
+    assert view.currentIndex().row() == len(linhas) - 1
@@ -0,0 +1,90 @@
+import bisect
+
+import numpy as np
+
+# Importe o logger global para registrar tudo que acontece
+from registro_log import adicionar_log
+
+TAXA_VAD = 16000
+
+def detectar_regioes_fala(audio, taxa=TAXA_VAD, agressividade=2, quadro_ms=30, margem_ms=300, silencio_min_ms=500):
+    """
+    Detecta trechos com fala usando o webrtcvad.
+    `audio` é um array float32 mono; retorna lista ordenada de (inicio_s, fim_s),
+    ou None se o webrtcvad não estiver disponível.
+    """
+    try:
+        import webrtcvad
+    except ImportError:
+        adicionar_log("webrtcvad não instalado; pré-filtro de voz desativado.")
+        return None
+
+    vad = webrtcvad.Vad(int(agressividade))
+    amostras_quadro = int(taxa * quadro_ms / 1000)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    bytes_quadro = amostras_quadro * 2
+    total_quadros = len(audio) // amostras_quadro
+
+    # Marca quadros com fala e junta em regiões, tolerando pausas curtas
+    regioes = []
+    margem = margem_ms / 1000
+    silencio_min = silencio_min_ms / 1000
+    for i in range(total_quadros):
+        quadro = pcm[i * bytes_quadro:(i + 1) * bytes_quadro]
+        if not vad.is_speech(quadro, taxa):
+            continue
+        inicio = max(0.0, i * quadro_ms / 1000 - margem)
+        fim = min(len(audio) / taxa, (i + 1) * quadro_ms / 1000 + margem)
+        if regioes and inicio - regioes[-1][1] < silencio_min:
+            regioes[-1][1] = max(regioes[-1][1], fim)
+        else:
+            regioes.append([inicio, fim])
+    return [(inicio, fim) for inicio, fim in regioes]
+
+class MapaTempo:
+    """Converte tempos do áudio compactado (só fala) de volta para a linha do tempo original."""
+
+    def __init__(self, regioes):
+        self.regioes = list(regioes)
+        self.inicios_compactos = []
+        acumulado = 0.0
+        for inicio, fim in self.regioes:
+            self.inicios_compactos.append(acumulado)
+            acumulado += fim - inicio
+        self.duracao_compacta = acumulado
+
+    def original(self, t):
+        if not self.regioes:
+            return t
+        i = max(0, bisect.bisect_right(self.inicios_compactos, t) - 1)
+        inicio, fim = self.regioes[i]
+        return min(fim, inicio + (t - self.inicios_compactos[i]))
+
+    def mapear_segmentos(self, segmentos):
+        """Ajusta start/end de segmentos no formato do whisper (in-place)."""
+        for seg in segmentos:
+            seg["start"] = self.original(seg["start"])
+            seg["end"] = self.original(seg["end"])
+        return segmentos
+
+    def mapear_diarizacao(self, diarizacao):
+        return [(self.original(ini), self.original(fim), falante) for ini, fim, falante in diarizacao]
+
+def filtrar_fala(audio, taxa=TAXA_VAD, agressividade=2):
+    """
+    Remove os trechos sem fala do áudio.
+    Retorna (audio_so_fala, MapaTempo) ou (audio, None) se o VAD não puder ser aplicado.
+    """
+    regioes = detectar_regioes_fala(audio, taxa, agressividade)
+    if regioes is None:
+        return audio, None
+    trechos = [audio[int(ini * taxa):int(fim * taxa)] for ini, fim in regioes]
+    audio_fala = np.concatenate(trechos) if trechos else np.zeros(0, dtype=np.float32)
+    duracao = len(audio) / taxa
+    ignorado = duracao - len(audio_fala) / taxa
+    percentual = 100 * ignorado / duracao if duracao else 0.0
+    adicionar_log(
+        f"VAD: {len(regioes)} regiões de fala; {ignorado:.1f}s de {duracao:.1f}s "
+        f"({percentual:.0f}%) ignorados antes da diarização e do Whisper."
+    )
+    return audio_fala, MapaTempo(regioes)
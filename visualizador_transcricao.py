@@ -0,0 +1,379 @@
+import os
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from PyQt6.QtWidgets import (
+    QApplication, QListView, QAbstractItemView, QStyledItemDelegate, QToolButton, QMenu
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QPersistentModelIndex, QRect, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QIcon, QAction, QKeySequence
+
+from Transcricao_core_V3 import expandir_caminhos
+
+# Bytes do arquivo indexados a cada fetchMore (~2 mil segmentos)
+BLOCO_INDEXACAO = 256 * 1024
+# Bytes lidos por vez na busca dentro da transcrição
+BLOCO_BUSCA = 1024 * 1024
+# Linhas já decodificadas mantidas em memória
+MAX_LINHAS_CACHE = 2000
+# A quebra de texto leva palavras inteiras para a linha seguinte: cada linha da tela
+# perde em média até uma palavra em relação a largura / largura média dos caracteres
+CARACTERES_PERDIDOS_QUEBRA = 6
+# Texto típico de uma linha, para medir a largura média dos caracteres na fonte atual
+AMOSTRA_TEXTO = "[0:12:34 -> 0:12:41] Speaker 2: Então a gente combinou de revisar o orçamento na próxima reunião."
+
+def criar_botao_fonte(parent, ao_escolher):
+    """Botão "Aa" com o menu de tamanhos de fonte da transcrição."""
+    botao = QToolButton(parent)
+    botao.setIcon(QIcon.fromTheme("format-font-size"))
+    botao.setText("Aa")
+    botao.setToolTip("Alterar tamanho da fonte da transcrição")
+    botao.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+    botao.setStyleSheet("""
+        QToolButton {
+            background: transparent;
+            color: #b3bab7;
+            font-size: 13px;
+            padding: 2px 8px 2px 6px;
+            border: none;
+        }
+        QToolButton:hover {
+            color: #8fffa0;
+        }
+    """)
+    menu = QMenu(parent)
+    for size in [12, 14, 16, 18, 20, 24]:
+        act = QAction(f"{size}px", parent)
+        act.setData(size)
+        act.triggered.connect(lambda checked, s=size: ao_escolher(s))
+        menu.addAction(act)
+    botao.setMenu(menu)
+    botao.setFixedSize(30, 22)
+    botao.raise_()
+    botao.show()
+    return botao
+
+class ModeloTranscricao(QAbstractListModel):
+    """
+    Modelo de lista sobre um arquivo de transcrição em disco: cada linha não vazia (um
+    segmento, no formato de linha_transcricao) é uma linha do modelo. Em memória fica só o
+    deslocamento de cada linha no arquivo; o texto é lido quando a view precisa dele, e o
+    arquivo é indexado aos poucos, conforme a rolagem pede mais linhas (fetchMore).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.caminho = None
+        self._arquivo = None
+        self._deslocamentos = array("q")
+        self._indexado = 0      # bytes do arquivo já percorridos
+        self._tamanho = 0
+        self._acompanhar = False
+        self._cache = OrderedDict()
+
+    def abrir(self, caminho, acompanhar=False):
+        """
+        Passa a exibir `caminho`. Com acompanhar=True o arquivo ainda está sendo escrito:
+        uma linha sem quebra no fim só entra quando for completada (ver atualizar()).
+        """
+        self.beginResetModel()
+        self._fechar_arquivo()
+        self.caminho = caminho
+        self._acompanhar = acompanhar
+        try:
+            self._arquivo = open(caminho, "rb")
+            self._tamanho = os.path.getsize(caminho)
+        except OSError:
+            self._arquivo = None
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def fechar(self):
+        self.beginResetModel()
+        self._fechar_arquivo()
+        self.caminho = None
+        self.endResetModel()
+
+    def _fechar_arquivo(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+        self._arquivo = None
+        self._deslocamentos = array("q")
+        self._indexado = 0
+        self._tamanho = 0
+        self._cache.clear()
+
+    def atualizar(self, acompanhar=None):
+        """Indexa o que foi acrescentado ao arquivo desde a última leitura."""
+        if acompanhar is not None:
+            self._acompanhar = acompanhar
+        if self._arquivo is None:
+            return
+        try:
+            tamanho = os.path.getsize(self.caminho)
+        except OSError:
+            return
+        if tamanho < self._indexado:
+            # O arquivo foi reescrito (ex.: transcrito de novo): recomeça do zero
+            self.abrir(self.caminho, self._acompanhar)
+            return
+        self._tamanho = tamanho
+        while self._indexado < self._tamanho and self._indexar(BLOCO_INDEXACAO):
+            pass
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._deslocamentos)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._arquivo is not None and self._indexado < self._tamanho
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            self._indexar(BLOCO_INDEXACAO)
+
+    def _indexar(self, limite_bytes):
+        """Indexa até `limite_bytes` a partir de onde parou. Retorna quantas linhas entraram."""
+        self._arquivo.seek(self._indexado)
+        bloco = self._arquivo.read(limite_bytes)
+        if not bloco:
+            return 0
+        if b"\n" not in bloco:
+            # Uma linha maior que o bloco: lê até o fim dela
+            bloco += self._arquivo.readline()
+        fim_arquivo = self._indexado + len(bloco) >= self._tamanho
+
+        novos = []
+        posicao = 0
+        while True:
+            quebra = bloco.find(b"\n", posicao)
+            if quebra < 0:
+                break
+            if bloco[posicao:quebra].strip():
+                novos.append(self._indexado + posicao)
+            posicao = quebra + 1
+        if fim_arquivo and not self._acompanhar:
+            # Última linha sem quebra num arquivo que não cresce mais
+            if bloco[posicao:].strip():
+                novos.append(self._indexado + posicao)
+            posicao = len(bloco)
+        self._indexado += posicao
+
+        if novos:
+            primeira = len(self._deslocamentos)
+            self.beginInsertRows(QModelIndex(), primeira, primeira + len(novos) - 1)
+            self._deslocamentos.extend(novos)
+            self.endInsertRows()
+        return len(novos) or posicao
+
+    def linha(self, numero):
+        """Texto da linha `numero` (lido do arquivo se não estiver no cache)."""
+        texto = self._cache.get(numero)
+        if texto is not None:
+            self._cache.move_to_end(numero)
+            return texto
+        self._arquivo.seek(self._deslocamentos[numero])
+        texto = self._arquivo.readline().decode("utf-8", errors="replace").rstrip("\r\n")
+        self._cache[numero] = texto
+        if len(self._cache) > MAX_LINHAS_CACHE:
+            self._cache.popitem(last=False)
+        return texto
+
+    def tamanho_linha(self, numero):
+        """Bytes da linha `numero` (sem as quebras), pelo índice: não lê o arquivo."""
+        fim = self._deslocamentos[numero + 1] if numero + 1 < len(self._deslocamentos) else self._indexado
+        return max(1, fim - self._deslocamentos[numero] - 2)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self._arquivo is None:
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.linha(index.row())
+        return None
+
+    def linha_do_deslocamento(self, deslocamento):
+        """Número da linha que contém o byte `deslocamento` (indexando o arquivo até lá)."""
+        while self._indexado <= deslocamento and self.canFetchMore(QModelIndex()):
+            if not self._indexar(BLOCO_INDEXACAO):
+                break
+        return bisect_right(self._deslocamentos, deslocamento) - 1
+
+    def buscar(self, texto, a_partir=0):
+        """
+        Primeira linha a partir de `a_partir` que contém `texto` (sem diferenciar maiúsculas),
+        ou -1. O arquivo é percorrido em blocos, sem carregar tudo na memória.
+        """
+        texto = texto.strip().lower()
+        if not texto or self._arquivo is None:
+            return -1
+        if a_partir < len(self._deslocamentos):
+            inicio = self._deslocamentos[a_partir]
+        else:
+            inicio = self._indexado
+        self._arquivo.seek(inicio)
+        while True:
+            bloco = self._arquivo.read(BLOCO_BUSCA)
+            if not bloco:
+                return -1
+            if not bloco.endswith(b"\n"):
+                # Completa a última linha para o texto procurado não ficar dividido entre blocos
+                bloco += self._arquivo.readline()
+            conteudo = bloco.decode("utf-8", errors="replace")
+            achado = conteudo.lower().find(texto)
+            if achado >= 0:
+                inicio_linha = conteudo.rfind("\n", 0, achado) + 1
+                deslocamento = inicio + len(conteudo[:inicio_linha].encode("utf-8"))
+                return self.linha_do_deslocamento(deslocamento)
+            inicio += len(bloco)
+
+class DelegadoLinha(QStyledItemDelegate):
+    """
+    Altura de cada linha com quebra de texto na largura atual da view, estimada pelo tamanho
+    em bytes e pelas medidas da fonte: o layout não lê o arquivo nem mede o texto de cada
+    linha. Se a estimativa ficar curta, a última linha sai com reticências (texto completo
+    na dica e ao copiar).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._medidas = {}
+
+    def _medidas_fonte(self, metricas, fonte):
+        """(largura média de caractere, altura de uma linha), medidas uma vez por fonte."""
+        chave = fonte.key()
+        if chave not in self._medidas:
+            largura = metricas.horizontalAdvance(AMOSTRA_TEXTO) / len(AMOSTRA_TEXTO)
+            altura = metricas.boundingRect(
+                QRect(0, 0, 1_000_000, 1_000_000), int(Qt.TextFlag.TextWordWrap), AMOSTRA_TEXTO
+            ).height()
+            self._medidas[chave] = (max(largura, 1.0), altura)
+        return self._medidas[chave]
+
+    def sizeHint(self, option, index):
+        largura = max(50, self.parent().viewport().width() - 8)
+        largura_caractere, altura_linha = self._medidas_fonte(option.fontMetrics, option.font)
+        por_linha = max(1, int(largura / largura_caractere) - CARACTERES_PERDIDOS_QUEBRA)
+        linhas = -(-index.model().tamanho_linha(index.row()) // por_linha)
+        return QSize(largura, linhas * altura_linha + 4)
+
+class VisualizadorTranscricao(QListView):
+    """
+    Exibe uma transcrição salva sem carregar o arquivo inteiro: só as linhas visíveis são
+    lidas e desenhadas, então rolagem e busca não dependem do tamanho da transcrição.
+    """
+    arquivosSoltos = pyqtSignal(list)
+    fonteAlterada = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.modelo = ModeloTranscricao(self)
+        self.setModel(self.modelo)
+        self.setItemDelegate(DelegadoLinha(self))
+        self.setObjectName("VisualizadorTranscricao")
+        self.setWordWrap(True)
+        self.setUniformItemSizes(False)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        # Layout em lotes: arquivos com muitas linhas não travam a interface ao abrir
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setSpacing(5)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setAcceptDrops(True)
+        self._tamanho_fonte = 14
+        self._apply_custom_style(self._tamanho_fonte)
+        self._font_button = criar_botao_fonte(self, self.setFontSize)
+
+    def _apply_custom_style(self, tamanho):
+        self.setStyleSheet(f"""
+            QListView#VisualizadorTranscricao {{
+                font-size: {tamanho}px;
+                font-family: 'Segoe UI', Arial, sans-serif;
+                padding: 18px;
+            }}
+        """)
+
+    def setFontSize(self, tamanho):
+        if tamanho == self._tamanho_fonte:
+            return
+        self._tamanho_fonte = tamanho
+        self._apply_custom_style(tamanho)
+        self.scheduleDelayedItemsLayout()
+        self.fonteAlterada.emit(tamanho)
+
+    def abrir(self, caminho, acompanhar=False):
+        self.modelo.abrir(caminho, acompanhar)
+        self.scrollToTop()
+
+    def acompanhar(self):
+        """Mostra as linhas novas de um arquivo em escrita, seguindo o fim se a rolagem já estava lá."""
+        barra = self.verticalScrollBar()
+        no_fim = barra.value() >= barra.maximum() - 4
+        self.modelo.atualizar()
+        if no_fim:
+            self.scrollToBottom()
+
+    def selecionar_linha(self, numero):
+        indice = self.modelo.index(numero, 0)
+        self.setCurrentIndex(indice)
+        self._rolar_ate(QPersistentModelIndex(indice))
+
+    def _rolar_ate(self, indice):
+        # No layout em lotes uma linha distante ainda não tem posição: tenta de novo em
+        # seguida, enquanto ela continuar sendo a linha atual
+        if not indice.isValid() or indice != self.currentIndex():
+            return
+        alvo = self.modelo.index(indice.row(), 0)
+        if self.visualRect(alvo).isValid():
+            self.scrollTo(alvo, QAbstractItemView.ScrollHint.PositionAtCenter)
+        else:
+            QTimer.singleShot(50, lambda: self._rolar_ate(indice))
+
+    def ir_para_texto(self, texto, a_partir=0):
+        """Seleciona a primeira linha a partir de `a_partir` que contém `texto`."""
+        numero = self.modelo.buscar(texto, a_partir)
+        if numero < 0:
+            return False
+        self.selecionar_linha(numero)
+        return True
+
+    def localizar_proximo(self, texto):
+        """Próxima ocorrência depois da linha atual, voltando ao começo no fim do arquivo."""
+        atual = self.currentIndex()
+        inicio = atual.row() + 1 if atual.isValid() else 0
+        return self.ir_para_texto(texto, inicio) or (inicio > 0 and self.ir_para_texto(texto, 0))
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            linhas = sorted(indice.row() for indice in self.selectedIndexes())
+            if linhas:
+                QApplication.clipboard().setText("\n\n".join(self.modelo.linha(n) for n in linhas))
+            return
+        super().keyPressEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._font_button:
+            m_top = 7
+            m_right = 40
+            btn_w = self._font_button.width()
+            self._font_button.move(self.width() - btn_w - m_right, m_top)
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+    def dropEvent(self, event):
+        if event.mimeData().hasUrls():
+            caminhos = [url.toLocalFile() for url in event.mimeData().urls() if url.toLocalFile()]
+            arquivos = expandir_caminhos(caminhos)
+            if arquivos:
+                self.arquivosSoltos.emit(arquivos)
+        event.acceptProposedAction()